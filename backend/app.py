@@ -5,6 +5,12 @@ A lightweight API for fetching trending tickers, technical indicators,
 news, and market analysis powered by Stocktwits and OpenBB Platform.
 """
 
+import time
+
+# Taken before the heavier imports below so startup timings include them
+_IMPORT_STARTED = time.perf_counter()
+
+import asyncio
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
@@ -12,6 +18,46 @@ from datetime import datetime
 import config
 
 from routes.market import router as market_router
+from services.upstream_pool import upstream_pools, OverloadedError
+from services.cache_manager import cache
+from services.disk_cache import disk_cache
+from services.prewarm import prewarm_scheduler
+from services.market_snapshot import market_snapshot
+from services.broadcaster import market_broadcaster
+from services.openbb_client import openbb_client
+from services.stocktwits_client import stocktwits_client
+
+
+# Startup timeline, reported by /api/ready
+startup_metrics = {
+    'app_import_seconds': round(time.perf_counter() - _IMPORT_STARTED, 3),
+    'startup_seconds': None,
+    'first_request': None
+}
+
+
+class FirstRequestTimer:
+    """ASGI middleware that records the latency of the first HTTP request served."""
+
+    def __init__(self, app):
+        self.app = app
+        self.recorded = False
+
+    async def __call__(self, scope, receive, send):
+        if self.recorded or scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        self.recorded = True
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            startup_metrics['first_request'] = {
+                'path': scope.get('path'),
+                'latency_ms': round((time.perf_counter() - started) * 1000, 1),
+                'seconds_after_import': round(started - _IMPORT_STARTED, 3)
+            }
 
 
 # Create FastAPI app
@@ -34,6 +80,9 @@ app.add_middleware(
 )
 
 
+app.add_middleware(FirstRequestTimer)
+
+
 # Include routers
 app.include_router(market_router)
 
@@ -52,13 +101,55 @@ async def root():
             "news": "/api/news/{symbol}",
             "summary": "/api/summary",
             "scan": "/api/scan",
+            "stream": "/api/stream",
             "health": "/api/health",
+            "ready": "/api/ready",
             "docs": "/docs"
         },
         "timestamp": datetime.now().isoformat()
     }
 
 
+# Readiness probe
+@app.get("/api/ready")
+async def readiness():
+    """
+    Readiness endpoint.
+
+    Returns 200 only once the analytics stack (OpenBB) has loaded in the
+    background, and 503 otherwise: while it is still importing, before
+    loading has started, or when OpenBB is not installed or failed to
+    import (the reason is in openbb.error). /api/health answers
+    immediately either way. Also reports import and first-request timings.
+    """
+    status = openbb_client.get_load_status()
+    ready = status['ready']
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "ready": ready,
+            "openbb": status,
+            "startup": startup_metrics,
+            "timestamp": datetime.now().isoformat()
+        }
+    )
+
+
+# Load shedding
+@app.exception_handler(OverloadedError)
+async def overloaded_exception_handler(request: Request, exc: OverloadedError):
+    """Answer shed requests with 503 and a Retry-After hint."""
+    return JSONResponse(
+        status_code=503,
+        headers={"Retry-After": str(exc.retry_after)},
+        content={
+            "error": "Service overloaded",
+            "detail": str(exc),
+            "timestamp": datetime.now().isoformat()
+        }
+    )
+
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -81,10 +172,33 @@ async def startup_event():
     print("MarketPulse API Starting...")
     print("=" * 50)
     print(f"Cache TTL: {config.CACHE_TTL_SECONDS} seconds")
+    print(f"Cache Backend: {config.CACHE_BACKEND}")
     print(f"Max Trending Tickers: {config.MAX_TRENDING_TICKERS}")
     print(f"OpenBB Provider: {config.OPENBB_DEFAULT_PROVIDER}")
+    print(f"Upstream Workers: stocktwits={config.STOCKTWITS_MAX_WORKERS}, openbb={config.OPENBB_MAX_WORKERS}")
     print("=" * 50)
 
+    # Import OpenBB in the background; requests needing it wait, others don't
+    openbb_client.start_loading()
+
+    if config.CACHE_L2_ENABLED or config.CACHE_BACKEND == "sqlite":
+        cache.attach_l2(disk_cache)
+        restored = await asyncio.to_thread(cache.rehydrate)
+        disk_cache.start()
+        print(f"Cache rehydrated {restored} entries from {config.CACHE_DB_PATH}")
+
+    cache.start_expiry_timer()
+
+    market_snapshot.add_listener(market_broadcaster.on_snapshot)
+    market_broadcaster.start()
+    market_snapshot.start()
+
+    if config.PREWARM_ENABLED:
+        prewarm_scheduler.start()
+        print(f"Pre-warming trending symbols every {config.PREWARM_INTERVAL_SECONDS} seconds")
+
+    startup_metrics['startup_seconds'] = round(time.perf_counter() - _IMPORT_STARTED, 3)
+
 
 # Shutdown event
 @app.on_event("shutdown")
@@ -93,6 +207,13 @@ async def shutdown_event():
     print("=" * 50)
     print("MarketPulse API Shutting Down...")
     print("=" * 50)
+    await prewarm_scheduler.stop()
+    await market_snapshot.stop()
+    await market_broadcaster.stop()
+    await cache.stop_expiry_timer()
+    await asyncio.to_thread(disk_cache.stop)
+    upstream_pools.shutdown()
+    await stocktwits_client.close_async()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,134 @@
+"""
+Load test: force_refresh throttling and upstream load shedding.
+
+Drives /api/indicators in-process (httpx over ASGITransport) with the
+OpenBB fetch replaced by a fixed-latency stub, in two scenarios:
+
+  storm  10 waves of 50 force_refresh requests on 10 already-cached
+         symbols; counts the upstream calls they cause
+  burst  400 distinct cold symbols at once; reports served vs shed (503)
+         requests and their latencies
+
+"before" disables the per-key refresh interval and the queue limit to
+reproduce the old behaviour; "after" uses the configured values.
+
+Usage (from backend/):
+    python bench/admission_load.py [--mode both|before|after] [--latency 0.2]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+
+config.CACHE_L2_ENABLED = False
+config.PREWARM_ENABLED = False
+
+import httpx  # noqa: E402
+
+import app as A  # noqa: E402
+from services.cache_manager import cache  # noqa: E402
+from services.market_snapshot import market_snapshot  # noqa: E402
+from services.openbb_client import openbb_client  # noqa: E402
+from services.upstream_pool import upstream_pools  # noqa: E402
+
+upstream_calls = 0
+calls_lock = threading.Lock()
+
+
+def stub_fetch(latency: float):
+    def fetch(symbol: str) -> dict:
+        global upstream_calls
+        with calls_lock:
+            upstream_calls += 1
+        time.sleep(latency)
+        return {
+            'symbol': symbol, 'rsi': 50.0, 'macd': 0.0, 'macd_signal': 0.0, 'macd_histogram': 0.0,
+            'sma_20': 1.0, 'sma_50': 1.0, 'price': 1.0, 'volume': 1, 'last_updated': 'now'
+        }
+    return fetch
+
+
+async def no_refresh(force_refresh: bool = False):
+    return None
+
+
+def percentile(values: list, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def run(mode: str) -> None:
+    global upstream_calls
+    if mode == 'before':
+        upstream_pools.max_queued = 10 ** 9
+        cache.force_refresh_min_seconds = 0
+    else:
+        upstream_pools.max_queued = config.UPSTREAM_MAX_QUEUED
+        cache.force_refresh_min_seconds = config.FORCE_REFRESH_MIN_INTERVAL_SECONDS
+    cache.clear()
+
+    transport = httpx.ASGITransport(app=A.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        async def request(path: str) -> tuple:
+            started = time.perf_counter()
+            response = await client.get(path)
+            return response.status_code, time.perf_counter() - started, response.headers.get('retry-after')
+
+        # storm: forced refreshes of symbols that are already cached
+        for i in range(10):
+            await request(f"/api/indicators/HOT{i}")
+        upstream_calls = 0
+        started = time.perf_counter()
+        for _ in range(10):
+            await asyncio.gather(*(request(f"/api/indicators/HOT{i % 10}?force_refresh=true") for i in range(50)))
+        print(f"[{mode}] storm: 500 forced requests -> {upstream_calls} upstream calls "
+              f"in {time.perf_counter() - started:.1f}s")
+
+        # burst: distinct cold symbols, more than the pool can queue
+        started = time.perf_counter()
+        results = await asyncio.gather(*(request(f"/api/indicators/COLD{i}") for i in range(400)))
+        served = [elapsed for status, elapsed, _ in results if status == 200]
+        shed = [elapsed for status, elapsed, _ in results if status == 503]
+        line = f"[{mode}] burst: 400 cold symbols -> {len(served)} served"
+        if served:
+            line += f" (p50 {percentile(served, 0.5):.2f}s, p99 {percentile(served, 0.99):.2f}s)"
+        line += f", {len(shed)} shed"
+        if shed:
+            retry_after = sorted({header for status, _, header in results if status == 503})
+            line += f" (p99 {percentile(shed, 0.99) * 1000:.0f} ms, Retry-After {', '.join(retry_after)})"
+        print(line + f" in {time.perf_counter() - started:.1f}s")
+
+
+async def main_async(modes: list, latency: float) -> None:
+    openbb_client._fetch_technical_indicators = stub_fetch(latency)
+    market_snapshot.refresh = no_refresh
+
+    await A.startup_event()
+    openbb_client.start_loading().result()
+    openbb_client.available = True
+    try:
+        for mode in modes:
+            await run(mode)
+    finally:
+        await A.shutdown_event()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mode", choices=["both", "before", "after"], default="both")
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per stubbed OpenBB fetch")
+    args = parser.parse_args()
+
+    modes = ["before", "after"] if args.mode == "both" else [args.mode]
+    asyncio.run(main_async(modes, args.latency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Microbenchmark: CacheManager get/set throughput by thread count.
+
+Compares the lock-striped cache (config.CACHE_SHARDS shards) with a
+single-shard cache, which behaves like the old single global lock, for a
+90% get / 10% set mix over a warm key set. Also times get_stats, which
+/api/health calls on every hit.
+
+Usage (from backend/):
+    python bench/cache_throughput.py [--seconds 1.0] [--keys 10000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from services.cache_manager import CacheManager  # noqa: E402
+
+THREAD_COUNTS = (1, 2, 4, 8, 16)
+
+
+def run(cache: CacheManager, threads: int, seconds: float, keys: int) -> float:
+    """Run the get/set mix on `threads` threads; returns operations per second."""
+    stop = threading.Event()
+    counts = [0] * threads
+
+    def worker(index: int) -> None:
+        rng = random.Random(index)
+        names = [f"indicators_S{i}" for i in range(keys)]
+        ops = 0
+        while not stop.is_set():
+            for _ in range(100):
+                key = names[rng.randrange(keys)]
+                if rng.random() < 0.1:
+                    cache.set(key, {'rsi': 50.0})
+                else:
+                    cache.get(key)
+            ops += 100
+        counts[index] = ops
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in workers:
+        thread.join()
+    return sum(counts) / seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--seconds', type=float, default=1.0, help="Duration of each run")
+    parser.add_argument('--keys', type=int, default=10000, help="Number of distinct keys")
+    args = parser.parse_args()
+
+    caches = {
+        f"sharded ({config.CACHE_SHARDS})": CacheManager(max_entries=args.keys * 2),
+        "single lock": CacheManager(max_entries=args.keys * 2, shard_count=1),
+    }
+    for cache in caches.values():
+        for i in range(args.keys):
+            cache.set(f"indicators_S{i}", {'rsi': 50.0})
+
+    print(f"{'threads':>8} " + " ".join(f"{name:>18}" for name in caches))
+    for threads in THREAD_COUNTS:
+        rates = [run(cache, threads, args.seconds, args.keys) for cache in caches.values()]
+        print(f"{threads:>8} " + " ".join(f"{rate:>14,.0f} op/s" for rate in rates))
+
+    cache = next(iter(caches.values()))
+    runs = 10000
+    started = time.perf_counter()
+    for _ in range(runs):
+        cache.get_stats()
+    print(f"get_stats: {(time.perf_counter() - started) / runs * 1e6:.1f} us per call "
+          f"({args.keys} entries, include_keys=False)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+Benchmark: vectorized indicator engine vs the per-symbol pandas path.
+
+Computes RSI-14, MACD 12/26/9 and SMA-20/50 for 10, 100 and 1,000
+symbols, once with services.indicators (one NumPy pass over a symbols x
+bars matrix) and once per symbol the way get_technical_indicators used to
+(a DataFrame per symbol and four df.ta calls, reading .iloc[-1]).
+
+The per-symbol path uses pandas_ta when it is installed; otherwise an
+equivalent pandas implementation of pandas_ta's formulas. Before timing,
+both are compared on 200 random series of varying length and the largest
+absolute difference is reported.
+
+Usage (from backend/):
+    python bench/indicators.py [--bars 120] [--repeat 3]
+"""
+
+import argparse
+import importlib
+import importlib.util
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.indicators import compute_indicators, stack_closes  # noqa: E402
+
+PANDAS_TA_AVAILABLE = importlib.util.find_spec("pandas_ta") is not None
+if PANDAS_TA_AVAILABLE:
+    # Registers the DataFrame.ta accessor
+    importlib.import_module("pandas_ta")
+
+KEYS = ('rsi', 'macd', 'macd_signal', 'macd_histogram', 'sma_20', 'sma_50')
+
+
+def per_symbol_pandas_ta(close: pd.Series) -> dict:
+    """The old per-symbol path: one DataFrame and four df.ta calls."""
+    df = pd.DataFrame({'close': close})
+    df.ta.rsi(length=14, append=True)
+    df.ta.macd(fast=12, slow=26, signal=9, append=True)
+    df.ta.sma(length=20, append=True)
+    df.ta.sma(length=50, append=True)
+    columns = ('RSI_14', 'MACD_12_26_9', 'MACDs_12_26_9', 'MACDh_12_26_9', 'SMA_20', 'SMA_50')
+    return {
+        key: float(df[column].iloc[-1]) if column in df.columns else float('nan')
+        for key, column in zip(KEYS, columns)
+    }
+
+
+def _pandas_ta_ema(close: pd.Series, length: int) -> pd.Series:
+    """pandas_ta's EMA: seeded with the SMA of the first `length` values."""
+    if len(close) < length:
+        return pd.Series(np.nan, index=close.index)
+    seeded = close.copy()
+    seeded.iloc[:length - 1] = np.nan
+    seeded.iloc[length - 1] = close.iloc[:length].mean()
+    return seeded.ewm(span=length, adjust=False).mean()
+
+
+def per_symbol_pandas(close: pd.Series) -> dict:
+    """pandas implementation of the same formulas, for when pandas_ta is missing."""
+    change = close.diff()
+    gains = change.clip(lower=0).ewm(alpha=1 / 14, min_periods=14).mean()
+    losses = (-change.clip(upper=0)).ewm(alpha=1 / 14, min_periods=14).mean()
+    rsi = 100 * gains / (gains + losses)
+
+    fast = _pandas_ta_ema(close, 12)
+    slow = _pandas_ta_ema(close, 26)
+    macd = fast - slow
+    first = macd.first_valid_index()
+    signal = _pandas_ta_ema(macd.loc[first:], 9) if first is not None else macd
+    return {
+        'rsi': rsi.iloc[-1],
+        'macd': macd.iloc[-1],
+        'macd_signal': signal.iloc[-1],
+        'macd_histogram': (macd - signal).iloc[-1],
+        'sma_20': close.rolling(20).mean().iloc[-1],
+        'sma_50': close.rolling(50).mean().iloc[-1]
+    }
+
+
+per_symbol = per_symbol_pandas_ta if PANDAS_TA_AVAILABLE else per_symbol_pandas
+
+
+def max_difference(rng: np.random.Generator) -> float:
+    """Largest absolute difference between the two paths over random series."""
+    series = [100 + np.cumsum(rng.normal(0, 1, rng.integers(40, 120))) for _ in range(200)]
+    vectorized = compute_indicators(stack_closes(series))
+    worst = 0.0
+    for row, closes in enumerate(series):
+        reference = per_symbol(pd.Series(closes))
+        for key in KEYS:
+            expected, actual = reference[key], vectorized[key][row]
+            if np.isnan(expected):
+                assert np.isnan(actual), f"{key} should be undefined for {len(closes)} bars"
+                continue
+            worst = max(worst, abs(actual - expected))
+    return worst
+
+
+def best_of(repeat: int, func) -> float:
+    """Fastest of `repeat` runs of func, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--bars', type=int, default=120, help="Daily bars per symbol")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per measurement (best is kept)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    reference = "pandas_ta" if PANDAS_TA_AVAILABLE else "pandas (pandas_ta formulas)"
+    print(f"max abs difference vs {reference}: {max_difference(rng):.2e}")
+
+    print(f"{'symbols':>8} {'vectorized':>12} {'per-symbol':>12} {'speedup':>8}")
+    for count in (10, 100, 1000):
+        series = [100 + np.cumsum(rng.normal(0, 1, args.bars)) for _ in range(count)]
+        frames = [pd.Series(closes) for closes in series]
+        vectorized = best_of(args.repeat, lambda: compute_indicators(stack_closes(series)))
+        looped = best_of(args.repeat, lambda: [per_symbol(close) for close in frames])
+        print(f"{count:>8} {vectorized * 1000:>10.1f}ms {looped * 1000:>10.1f}ms {looped / vectorized:>7.0f}x")
+
+
+if __name__ == '__main__':
+    main()
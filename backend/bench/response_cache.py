@@ -0,0 +1,185 @@
+"""
+Benchmark: pre-serialized snapshot responses vs the response-model path.
+
+Serves /api/trending, /api/summary and /api/scan in-process (httpx ASGI
+transport) from a snapshot of stubbed upstream data, and compares
+requests/sec with the previous approach: building TrendingTicker /
+ScanSignal models per request and letting FastAPI validate and encode
+them through response_model. End-to-end numbers include client and
+routing overhead, so the per-request cost of producing the body is also
+measured on its own. Also reports the size of each encoding.
+
+Usage (from backend/):
+    python bench/response_cache.py [--requests 3000] [--tickers 30]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+
+config.CACHE_L2_ENABLED = False
+config.PREWARM_ENABLED = False
+
+import httpx  # noqa: E402
+from fastapi import Query, Request  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from app import app  # noqa: E402
+from routes.conditional import encoded_response, snapshot_validators  # noqa: E402
+from models.schemas import MarketSummary, ScanResponse, ScanSignal, TrendingResponse, TrendingTicker  # noqa: E402
+from services.analysis import build_scan, build_summary  # noqa: E402
+from services.market_snapshot import market_snapshot  # noqa: E402
+from services.openbb_client import openbb_client  # noqa: E402
+from services.stocktwits_client import stocktwits_client  # noqa: E402
+
+
+def install_stubs(tickers: int) -> None:
+    """Serve trending data and indicators from memory instead of the upstreams."""
+    trending = [
+        {
+            'symbol': f"S{i}", 'title': f"Symbol {i}", 'watchlist_count': 1000 + i, 'price': 10.0 + i,
+            'percent_change': i - tickers / 2, 'volume': '1.2M', 'market_cap': '10B',
+            'direction': 'up' if i % 2 else 'down'
+        }
+        for i in range(tickers)
+    ]
+
+    async def stub_trending(force_refresh: bool = False):
+        return trending
+
+    async def stub_indicators(symbols, force_refresh: bool = False):
+        return {
+            symbol: {
+                'symbol': symbol, 'rsi': 25.0 + i % 50, 'macd': 1.0, 'macd_signal': 0.5, 'macd_histogram': 0.5,
+                'sma_20': 11.0, 'sma_50': 10.0, 'price': 12.0, 'volume': 1000, 'last_updated': 'now'
+            }
+            for i, symbol in enumerate(symbols)
+        }
+
+    stocktwits_client.get_trending_tickers_async = stub_trending
+    openbb_client.get_technical_indicators_batch_async = stub_indicators
+    openbb_client.available = True
+
+
+# The previous per-request path, for comparison
+
+@app.get("/bench/model/trending", response_model=TrendingResponse)
+async def model_trending(request: Request, force_refresh: bool = Query(False)):
+    snapshot = market_snapshot.current
+    tickers = [TrendingTicker(**ticker) for ticker in snapshot.trending]
+    return TrendingResponse(tickers=tickers, count=len(tickers), last_updated=datetime.now().isoformat())
+
+
+@app.get("/bench/model/summary", response_model=MarketSummary)
+async def model_summary(request: Request, force_refresh: bool = Query(False)):
+    snapshot = market_snapshot.current
+    return MarketSummary(
+        **build_summary(list(snapshot.trending), dict(snapshot.indicators)),
+        last_updated=datetime.now().isoformat()
+    )
+
+
+@app.get("/bench/model/scan", response_model=ScanResponse)
+async def model_scan(request: Request, force_refresh: bool = Query(False)):
+    snapshot = market_snapshot.current
+    scan = build_scan(list(snapshot.trending), dict(snapshot.indicators))
+    return ScanResponse(
+        bullish=[ScanSignal(**signal) for signal in scan['bullish']],
+        bearish=[ScanSignal(**signal) for signal in scan['bearish']],
+        total_scanned=scan['total_scanned'],
+        last_updated=datetime.now().isoformat()
+    )
+
+
+def build_models(name: str):
+    """Response model for one endpoint, built the way the old handlers did."""
+    snapshot = market_snapshot.current
+    if name == 'trending':
+        tickers = [TrendingTicker(**ticker) for ticker in snapshot.trending]
+        return TrendingResponse(tickers=tickers, count=len(tickers), last_updated=datetime.now().isoformat())
+    if name == 'summary':
+        return MarketSummary(
+            **build_summary(list(snapshot.trending), dict(snapshot.indicators)),
+            last_updated=datetime.now().isoformat()
+        )
+    scan = build_scan(list(snapshot.trending), dict(snapshot.indicators))
+    return ScanResponse(
+        bullish=[ScanSignal(**signal) for signal in scan['bullish']],
+        bearish=[ScanSignal(**signal) for signal in scan['bearish']],
+        total_scanned=scan['total_scanned'],
+        last_updated=datetime.now().isoformat()
+    )
+
+
+def microseconds_per_call(func, count: int) -> float:
+    started = time.perf_counter()
+    for _ in range(count):
+        func()
+    return (time.perf_counter() - started) / count * 1e6
+
+
+async def requests_per_second(client: httpx.AsyncClient, path: str, count: int, encoding: str) -> float:
+    headers = {'Accept-Encoding': encoding}
+    for _ in range(100):
+        await client.get(path, headers=headers)
+    started = time.perf_counter()
+    for _ in range(count):
+        await client.get(path, headers=headers)
+    return count / (time.perf_counter() - started)
+
+
+async def run(count: int, tickers: int) -> None:
+    install_stubs(tickers)
+    await market_snapshot.refresh()
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        print(f"{'endpoint':>10} {'identity':>9} {'gzip':>7} {'br':>7}")
+        for name in ('trending', 'summary', 'scan'):
+            variants = market_snapshot.current.bodies[name].variants
+            print(f"{name:>10} " + " ".join(
+                f"{len(variants[coding]) if coding in variants else '-':>{width}}"
+                for coding, width in (('identity', 9), ('gzip', 7), ('br', 7))
+            ) + " bytes")
+
+        print(f"\n{'endpoint':>10} {'pre-serialized':>16} {'model path':>12} {'speedup':>8}   (best of 3 x {count} requests, identity)")
+        for name in ('trending', 'summary', 'scan'):
+            cached = model = 0.0
+            for _ in range(3):
+                # Alternate the two paths and keep the best round of each
+                cached = max(cached, await requests_per_second(client, f"/api/{name}", count, 'identity'))
+                model = max(model, await requests_per_second(client, f"/bench/model/{name}", count, 'identity'))
+            print(f"{name:>10} {cached:>10,.0f} req/s {model:>6,.0f} req/s {cached / model:>7.2f}x")
+
+    # Body production alone: validate + encode per request vs select cached bytes
+    request = Request({'type': 'http', 'method': 'GET', 'path': '/', 'headers': [(b'accept-encoding', b'gzip')]})
+    print(f"\n{'endpoint':>10} {'pre-serialized':>16} {'model path':>12} {'speedup':>8}   (body per request)")
+    for name in ('trending', 'summary', 'scan'):
+        snapshot = market_snapshot.current
+        model_class = type(build_models(name))
+        cached = microseconds_per_call(
+            lambda: encoded_response(request, snapshot.bodies[name], snapshot_validators(snapshot, name)), count
+        )
+        model = microseconds_per_call(
+            lambda: JSONResponse(jsonable_encoder(model_class.model_validate(build_models(name)))), count
+        )
+        print(f"{name:>10} {cached:>13.1f} us {model:>9.1f} us {model / cached:>7.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=3000)
+    parser.add_argument('--tickers', type=int, default=30)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.tickers))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark: headline sentiment scoring, substring scans vs the lexicon scorer.
+
+Generates mostly-unique synthetic headlines (lexicon words, filler words
+and numbers) and times the old scorer (20 `word in text` scans per
+headline) against SentimentScorer uncached, through a cold score_batch
+memo, and on a stream that repeats a smaller set of headlines as news
+refreshes do.
+
+Usage (from backend/):
+    python bench/sentiment.py [--headlines 100000] [--distinct 5000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from services.sentiment import SentimentScorer  # noqa: E402
+
+FILLER = (
+    "shares stock market company reports quarter revenue analysts investors after amid "
+    "on as in for the of with record high low earnings guidance demand chip bank oil "
+    "update execute downtown cupertino dropbox outlook sector rates fed jobs"
+).split()
+LEXICON = config.SENTIMENT_POSITIVE_WORDS + config.SENTIMENT_NEGATIVE_WORDS + ['gains', 'dropped', 'rallies']
+
+
+def old_sentiment(text: str) -> str:
+    """The scorer SentimentScorer replaced, kept verbatim for comparison."""
+    text_lower = text.lower()
+    positive_words = ['gain', 'up', 'surge', 'rally', 'buy', 'bullish', 'growth', 'profit', 'beat', 'success']
+    negative_words = ['loss', 'down', 'fall', 'drop', 'sell', 'bearish', 'decline', 'miss', 'fail', 'cut']
+    positive_count = sum(1 for word in positive_words if word in text_lower)
+    negative_count = sum(1 for word in negative_words if word in text_lower)
+    if positive_count > negative_count:
+        return 'positive'
+    elif negative_count > positive_count:
+        return 'negative'
+    return 'neutral'
+
+
+def headlines(count: int, rng: random.Random) -> list:
+    generated = []
+    for i in range(count):
+        words = rng.sample(FILLER, rng.randint(5, 10)) + rng.sample(LEXICON, rng.randint(0, 2))
+        rng.shuffle(words)
+        words[0] = words[0].capitalize()
+        generated.append(f"{' '.join(words)} {i}")
+    return generated
+
+
+def timed(label: str, score, items: list, baseline: float = None) -> float:
+    started = time.perf_counter()
+    score(items)
+    elapsed = time.perf_counter() - started
+    ratio = f"  ({baseline / elapsed:.1f}x vs old)" if baseline else ""
+    print(f"  {label:<28} {elapsed * 1000:8.1f} ms   {elapsed / len(items) * 1e6:5.2f} us/headline{ratio}")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--headlines", type=int, default=100_000)
+    parser.add_argument("--distinct", type=int, default=5_000, help="distinct headlines in the repeated stream")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    unique = headlines(args.headlines, rng)
+    pool = headlines(args.distinct, rng)
+    repeated = [rng.choice(pool) for _ in range(args.headlines)]
+
+    print(f"{args.headlines} unique headlines:")
+    old = timed("old substring scorer", lambda items: [old_sentiment(h) for h in items], unique)
+    scorer = SentimentScorer()
+    timed("SentimentScorer uncached", lambda items: [scorer._score(h) for h in items], unique, old)
+    timed("score_batch, cold memo", SentimentScorer().score_batch, unique, old)
+
+    print(f"{args.headlines} headlines drawn from {args.distinct} distinct:")
+    old = timed("old substring scorer", lambda items: [old_sentiment(h) for h in items], repeated)
+    timed("score_batch", SentimentScorer().score_batch, repeated, old)
+    scorer = SentimentScorer()
+    timed("score, one at a time", lambda items: [scorer.score(h) for h in items], repeated, old)
+
+
+if __name__ == "__main__":
+    main()
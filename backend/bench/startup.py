@@ -0,0 +1,127 @@
+"""
+Benchmark: time to first request with OpenBB loaded in the background.
+
+Part 1 starts fresh interpreters and times `import app` against the
+imports that used to run at module load (OpenBB when installed, and the
+pandas-backed bar store), which are now deferred to a startup thread.
+
+Part 2 runs the app in-process with the analytics import stalled for
+--import-delay seconds, and times the first /api/health request and how
+long /api/ready keeps answering 503 before it flips to 200.
+
+Usage (from backend/):
+    python bench/startup.py [--runs 5] [--import-delay 3.0]
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+# Run in a fresh interpreter: import the app, then what the startup thread imports
+COLD_IMPORT = """
+import json, time
+started = time.perf_counter()
+import app
+app_seconds = time.perf_counter() - started
+started = time.perf_counter()
+if {openbb}:
+    from openbb import obb
+from services.bar_store import bar_store
+print(json.dumps({{'app': app_seconds, 'deferred': time.perf_counter() - started}}))
+"""
+
+
+def cold_imports(runs: int) -> None:
+    has_openbb = importlib.util.find_spec("openbb") is not None
+    code = COLD_IMPORT.format(openbb=has_openbb)
+    app_times, deferred_times = [], []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", code], cwd=BACKEND, capture_output=True, text=True, check=True
+        ).stdout
+        timings = json.loads(out.strip().splitlines()[-1])
+        app_times.append(timings['app'])
+        deferred_times.append(timings['deferred'])
+
+    app_ms = statistics.median(app_times) * 1000
+    deferred_ms = statistics.median(deferred_times) * 1000
+    deferred = "openbb + bar store" if has_openbb else "bar store only, openbb not installed"
+    print(f"cold import, median of {runs}:")
+    print(f"  import app             {app_ms:8.1f} ms")
+    print(f"  deferred imports       {deferred_ms:8.1f} ms ({deferred})")
+    print(f"  eager total            {app_ms + deferred_ms:8.1f} ms (before: paid before serving)")
+
+
+def stalled_import(import_delay: float) -> None:
+    import config
+
+    config.CACHE_L2_ENABLED = False
+    config.PREWARM_ENABLED = False
+
+    from fastapi.testclient import TestClient
+    from services.openbb_client import openbb_client
+    from services.stocktwits_client import stocktwits_client
+
+    async def stub_trending(force_refresh: bool = False):
+        return []
+
+    async def stub_indicators(symbols, force_refresh: bool = False):
+        return {}
+
+    def slow_load_analytics() -> None:
+        started = time.perf_counter()
+        time.sleep(import_delay)
+        openbb_client.import_seconds = round(time.perf_counter() - started, 3)
+        openbb_client._load_future.set_result(True)
+
+    stocktwits_client.get_trending_tickers_async = stub_trending
+    openbb_client.get_technical_indicators_batch_async = stub_indicators
+    openbb_client._load_analytics = slow_load_analytics
+    openbb_client.available = True
+
+    import app as A
+
+    started = time.perf_counter()
+    with TestClient(A.app) as client:
+        startup_ms = (time.perf_counter() - started) * 1000
+
+        request_started = time.perf_counter()
+        health = client.get("/api/health")
+        health_ms = (time.perf_counter() - request_started) * 1000
+
+        not_ready = 0
+        while client.get("/api/ready").status_code == 503:
+            not_ready += 1
+            time.sleep(0.05)
+        ready_seconds = time.perf_counter() - started
+        metrics = client.get("/api/ready").json()['startup']
+
+    print(f"analytics import stalled for {import_delay:.1f}s:")
+    print(f"  startup hook           {startup_ms:8.1f} ms")
+    print(f"  first /api/health      {health_ms:8.1f} ms (status {health.status_code})")
+    print(f"  /api/ready 503 polls   {not_ready:8d}")
+    print(f"  ready after            {ready_seconds * 1000:8.1f} ms")
+    print(f"  startup_metrics        {metrics}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-delay", type=float, default=3.0)
+    args = parser.parse_args()
+
+    cold_imports(args.runs)
+    print()
+    stalled_import(args.import_delay)
+
+
+if __name__ == "__main__":
+    main()
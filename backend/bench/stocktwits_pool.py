@@ -0,0 +1,151 @@
+"""
+Benchmark: per-call Stocktwits requests vs the pooled client.
+
+Serves a trending-symbols payload from a local HTTPS stand-in for the
+Stocktwits API and times sequential fetches three ways: a new connection
+per call (requests.get, as the client did before pooling), the client's
+keep-alive sync session, and its shared async client. Each call pays the
+TCP/TLS handshake only when it is not pooled.
+
+A throwaway self-signed certificate is generated with the openssl CLI
+unless --cert/--key are given.
+
+Usage (from backend/):
+    python bench/stocktwits_pool.py [--requests 200] [--cert cert.pem --key key.pem]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import ssl
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+
+# Measure connection reuse, not the provider rate limit
+config.STOCKTWITS_RATE_PER_SECOND = 1e6
+config.STOCKTWITS_RATE_BURST = 1_000_000
+
+PAYLOAD = json.dumps({
+    'symbols': [
+        {
+            'symbol': f"S{i}", 'title': f"Symbol {i}", 'watchlist_count': 1000 + i, 'trending_score': i,
+            'trends': {'summary': 'Trending on volume'},
+            'fundamentals': {'LastPrice': '10.0', 'AverageDailyVolumeLast3Months': '1000000'}
+        }
+        for i in range(30)
+    ]
+}).encode()
+
+
+class TrendingHandler(BaseHTTPRequestHandler):
+    """Answers every GET with the trending payload over a keep-alive connection."""
+    protocol_version = "HTTP/1.1"
+    wbufsize = 1 << 16
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(PAYLOAD)))
+        self.end_headers()
+        self.wfile.write(PAYLOAD)
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def self_signed_cert(directory: str) -> tuple:
+    cert, key = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+         "-subj", "/CN=localhost", "-addext", "subjectAltName=DNS:localhost",
+         "-keyout", key, "-out", cert],
+        check=True, capture_output=True
+    )
+    return cert, key
+
+
+def serve(cert: str, key: str) -> tuple:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), TrendingHandler)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"https://localhost:{server.server_address[1]}/trending/symbols.json"
+
+
+def summarize(label: str, timings: list) -> None:
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95)]
+    print(f"  {label:<24} median {statistics.median(timings):6.2f} ms   p95 {p95:6.2f} ms")
+
+
+def run(requests_count: int, cert: str, key: str) -> None:
+    server, url = serve(cert, key)
+    # Trust the stand-in's certificate in requests and httpx
+    os.environ["REQUESTS_CA_BUNDLE"] = cert
+    os.environ["SSL_CERT_FILE"] = cert
+
+    import requests
+    from services.stocktwits_client import FALLBACK_HEADERS, StocktwitsClient
+
+    client = StocktwitsClient()
+    client.api_url = url
+
+    def unpooled():
+        response = requests.get(url, headers=FALLBACK_HEADERS, timeout=10)
+        response.raise_for_status()
+        return client._parse_api_response(response.json())
+
+    def timed(fetch) -> list:
+        timings = []
+        for _ in range(requests_count):
+            started = time.perf_counter()
+            tickers = fetch()
+            timings.append((time.perf_counter() - started) * 1000)
+            assert tickers, "fetch failed"
+        return timings
+
+    async def timed_async() -> list:
+        timings = []
+        for _ in range(requests_count):
+            started = time.perf_counter()
+            tickers = await client._fetch_trending_async()
+            timings.append((time.perf_counter() - started) * 1000)
+            assert tickers, "fetch failed"
+        await client.close_async()
+        return timings
+
+    print(f"{requests_count} sequential trending fetches over local HTTPS:")
+    summarize("unpooled requests.get", timed(unpooled))
+    summarize("pooled sync session", timed(client._fetch_trending))
+    summarize("pooled async client", asyncio.run(timed_async()))
+    server.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--cert", help="PEM certificate for localhost (generated if omitted)")
+    parser.add_argument("--key", help="PEM private key for --cert")
+    args = parser.parse_args()
+
+    if args.cert and args.key:
+        run(args.requests, args.cert, args.key)
+        return
+    with tempfile.TemporaryDirectory() as directory:
+        run(args.requests, *self_signed_cert(directory))
+
+
+if __name__ == "__main__":
+    main()
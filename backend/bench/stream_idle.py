@@ -0,0 +1,104 @@
+"""
+Load test: CPU cost of idle /api/stream subscribers.
+
+Builds a market snapshot from stubbed upstreams, attaches N subscribers
+to a MarketBroadcaster (the fan-out behind /api/stream), and measures
+process CPU time while they sit idle with heartbeats running. Then
+publishes one delta and times its delivery to every subscriber.
+
+Usage (from backend/):
+    python bench/stream_idle.py [--subscribers 1000] [--idle-seconds 5]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+
+config.CACHE_L2_ENABLED = False
+
+from services.broadcaster import MarketBroadcaster  # noqa: E402
+from services.market_snapshot import market_snapshot  # noqa: E402
+from services.openbb_client import openbb_client  # noqa: E402
+from services.stocktwits_client import stocktwits_client  # noqa: E402
+
+
+def ticker(symbol: str, price: float) -> dict:
+    return {
+        'symbol': symbol, 'title': symbol, 'watchlist_count': 1000, 'price': price,
+        'percent_change': 1.0, 'volume': '1.2M', 'market_cap': '10B', 'direction': 'up'
+    }
+
+
+trending = [ticker(f"S{i}", 10.0 + i) for i in range(30)]
+
+
+async def stub_trending(force_refresh: bool = False):
+    return list(trending)
+
+
+async def stub_indicators(symbols, force_refresh: bool = False):
+    return {
+        symbol: {
+            'symbol': symbol, 'rsi': 45.0, 'macd': 0.5, 'macd_signal': 0.4, 'macd_histogram': 0.1,
+            'sma_20': 10.0, 'sma_50': 9.5, 'price': 10.0, 'volume': 1000, 'last_updated': 'now'
+        }
+        for symbol in symbols
+    }
+
+
+async def run(subscribers: int, idle_seconds: float) -> None:
+    stocktwits_client.get_trending_tickers_async = stub_trending
+    openbb_client.get_technical_indicators_batch_async = stub_indicators
+    openbb_client.available = True
+
+    broadcaster = MarketBroadcaster()
+    market_snapshot.add_listener(broadcaster.on_snapshot)
+    broadcaster.start()
+    await market_snapshot.refresh()
+
+    streams = [broadcaster.subscribe() for _ in range(subscribers)]
+    await asyncio.gather(*(stream.__anext__() for stream in streams))  # initial snapshot frames
+    pending = [asyncio.ensure_future(stream.__anext__()) for stream in streams]
+    await asyncio.sleep(0.1)
+
+    cpu_started, wall_started = time.process_time(), time.perf_counter()
+    await asyncio.sleep(idle_seconds)
+    cpu = time.process_time() - cpu_started
+    wall = time.perf_counter() - wall_started
+    print(f"{subscribers} idle subscribers: {cpu * 1000:.1f} ms CPU over {wall:.1f}s "
+          f"({cpu / wall * 100:.2f}% of one core)")
+
+    # Skip heartbeats that arrived while idle, then time one delta to everyone
+    for i, task in enumerate(pending):
+        if task.done():
+            pending[i] = asyncio.ensure_future(streams[i].__anext__())
+    trending[0] = ticker("S0", 99.0)
+    started = time.perf_counter()
+    await market_snapshot.refresh(force_refresh=True)
+    frames = await asyncio.gather(*pending)
+    delivered = sum(1 for frame in frames if frame.startswith(b"event: delta"))
+    print(f"delta delivered to {delivered}/{subscribers} subscribers in "
+          f"{(time.perf_counter() - started) * 1000:.1f} ms ({len(frames[0])} bytes, serialized once)")
+    print(broadcaster.get_stats())
+
+    for stream in streams:
+        await stream.aclose()
+    await broadcaster.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--subscribers', type=int, default=1000)
+    parser.add_argument('--idle-seconds', type=float, default=5.0)
+    args = parser.parse_args()
+    asyncio.run(run(args.subscribers, args.idle_seconds))
+
+
+if __name__ == '__main__':
+    main()
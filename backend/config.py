@@ -2,13 +2,39 @@
 Configuration settings for MarketPulse backend.
 """
 
+import os
+
 # Cache settings
-CACHE_TTL_SECONDS = 300  # 5 minutes
+CACHE_TTL_SECONDS = 300  # 5 minutes (soft TTL: served as fresh)
+CACHE_STALE_TTL_SECONDS = 900  # 15 minutes (hard TTL: served stale while refreshing)
+CACHE_FALLBACK_RETENTION_SECONDS = 3600  # Kept this long as a fallback when upstreams fail
+FORCE_REFRESH_MIN_INTERVAL_SECONDS = 30  # force_refresh is ignored for data younger than this
+CACHE_REFRESH_WORKERS = 4  # Threads for background refreshes of stale entries
+CACHE_MAX_ENTRIES = 5000  # Entry count limit before eviction
+CACHE_MAX_BYTES = 64 * 1024 * 1024  # Approximate memory budget (64 MB)
+CACHE_EVICTION_POLICY = "lru"  # "lru" or "tinylfu" (LRU eviction + frequency-based admission)
+CACHE_EXPIRY_INTERVAL_SECONDS = 5  # How often the expiry timer removes dead entries
+CACHE_EXPIRY_BATCH_SIZE = 256  # Max entries expired per lock acquisition
+CACHE_SHARDS = 16  # Independently locked cache stripes
+
+# Persistent L2 cache (SQLite) so restarts start warm
+CACHE_L2_ENABLED = True
+CACHE_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "cache.db")
+CACHE_L2_FLUSH_INTERVAL_SECONDS = 1.0  # Write-behind flush cadence
+CACHE_L2_BATCH_SIZE = 500  # Flush early once this many writes are pending
+CACHE_REHYDRATE_LIMIT = 1000  # Most recent entries restored on startup
+
+# Cache backend: "memory" (per-process, optional L2 above) or "sqlite"
+# (CACHE_DB_PATH shared by all uvicorn workers on this machine)
+CACHE_BACKEND = "memory"
+CACHE_LEASE_SECONDS = 30  # How long one worker may hold a key's refresh lease
+CACHE_LEASE_POLL_SECONDS = 0.1  # How often waiting workers re-check the shared store
 
 # API limits
 MAX_TRENDING_TICKERS = 10
 MAX_NEWS_ARTICLES = 10
 MAX_SCAN_RESULTS = 5  # Top 5 bullish and top 5 bearish
+MAX_BULK_SYMBOLS = 500  # Symbols accepted by the bulk indicators endpoint
 
 # Technical analysis thresholds
 RSI_OVERSOLD = 30
@@ -18,13 +44,80 @@ RSI_BULLISH_MAX = 50
 RSI_BEARISH_MIN = 50
 RSI_BEARISH_MAX = 70
 
+# Headline sentiment lexicons (base forms; plurals, -ed and -ing forms match too).
+# Words match whole, so compounds of a base word are listed explicitly.
+SENTIMENT_POSITIVE_WORDS = [
+    'gain', 'up', 'surge', 'rally', 'buy', 'bullish', 'growth', 'profit', 'beat', 'success',
+    'upgrade', 'upside', 'uptrend', 'upbeat', 'gainer', 'profitable', 'profitability', 'successful'
+]
+SENTIMENT_NEGATIVE_WORDS = [
+    'loss', 'down', 'fall', 'fell', 'drop', 'sell', 'sold', 'bearish', 'decline', 'miss', 'fail', 'cut',
+    'downgrade', 'downside', 'downturn', 'downtrend', 'selloff', 'failure'
+]
+SENTIMENT_CACHE_SIZE = 10000  # Scored headlines memoized
+
 # Stocktwits settings
 STOCKTWITS_TRENDING_URL = "https://stocktwits.com/rankings/trending"
 STOCKTWITS_TIMEOUT = 10  # seconds
+STOCKTWITS_HTTP2 = True  # Use HTTP/2 for async requests when the h2 package is installed
+STOCKTWITS_KEEPALIVE_SECONDS = 120  # Idle time before a pooled async connection is closed
 
 # OpenBB settings
 OPENBB_DEFAULT_PROVIDER = "yfinance"  # Fallback provider
 OPENBB_TIMEOUT = 15  # seconds
+BAR_HISTORY_DAYS = 100  # Lookback window for indicator calculations
+BAR_STORE_MAX_BARS = 400  # Daily bars kept per symbol in the incremental bar store
+BAR_STORE_MAX_SYMBOLS = 500  # Symbols whose bars stay in memory (LRU); others are re-read from SQLite
+OPENBB_BATCH_SIZE = 50  # Symbols per multi-symbol quote/history request
+
+# Upstream worker pools (threads available to blocking client calls)
+STOCKTWITS_MAX_WORKERS = 4
+OPENBB_MAX_WORKERS = 8
+
+# Upstream rate limits (token bucket per provider, shared by all callers; when
+# callers queue, interactive requests go first, then bulk work, then background)
+STOCKTWITS_RATE_PER_SECOND = 1.0
+STOCKTWITS_RATE_BURST = 3
+OPENBB_RATE_PER_SECOND = 4.0
+OPENBB_RATE_BURST = 8
+
+# Load shedding
+UPSTREAM_MAX_QUEUED = 32  # Jobs queued ahead in a worker pool before new upstream work is shed
+OVERLOAD_RETRY_AFTER_SECONDS = 5  # Retry-After sent with 503 responses when shedding
+
+# Upstream resilience (per-upstream circuit breaker, adaptive timeout, retry budget)
+BREAKER_FAILURE_THRESHOLD = 5  # Consecutive failures before a breaker opens
+BREAKER_RECOVERY_SECONDS = 30  # Time a breaker stays open before a half-open probe
+ADAPTIVE_TIMEOUT_PERCENTILE = 99  # Latency percentile the timeout is derived from
+ADAPTIVE_TIMEOUT_MULTIPLIER = 2.0  # Headroom over that percentile
+ADAPTIVE_TIMEOUT_MIN_SECONDS = 1.0  # Floor; STOCKTWITS_TIMEOUT / OPENBB_TIMEOUT are the ceilings
+ADAPTIVE_TIMEOUT_WINDOW = 200  # Recent latency samples kept per upstream
+UPSTREAM_MAX_RETRIES = 1  # Retries per call, when the retry budget allows
+UPSTREAM_CALL_THREADS_PER_WORKER = 2  # Guard threads per pool worker; spares run calls abandoned at their timeout
+RETRY_BUDGET_RATIO = 0.1  # Retries earned per call (at most ~10% extra load)
+RETRY_BUDGET_MAX_TOKENS = 10  # Cap on banked retries
+
+# Summary/scan fan-out
+SCAN_CONCURRENCY = 8  # Max symbol batches fetched at once
+SCAN_SYMBOL_TIMEOUT = 15  # seconds per batch before its symbols are skipped
+
+# Market snapshot (trending + indicators + summary + scan, rebuilt in the background)
+SNAPSHOT_REFRESH_SECONDS = 15  # How often inputs are re-checked; unchanged inputs keep the version
+
+# Pre-serialized snapshot responses
+RESPONSE_COMPRESSION_MIN_BYTES = 512  # Smaller bodies are served uncompressed
+RESPONSE_GZIP_LEVEL = 6
+RESPONSE_BROTLI_QUALITY = 9  # Used only when the brotli package is installed
+
+# Server-Sent Events stream of snapshot updates
+STREAM_QUEUE_SIZE = 16  # Frames buffered per subscriber before it is resynced
+STREAM_HEARTBEAT_SECONDS = 15  # Keep-alive comment interval
+
+# Background pre-warming of trending symbols
+PREWARM_ENABLED = True
+PREWARM_INTERVAL_SECONDS = 240  # Cycle cadence; keep below CACHE_TTL_SECONDS
+PREWARM_JITTER_SECONDS = 20  # Random spread added to cycles and to each warm task
+PREWARM_CONCURRENCY = 4  # Max warm tasks running at once
 
 # Server settings
 HOST = "0.0.0.0"
@@ -28,6 +28,7 @@ class TrendingResponse(BaseModel):
     tickers: List[TrendingTicker]
     count: int
     last_updated: str
+    snapshot_version: Optional[int] = Field(None, description="Market snapshot version this data came from")
 
 
 # Technical Indicators Models
@@ -45,6 +46,12 @@ class TechnicalIndicators(BaseModel):
     last_updated: str
 
 
+class BulkIndicatorsRequest(BaseModel):
+    """Request body for the bulk indicators endpoint."""
+    symbols: List[str] = Field(..., description="Ticker symbols to fetch")
+    force_refresh: bool = Field(False, description="Force refresh cache")
+
+
 # News Models
 class NewsArticle(BaseModel):
     """Model for a news article."""
@@ -71,6 +78,7 @@ class MarketSummary(BaseModel):
     neutral_count: int = Field(..., description="Number of neutral signals")
     top_movers: List[Dict[str, Any]] = Field(..., description="Top moving tickers")
     last_updated: str
+    snapshot_version: Optional[int] = Field(None, description="Market snapshot version this data came from")
 
 
 # Scan Models
@@ -91,6 +99,7 @@ class ScanResponse(BaseModel):
     bearish: List[ScanSignal] = Field(..., description="Top 5 bearish setups")
     total_scanned: int
     last_updated: str
+    snapshot_version: Optional[int] = Field(None, description="Market snapshot version this data came from")
 
 
 # Health Check Model
@@ -99,6 +108,9 @@ class HealthResponse(BaseModel):
     status: str
     openbb_available: bool
     cache_stats: Dict[str, Any]
+    prewarm_stats: Optional[Dict[str, Any]] = None
+    stream_stats: Optional[Dict[str, Any]] = None
+    upstream_stats: Optional[Dict[str, Any]] = None
     timestamp: str
 
 
@@ -0,0 +1,172 @@
+"""
+HTTP conditional-request helpers for market routes.
+Builds ETag / Last-Modified / Cache-Control headers from cache entries and
+market snapshots, and answers If-None-Match / If-Modified-Since with 304.
+"""
+
+import hashlib
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Dict, Optional
+from fastapi import Request, Response
+import config
+from services.cache_manager import cache
+from services.market_snapshot import MarketSnapshot
+from services.serialization import EncodedBody
+
+
+class Validators:
+    """ETag, Last-Modified and freshness lifetime of one response."""
+
+    __slots__ = ('etag', 'last_modified', 'max_age', 'stale_while_revalidate')
+
+    def __init__(self, etag: str, last_modified: float, max_age: int, stale_while_revalidate: int):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.max_age = max(0, max_age)
+        self.stale_while_revalidate = max(0, stale_while_revalidate)
+
+    def for_encoding(self, encoding: Optional[str]) -> 'Validators':
+        """
+        Validators for one content coding of the response.
+
+        Each coding is a different representation, so compressed variants
+        get their own strong ETag ('"<tag>-gzip"'); identity keeps the base tag.
+        """
+        if encoding is None:
+            return self
+        return Validators(
+            etag=f'{self.etag[:-1]}-{encoding}"',
+            last_modified=self.last_modified,
+            max_age=self.max_age,
+            stale_while_revalidate=self.stale_while_revalidate
+        )
+
+    def headers(self) -> Dict[str, str]:
+        """Response headers advertising these validators."""
+        return {
+            'ETag': self.etag,
+            'Last-Modified': formatdate(self.last_modified, usegmt=True),
+            'Cache-Control': f"public, max-age={self.max_age}, stale-while-revalidate={self.stale_while_revalidate}"
+        }
+
+
+def entry_validators(key: str, variant: str = "", value: Optional[Any] = None) -> Optional[Validators]:
+    """
+    Validators for a cached entry, derived from its created_at.
+
+    The ETag changes whenever the entry is reloaded. Cache-Control max-age
+    is the entry's remaining soft TTL and stale-while-revalidate the window
+    in which the server would also serve it stale.
+
+    Args:
+        key: Cache key backing the response
+        variant: Extra request parameters that change the body (e.g. a limit)
+        value: The cached value the body is built from; validators are only
+            returned while the entry still holds it, so a refresh landing
+            after the read never labels the old body with the new ETag
+
+    Returns:
+        Validators, or None if the key is not cached (or was reloaded)
+    """
+    meta = cache.get_metadata(key, value)
+    if meta is None:
+        return None
+
+    now = time.time()
+    return Validators(
+        etag=_etag(f"{key}|{variant}|{meta['created_at']!r}"),
+        last_modified=meta['created_at'],
+        max_age=int(meta['expires_at'] - now),
+        stale_while_revalidate=int(meta['stale_until'] - max(now, meta['expires_at']))
+    )
+
+
+def snapshot_validators(snapshot: MarketSnapshot, variant: str = "") -> Validators:
+    """
+    Validators for a response served from a market snapshot.
+
+    The ETag covers the snapshot's input fingerprint, version and creation
+    time: bodies also carry last_updated and snapshot_version, so two
+    snapshots of identical inputs are still different representations.
+    """
+    return Validators(
+        etag=_etag(f"{snapshot.fingerprint}|{snapshot.version}|{snapshot.created_at!r}|{variant}"),
+        last_modified=snapshot.created_at,
+        max_age=config.SNAPSHOT_REFRESH_SECONDS,
+        stale_while_revalidate=config.CACHE_STALE_TTL_SECONDS - config.CACHE_TTL_SECONDS
+    )
+
+
+def is_fresh(key: str) -> bool:
+    """True if key is cached and within its soft TTL."""
+    remaining = cache.expires_in(key)
+    return remaining is not None and remaining >= 0
+
+
+def not_modified(request: Request, validators: Optional[Validators]) -> Optional[Response]:
+    """
+    Return a 304 response if the client's cached copy is still current.
+
+    If-None-Match takes precedence over If-Modified-Since (RFC 9110).
+
+    Returns:
+        Empty 304 response with the validator headers, or None to serve the body
+    """
+    if validators is None:
+        return None
+
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        tags = {tag.strip() for tag in if_none_match.split(',')}
+        # Weak comparison: W/"x" matches "x"
+        tags |= {tag[2:] for tag in tags if tag.startswith('W/')}
+        matched = '*' in tags or validators.etag in tags
+    else:
+        if_modified_since = request.headers.get('if-modified-since')
+        if if_modified_since is None:
+            return None
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return None
+        matched = int(validators.last_modified) <= since
+
+    if not matched:
+        return None
+    return Response(status_code=304, headers=validators.headers())
+
+
+def encoded_response(request: Request, body: EncodedBody, validators: Optional[Validators]) -> Response:
+    """
+    Send a pre-serialized JSON body, compressed if the client accepts it.
+
+    Bypasses response-model validation and encoding entirely; the body was
+    produced once for the data version it belongs to. Conditional requests
+    are answered here too, with 304, because the ETag depends on the
+    content coding selected for the client.
+    """
+    content, encoding = body.select(request.headers.get('accept-encoding'))
+    if validators is not None:
+        validators = validators.for_encoding(encoding)
+        cached_response = not_modified(request, validators)
+        if cached_response is not None:
+            cached_response.headers['Vary'] = 'Accept-Encoding'
+            return cached_response
+
+    headers = validators.headers() if validators is not None else {}
+    headers['Vary'] = 'Accept-Encoding'
+    if encoding is not None:
+        headers['Content-Encoding'] = encoding
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+def apply_headers(response: Response, validators: Optional[Validators]) -> None:
+    """Attach validator headers to an outgoing response."""
+    if validators is not None:
+        response.headers.update(validators.headers())
+
+
+def _etag(source: str) -> str:
+    """Strong ETag from an arbitrary version string."""
+    return '"' + hashlib.sha1(source.encode('utf-8')).hexdigest()[:20] + '"'
@@ -2,38 +2,68 @@
 Market API routes for trending tickers, indicators, news, summary, and scan.
 """
 
-from fastapi import APIRouter, HTTPException, Query
+import asyncio
+import json
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from datetime import datetime
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 import config
 
 from models.schemas import (
     TrendingResponse, TrendingTicker,
-    TechnicalIndicators,
+    TechnicalIndicators, BulkIndicatorsRequest,
     NewsResponse, NewsArticle,
     MarketSummary,
-    ScanResponse, ScanSignal,
+    ScanResponse,
     HealthResponse,
     ErrorResponse
 )
 from services.stocktwits_client import stocktwits_client
 from services.openbb_client import openbb_client
 from services.cache_manager import cache
+from services.prewarm import prewarm_scheduler
+from services.market_snapshot import market_snapshot, fetch_indicator_batch, symbol_batches
+from services.broadcaster import market_broadcaster
+from services.resilience import get_upstream_stats
+from services.upstream_pool import OverloadedError
+from routes.conditional import (
+    apply_headers, encoded_response, entry_validators, is_fresh, not_modified, snapshot_validators
+)
 
 
 router = APIRouter(prefix="/api", tags=["market"])
 
 
 @router.get("/trending", response_model=TrendingResponse)
-async def get_trending(force_refresh: bool = Query(False, description="Force refresh cache")):
+async def get_trending(
+    request: Request,
+    response: Response,
+    force_refresh: bool = Query(False, description="Force refresh cache")
+):
     """
     Get top trending tickers from Stocktwits (stocks + crypto).
 
     Returns top 10 trending symbols with price, volume, and change data.
-    Data is cached for 5 minutes by default.
+    Data is cached for 5 minutes by default. Served from the current market
+    snapshot when one exists; a forced refresh (or a cold start) fetches
+    the list directly so it never waits on indicator loads.
+    Supports conditional GET (ETag / If-None-Match, Last-Modified).
     """
     try:
-        tickers_data = stocktwits_client.get_trending_tickers(force_refresh=force_refresh)
+        snapshot = market_snapshot.current
+        if snapshot is not None and not force_refresh:
+            cache.record_prewarmed_hits(snapshot.prewarmed['trending'])
+            return encoded_response(request, snapshot.bodies['trending'], snapshot_validators(snapshot, "trending"))
+
+        key = stocktwits_client.cache_key
+        if not force_refresh and is_fresh(key):
+            cached_response = not_modified(request, entry_validators(key))
+            if cached_response is not None:
+                return cached_response
+
+        tickers_data = await stocktwits_client.get_trending_tickers_async(force_refresh=force_refresh)
+        apply_headers(response, entry_validators(key, value=tickers_data))
 
         tickers = [
             TrendingTicker(**ticker) for ticker in tickers_data
@@ -45,6 +75,8 @@ async def get_trending(force_refresh: bool = Query(False, description="Force ref
             last_updated=datetime.now().isoformat()
         )
 
+    except OverloadedError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching trending data: {str(e)}")
 
@@ -52,6 +84,8 @@ async def get_trending(force_refresh: bool = Query(False, description="Force ref
 @router.get("/indicators/{symbol}", response_model=TechnicalIndicators)
 async def get_indicators(
     symbol: str,
+    request: Request,
+    response: Response,
     force_refresh: bool = Query(False, description="Force refresh cache")
 ):
     """
@@ -59,9 +93,16 @@ async def get_indicators(
 
     Returns RSI, MACD, SMA_20, SMA_50, and volume data.
     Uses OpenBB Platform for calculations.
+    Supports conditional GET (ETag / If-None-Match, Last-Modified).
     """
     try:
-        indicators = openbb_client.get_technical_indicators(symbol.upper(), force_refresh=force_refresh)
+        key = f"indicators_{symbol.upper()}"
+        if not force_refresh and is_fresh(key):
+            cached_response = not_modified(request, entry_validators(key))
+            if cached_response is not None:
+                return cached_response
+
+        indicators = await openbb_client.get_technical_indicators_async(symbol.upper(), force_refresh=force_refresh)
 
         if not indicators:
             raise HTTPException(
@@ -69,17 +110,53 @@ async def get_indicators(
                 detail=f"Unable to fetch indicators for {symbol}. Symbol may not exist or data unavailable."
             )
 
+        apply_headers(response, entry_validators(key, value=indicators))
         return TechnicalIndicators(**indicators)
 
-    except HTTPException:
+    except (HTTPException, OverloadedError):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error calculating indicators: {str(e)}")
 
 
+@router.post("/indicators")
+async def get_indicators_bulk(request: BulkIndicatorsRequest):
+    """
+    Get technical indicators for many symbols as streamed NDJSON.
+
+    Emits one JSON line per symbol as soon as it is ready: cached symbols
+    first, then each provider batch as it completes. Symbols that cannot be
+    fetched get a line with an "error" field instead of indicators.
+    """
+    symbols = _parse_bulk_symbols(request.symbols)
+    return StreamingResponse(
+        _stream_indicator_lines(symbols, request.force_refresh),
+        media_type="application/x-ndjson"
+    )
+
+
+@router.get("/indicators")
+async def get_indicators_bulk_query(
+    symbols: str = Query(..., description="Comma-separated ticker symbols"),
+    force_refresh: bool = Query(False, description="Force refresh cache")
+):
+    """
+    Query-string variant of POST /api/indicators.
+
+    Streams one NDJSON line per symbol in the order they become ready.
+    """
+    parsed = _parse_bulk_symbols(symbols.split(','))
+    return StreamingResponse(
+        _stream_indicator_lines(parsed, force_refresh),
+        media_type="application/x-ndjson"
+    )
+
+
 @router.get("/news/{symbol}", response_model=NewsResponse)
 async def get_news(
     symbol: str,
+    request: Request,
+    response: Response,
     limit: int = Query(10, ge=1, le=50, description="Number of articles to return"),
     force_refresh: bool = Query(False, description="Force refresh cache")
 ):
@@ -88,159 +165,110 @@ async def get_news(
 
     Returns news articles with sentiment analysis.
     Uses OpenBB Platform for news data.
+    Supports conditional GET (ETag / If-None-Match, Last-Modified).
     """
     try:
-        articles_data = openbb_client.get_news(symbol.upper(), limit=limit, force_refresh=force_refresh)
+        key = f"news_{symbol.upper()}"
+        if not force_refresh and is_fresh(key):
+            cached_response = not_modified(request, entry_validators(key, f"limit={limit}"))
+            if cached_response is not None:
+                return cached_response
+
+        articles_data = await openbb_client.get_news_async(symbol.upper(), limit=limit, force_refresh=force_refresh)
 
         articles = [
             NewsArticle(**article) for article in articles_data
         ]
 
+        apply_headers(response, entry_validators(key, f"limit={limit}", value=articles_data))
         return NewsResponse(
             symbol=symbol.upper(),
             articles=articles,
             count=len(articles)
         )
 
+    except OverloadedError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching news: {str(e)}")
 
 
 @router.get("/summary", response_model=MarketSummary)
-async def get_market_summary(force_refresh: bool = Query(False, description="Force refresh cache")):
+async def get_market_summary(
+    request: Request,
+    force_refresh: bool = Query(False, description="Force refresh cache")
+):
     """
     Get overall market summary based on trending tickers.
 
     Analyzes technical indicators across trending symbols to determine
     market sentiment (bullish, bearish, neutral).
     Uses rule-based logic: RSI, MACD, SMA crossovers.
+    Served from the current market snapshot, rebuilt in the background
+    whenever trending data or indicators change. Supports conditional GET.
     """
     try:
-        # Get trending tickers
-        trending_data = stocktwits_client.get_trending_tickers(force_refresh=force_refresh)
+        snapshot = await market_snapshot.get(force_refresh=force_refresh)
 
-        if not trending_data:
+        if snapshot is None:
             raise HTTPException(status_code=503, detail="Unable to fetch trending data")
 
-        bullish_count = 0
-        bearish_count = 0
-        neutral_count = 0
-        top_movers = []
-
-        # Analyze each trending ticker
-        for ticker in trending_data[:10]:  # Analyze top 10
-            symbol = ticker['symbol']
-
-            # Get indicators
-            indicators = openbb_client.get_technical_indicators(symbol)
-
-            if not indicators or indicators.get('rsi') is None:
-                neutral_count += 1
-                continue
-
-            # Apply rule-based logic
-            sentiment = _analyze_ticker_sentiment(indicators)
-
-            if sentiment == 'bullish':
-                bullish_count += 1
-            elif sentiment == 'bearish':
-                bearish_count += 1
-            else:
-                neutral_count += 1
-
-            # Track top movers
-            top_movers.append({
-                'symbol': symbol,
-                'sentiment': sentiment,
-                'price': ticker.get('price', 0),
-                'change': ticker.get('percent_change', 0),
-                'rsi': indicators.get('rsi')
-            })
-
-        # Determine overall market sentiment
-        if bullish_count > bearish_count:
-            market_sentiment = 'bullish'
-        elif bearish_count > bullish_count:
-            market_sentiment = 'bearish'
-        else:
-            market_sentiment = 'neutral'
-
-        return MarketSummary(
-            market_sentiment=market_sentiment,
-            bullish_count=bullish_count,
-            bearish_count=bearish_count,
-            neutral_count=neutral_count,
-            top_movers=sorted(top_movers, key=lambda x: abs(x['change']), reverse=True)[:5],
-            last_updated=datetime.now().isoformat()
-        )
+        cache.record_prewarmed_hits(snapshot.prewarmed['summary'])
+        return encoded_response(request, snapshot.bodies['summary'], snapshot_validators(snapshot, "summary"))
 
-    except HTTPException:
+    except (HTTPException, OverloadedError):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating market summary: {str(e)}")
 
 
 @router.get("/scan", response_model=ScanResponse)
-async def scan_market(force_refresh: bool = Query(False, description="Force refresh cache")):
+async def scan_market(
+    request: Request,
+    force_refresh: bool = Query(False, description="Force refresh cache")
+):
     """
     Scan trending tickers and return top bullish/bearish setups.
 
     Analyzes all trending tickers using technical indicators and
     ranks them by signal strength. Returns top 5 bullish and top 5 bearish.
+    Served from the current market snapshot, like /api/summary.
+    Supports conditional GET.
     """
     try:
-        # Get trending tickers
-        trending_data = stocktwits_client.get_trending_tickers(force_refresh=force_refresh)
+        snapshot = await market_snapshot.get(force_refresh=force_refresh)
 
-        if not trending_data:
+        if snapshot is None:
             raise HTTPException(status_code=503, detail="Unable to fetch trending data")
 
-        bullish_setups = []
-        bearish_setups = []
-
-        # Scan each ticker
-        for ticker in trending_data:
-            symbol = ticker['symbol']
-
-            # Get indicators
-            indicators = openbb_client.get_technical_indicators(symbol)
+        cache.record_prewarmed_hits(snapshot.prewarmed['scan'])
+        return encoded_response(request, snapshot.bodies['scan'], snapshot_validators(snapshot, "scan"))
 
-            if not indicators or indicators.get('rsi') is None:
-                continue
-
-            # Calculate setup score and signals
-            score, signals, sentiment = _calculate_setup_score(indicators, ticker)
-
-            scan_signal = ScanSignal(
-                symbol=symbol,
-                score=score,
-                signals=signals,
-                price=ticker.get('price', 0),
-                rsi=indicators.get('rsi'),
-                macd=indicators.get('macd'),
-                percent_change=ticker.get('percent_change', 0)
-            )
+    except (HTTPException, OverloadedError):
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error scanning market: {str(e)}")
 
-            if sentiment == 'bullish':
-                bullish_setups.append(scan_signal)
-            elif sentiment == 'bearish':
-                bearish_setups.append(scan_signal)
 
-        # Sort by score and take top 5
-        bullish_setups.sort(key=lambda x: x.score, reverse=True)
-        bearish_setups.sort(key=lambda x: x.score, reverse=True)
+@router.get("/stream")
+async def stream_market_updates(last_event_id: Optional[str] = Header(None)):
+    """
+    Stream market snapshot updates as Server-Sent Events.
 
-        return ScanResponse(
-            bullish=bullish_setups[:config.MAX_SCAN_RESULTS],
-            bearish=bearish_setups[:config.MAX_SCAN_RESULTS],
-            total_scanned=len(trending_data),
-            last_updated=datetime.now().isoformat()
-        )
+    Sends a `snapshot` event with trending tickers, indicators, summary and
+    scan results, then a `delta` event per new snapshot version carrying
+    only the changed tickers/fields. Event ids are snapshot versions, so a
+    reconnecting client that already has the latest version skips the
+    initial snapshot.
+    """
+    if market_snapshot.current is None:
+        await market_snapshot.get()
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error scanning market: {str(e)}")
+    return StreamingResponse(
+        market_broadcaster.subscribe(last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.get("/health", response_model=HealthResponse)
@@ -254,123 +282,69 @@ async def health_check():
         status="healthy",
         openbb_available=openbb_client.is_available(),
         cache_stats=cache.get_stats(),
+        prewarm_stats=prewarm_scheduler.get_stats(),
+        stream_stats=market_broadcaster.get_stats(),
+        upstream_stats=get_upstream_stats(),
         timestamp=datetime.now().isoformat()
     )
 
 
-# Helper functions for sentiment analysis
+# Helper functions for bulk indicators
 
-def _analyze_ticker_sentiment(indicators: dict) -> str:
+def _parse_bulk_symbols(symbols: List[str]) -> List[str]:
     """
-    Analyze a ticker's sentiment based on technical indicators.
+    Normalize and validate the symbol list of a bulk indicators request.
 
-    Rules:
-    - Bullish: RSI 30-50, MACD > signal, price > SMA_50
-    - Bearish: RSI 50-70, MACD < signal, price < SMA_50
-    - Neutral: Otherwise
+    Symbols are stripped, upper-cased and de-duplicated in order.
 
-    Args:
-        indicators: Dictionary of technical indicators
-
-    Returns:
-        'bullish', 'bearish', or 'neutral'
+    Raises:
+        HTTPException: 400 if the list is empty or longer than config.MAX_BULK_SYMBOLS
     """
-    rsi = indicators.get('rsi')
-    macd = indicators.get('macd')
-    macd_signal = indicators.get('macd_signal')
-    price = indicators.get('price')
-    sma_50 = indicators.get('sma_50')
-
-    bullish_signals = 0
-    bearish_signals = 0
-
-    # RSI analysis
-    if rsi is not None:
-        if config.RSI_BULLISH_MIN <= rsi <= config.RSI_BULLISH_MAX:
-            bullish_signals += 1
-        elif config.RSI_BEARISH_MIN <= rsi <= config.RSI_BEARISH_MAX:
-            bearish_signals += 1
-        elif rsi < config.RSI_OVERSOLD:
-            bullish_signals += 2  # Strong oversold signal
-        elif rsi > config.RSI_OVERBOUGHT:
-            bearish_signals += 2  # Strong overbought signal
-
-    # MACD analysis
-    if macd is not None and macd_signal is not None:
-        if macd > macd_signal:
-            bullish_signals += 1
-        elif macd < macd_signal:
-            bearish_signals += 1
-
-    # SMA analysis
-    if price is not None and sma_50 is not None:
-        if price > sma_50:
-            bullish_signals += 1
-        elif price < sma_50:
-            bearish_signals += 1
-
-    if bullish_signals > bearish_signals:
-        return 'bullish'
-    elif bearish_signals > bullish_signals:
-        return 'bearish'
+    parsed = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+    if not parsed:
+        raise HTTPException(status_code=400, detail="At least one symbol is required")
+    if len(parsed) > config.MAX_BULK_SYMBOLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many symbols ({len(parsed)}); the limit is {config.MAX_BULK_SYMBOLS}"
+        )
+    return parsed
+
+
+def _indicator_line(symbol: str, indicators: Optional[dict]) -> str:
+    """Serialize one NDJSON line for the bulk indicators stream."""
+    if not indicators:
+        payload = {'symbol': symbol, 'error': 'Indicators unavailable'}
     else:
-        return 'neutral'
+        payload = indicators
+    return json.dumps(payload, separators=(',', ':')) + "\n"
 
 
-def _calculate_setup_score(indicators: dict, ticker: dict) -> tuple:
+async def _stream_indicator_lines(symbols: List[str], force_refresh: bool) -> AsyncIterator[str]:
     """
-    Calculate setup quality score (0-5) based on multiple signals.
-
-    Args:
-        indicators: Technical indicators
-        ticker: Ticker data from Stocktwits
+    Yield NDJSON lines for symbols in the order they become available.
 
-    Returns:
-        Tuple of (score, signals_list, sentiment)
+    Cached indicators are written immediately; the remaining symbols are
+    fetched in concurrent provider batches and written per batch with
+    asyncio.as_completed, so total time is bounded by the slowest batch.
     """
-    score = 0
-    signals = []
-    rsi = indicators.get('rsi')
-    macd = indicators.get('macd')
-    macd_signal = indicators.get('macd_signal')
-    price = indicators.get('price')
-    sma_20 = indicators.get('sma_20')
-    sma_50 = indicators.get('sma_50')
-
-    # RSI signals
-    if rsi is not None:
-        if rsi < config.RSI_OVERSOLD:
-            score += 1
-            signals.append(f"RSI oversold ({rsi:.1f})")
-        elif rsi > config.RSI_OVERBOUGHT:
-            score += 1
-            signals.append(f"RSI overbought ({rsi:.1f})")
-
-    # MACD signals
-    if macd is not None and macd_signal is not None:
-        if macd > macd_signal and macd > 0:
-            score += 1
-            signals.append("MACD bullish crossover")
-        elif macd < macd_signal and macd < 0:
-            score += 1
-            signals.append("MACD bearish crossover")
-
-    # SMA signals
-    if price is not None and sma_20 is not None and sma_50 is not None:
-        if price > sma_20 > sma_50:
-            score += 1
-            signals.append("Price above SMAs (bullish alignment)")
-        elif price < sma_20 < sma_50:
-            score += 1
-            signals.append("Price below SMAs (bearish alignment)")
-
-    # Volume surge
-    percent_change = abs(ticker.get('percent_change', 0))
-    if percent_change > 5:
-        score += 1
-        signals.append(f"Strong momentum ({percent_change:.1f}%)")
-
-    # Determine sentiment
-    sentiment = _analyze_ticker_sentiment(indicators)
-
-    return score, signals, sentiment
+    pending = []
+    for symbol in symbols:
+        cached = None if force_refresh and cache.refresh_allowed(f"indicators_{symbol}") else cache.get(f"indicators_{symbol}")
+        if cached is not None:
+            yield _indicator_line(symbol, cached)
+        else:
+            pending.append(symbol)
+
+    if not pending:
+        return
+
+    semaphore = asyncio.Semaphore(config.SCAN_CONCURRENCY)
+
+    async def fetch(batch: List[str]):
+        return batch, await fetch_indicator_batch(batch, semaphore, force_refresh)
+
+    for next_done in asyncio.as_completed([fetch(batch) for batch in symbol_batches(pending)]):
+        batch, results = await next_done
+        for symbol in batch:
+            yield _indicator_line(symbol, results.get(symbol))
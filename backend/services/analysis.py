@@ -0,0 +1,238 @@
+"""
+Rule-based market analysis.
+Turns technical indicators for trending tickers into per-ticker sentiment,
+setup scores, a market summary and scan results.
+"""
+
+from typing import Any, Dict, List, Optional
+import config
+
+
+def analyze_ticker_sentiment(indicators: dict) -> str:
+    """
+    Analyze a ticker's sentiment based on technical indicators.
+
+    Rules:
+    - Bullish: RSI 30-50, MACD > signal, price > SMA_50
+    - Bearish: RSI 50-70, MACD < signal, price < SMA_50
+    - Neutral: Otherwise
+
+    Args:
+        indicators: Dictionary of technical indicators
+
+    Returns:
+        'bullish', 'bearish', or 'neutral'
+    """
+    rsi = indicators.get('rsi')
+    macd = indicators.get('macd')
+    macd_signal = indicators.get('macd_signal')
+    price = indicators.get('price')
+    sma_50 = indicators.get('sma_50')
+
+    bullish_signals = 0
+    bearish_signals = 0
+
+    # RSI analysis
+    if rsi is not None:
+        if config.RSI_BULLISH_MIN <= rsi <= config.RSI_BULLISH_MAX:
+            bullish_signals += 1
+        elif config.RSI_BEARISH_MIN <= rsi <= config.RSI_BEARISH_MAX:
+            bearish_signals += 1
+        elif rsi < config.RSI_OVERSOLD:
+            bullish_signals += 2  # Strong oversold signal
+        elif rsi > config.RSI_OVERBOUGHT:
+            bearish_signals += 2  # Strong overbought signal
+
+    # MACD analysis
+    if macd is not None and macd_signal is not None:
+        if macd > macd_signal:
+            bullish_signals += 1
+        elif macd < macd_signal:
+            bearish_signals += 1
+
+    # SMA analysis
+    if price is not None and sma_50 is not None:
+        if price > sma_50:
+            bullish_signals += 1
+        elif price < sma_50:
+            bearish_signals += 1
+
+    if bullish_signals > bearish_signals:
+        return 'bullish'
+    elif bearish_signals > bullish_signals:
+        return 'bearish'
+    else:
+        return 'neutral'
+
+
+def calculate_setup_score(indicators: dict, ticker: dict) -> tuple:
+    """
+    Calculate setup quality score (0-5) based on multiple signals.
+
+    Args:
+        indicators: Technical indicators
+        ticker: Ticker data from Stocktwits
+
+    Returns:
+        Tuple of (score, signals_list, sentiment)
+    """
+    score = 0
+    signals = []
+    rsi = indicators.get('rsi')
+    macd = indicators.get('macd')
+    macd_signal = indicators.get('macd_signal')
+    price = indicators.get('price')
+    sma_20 = indicators.get('sma_20')
+    sma_50 = indicators.get('sma_50')
+
+    # RSI signals
+    if rsi is not None:
+        if rsi < config.RSI_OVERSOLD:
+            score += 1
+            signals.append(f"RSI oversold ({rsi:.1f})")
+        elif rsi > config.RSI_OVERBOUGHT:
+            score += 1
+            signals.append(f"RSI overbought ({rsi:.1f})")
+
+    # MACD signals
+    if macd is not None and macd_signal is not None:
+        if macd > macd_signal and macd > 0:
+            score += 1
+            signals.append("MACD bullish crossover")
+        elif macd < macd_signal and macd < 0:
+            score += 1
+            signals.append("MACD bearish crossover")
+
+    # SMA signals
+    if price is not None and sma_20 is not None and sma_50 is not None:
+        if price > sma_20 > sma_50:
+            score += 1
+            signals.append("Price above SMAs (bullish alignment)")
+        elif price < sma_20 < sma_50:
+            score += 1
+            signals.append("Price below SMAs (bearish alignment)")
+
+    # Volume surge
+    percent_change = abs(ticker.get('percent_change', 0))
+    if percent_change > 5:
+        score += 1
+        signals.append(f"Strong momentum ({percent_change:.1f}%)")
+
+    # Determine sentiment
+    sentiment = analyze_ticker_sentiment(indicators)
+
+    return score, signals, sentiment
+
+
+def build_summary(trending: List[dict], indicators_by_symbol: Dict[str, Optional[dict]]) -> Dict[str, Any]:
+    """
+    Summarize market sentiment over the top 10 trending tickers.
+
+    Args:
+        trending: Trending tickers from Stocktwits
+        indicators_by_symbol: Dictionary of symbol -> indicators (or None)
+
+    Returns:
+        Dictionary with market_sentiment, bullish/bearish/neutral counts
+        and top_movers
+    """
+    bullish_count = 0
+    bearish_count = 0
+    neutral_count = 0
+    top_movers = []
+
+    # Analyze each trending ticker
+    for ticker in trending[:10]:  # Analyze top 10
+        symbol = ticker['symbol']
+        indicators = indicators_by_symbol.get(symbol)
+
+        if not indicators or indicators.get('rsi') is None:
+            neutral_count += 1
+            continue
+
+        # Apply rule-based logic
+        sentiment = analyze_ticker_sentiment(indicators)
+
+        if sentiment == 'bullish':
+            bullish_count += 1
+        elif sentiment == 'bearish':
+            bearish_count += 1
+        else:
+            neutral_count += 1
+
+        # Track top movers
+        top_movers.append({
+            'symbol': symbol,
+            'sentiment': sentiment,
+            'price': ticker.get('price', 0),
+            'change': ticker.get('percent_change', 0),
+            'rsi': indicators.get('rsi')
+        })
+
+    # Determine overall market sentiment
+    if bullish_count > bearish_count:
+        market_sentiment = 'bullish'
+    elif bearish_count > bullish_count:
+        market_sentiment = 'bearish'
+    else:
+        market_sentiment = 'neutral'
+
+    return {
+        'market_sentiment': market_sentiment,
+        'bullish_count': bullish_count,
+        'bearish_count': bearish_count,
+        'neutral_count': neutral_count,
+        'top_movers': sorted(top_movers, key=lambda x: abs(x['change']), reverse=True)[:5]
+    }
+
+
+def build_scan(trending: List[dict], indicators_by_symbol: Dict[str, Optional[dict]]) -> Dict[str, Any]:
+    """
+    Rank trending tickers into top bullish and bearish setups.
+
+    Args:
+        trending: Trending tickers from Stocktwits
+        indicators_by_symbol: Dictionary of symbol -> indicators (or None)
+
+    Returns:
+        Dictionary with bullish and bearish lists of scan signal dicts
+        (top config.MAX_SCAN_RESULTS each) and total_scanned
+    """
+    bullish_setups = []
+    bearish_setups = []
+
+    # Scan each ticker
+    for ticker in trending:
+        symbol = ticker['symbol']
+        indicators = indicators_by_symbol.get(symbol)
+
+        if not indicators or indicators.get('rsi') is None:
+            continue
+
+        # Calculate setup score and signals
+        score, signals, sentiment = calculate_setup_score(indicators, ticker)
+
+        scan_signal = {
+            'symbol': symbol,
+            'score': score,
+            'signals': signals,
+            'price': ticker.get('price', 0),
+            'rsi': indicators.get('rsi'),
+            'macd': indicators.get('macd'),
+            'percent_change': ticker.get('percent_change', 0)
+        }
+
+        if sentiment == 'bullish':
+            bullish_setups.append(scan_signal)
+        elif sentiment == 'bearish':
+            bearish_setups.append(scan_signal)
+
+    # Sort by score and take top 5
+    bullish_setups.sort(key=lambda x: x['score'], reverse=True)
+    bearish_setups.sort(key=lambda x: x['score'], reverse=True)
+
+    return {
+        'bullish': bullish_setups[:config.MAX_SCAN_RESULTS],
+        'bearish': bearish_setups[:config.MAX_SCAN_RESULTS],
+        'total_scanned': len(trending)
+    }
@@ -0,0 +1,297 @@
+"""
+Incremental store of daily OHLCV bars per symbol.
+Remembers what has been downloaded and only asks the provider for missing dates.
+"""
+
+import os
+import sqlite3
+from collections import OrderedDict
+from datetime import date, timedelta
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Tuple
+import pandas as pd
+import config
+
+
+BAR_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+# fetcher(symbol, start_date, end_date) -> DataFrame indexed by date, or None
+HistoryFetcher = Callable[[str, date, date], Optional[pd.DataFrame]]
+# batch fetcher(symbols, start_date, end_date) -> {symbol: DataFrame}
+BatchHistoryFetcher = Callable[[List[str], date, date], Dict[str, pd.DataFrame]]
+
+
+class BarStore:
+    """
+    Per-symbol daily bar cache backed by SQLite.
+
+    For each symbol it records the date range already downloaded. A request
+    for a window inside that range only re-fetches from the last stored bar
+    (which may have been an intraday partial) to today; bars are merged and
+    de-duplicated by date, newest download wins.
+
+    Bars of the max_symbols most recently used symbols are kept in memory;
+    older ones are dropped from memory and re-read from SQLite when needed.
+    """
+
+    def __init__(
+        self,
+        db_path: str = config.CACHE_DB_PATH,
+        max_bars: int = config.BAR_STORE_MAX_BARS,
+        max_symbols: int = config.BAR_STORE_MAX_SYMBOLS
+    ):
+        self.db_path = db_path
+        self.max_bars = max_bars
+        self.max_symbols = max_symbols
+        # symbol -> (bars, coverage), least recently used first
+        self._frames: "OrderedDict[str, Tuple[pd.DataFrame, Tuple[date, date]]]" = OrderedDict()
+        self._lock = Lock()
+        self._symbol_locks: Dict[str, Lock] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._stats = {'full_fetches': 0, 'incremental_fetches': 0, 'batch_fetches': 0, 'rows_downloaded': 0}
+
+    def _get_conn(self) -> Optional[sqlite3.Connection]:
+        """Open the bar database on first use (caller must hold self._lock)."""
+        if self._conn is None:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+                conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS bars (
+                        symbol TEXT NOT NULL,
+                        date TEXT NOT NULL,
+                        open REAL, high REAL, low REAL, close REAL, volume REAL,
+                        PRIMARY KEY (symbol, date)
+                    )
+                    """
+                )
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS bar_coverage (
+                        symbol TEXT PRIMARY KEY,
+                        start_date TEXT NOT NULL,
+                        end_date TEXT NOT NULL
+                    )
+                    """
+                )
+                conn.commit()
+                self._conn = conn
+            except sqlite3.Error as e:
+                print(f"Bar store persistence disabled, cannot open {self.db_path}: {e}")
+        return self._conn
+
+    def _symbol_lock(self, symbol: str) -> Lock:
+        with self._lock:
+            lock = self._symbol_locks.get(symbol)
+            if lock is None:
+                lock = self._symbol_locks[symbol] = Lock()
+            return lock
+
+    def get_bars(self, symbol: str, start_date: date, end_date: date, fetcher: HistoryFetcher) -> Optional[pd.DataFrame]:
+        """
+        Return daily bars for symbol between start_date and end_date.
+
+        Args:
+            symbol: Ticker symbol
+            start_date: First date of the window
+            end_date: Last date of the window (usually today)
+            fetcher: Downloads bars for a date range from the provider
+
+        Returns:
+            DataFrame indexed by date with open/high/low/close/volume columns,
+            or None if nothing could be loaded
+        """
+        with self._symbol_lock(symbol):
+            fetch_start = self._plan(symbol, start_date, end_date)
+            downloaded = fetcher(symbol, fetch_start, end_date)
+            return self._apply(symbol, downloaded, fetch_start, start_date, end_date)
+
+    def get_bars_batch(
+        self,
+        symbols: List[str],
+        start_date: date,
+        end_date: date,
+        fetcher: BatchHistoryFetcher
+    ) -> Dict[str, Optional[pd.DataFrame]]:
+        """
+        Return daily bars for many symbols with as few provider calls as possible.
+
+        Symbols needing the same fetch window (a full history, or the same
+        incremental start date) are downloaded together in one fetcher call.
+        As with get_bars, fetcher errors propagate: stored bars are not
+        returned as current when the download failed.
+
+        Args:
+            symbols: Ticker symbols
+            start_date: First date of the window
+            end_date: Last date of the window (usually today)
+            fetcher: Downloads bars for several symbols and one date range
+
+        Returns:
+            Dictionary of symbol -> DataFrame (or None if nothing could be loaded)
+        """
+        groups: Dict[date, List[str]] = {}
+        for symbol in dict.fromkeys(symbols):
+            with self._symbol_lock(symbol):
+                groups.setdefault(self._plan(symbol, start_date, end_date), []).append(symbol)
+
+        results: Dict[str, Optional[pd.DataFrame]] = {}
+        for fetch_start, group in groups.items():
+            self._stats['batch_fetches'] += 1
+            downloaded = fetcher(group, fetch_start, end_date)
+            for symbol in group:
+                with self._symbol_lock(symbol):
+                    results[symbol] = self._apply(symbol, downloaded.get(symbol), fetch_start, start_date, end_date)
+        return results
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get fetch counters and number of symbols held in memory."""
+        with self._lock:
+            symbols = len(self._frames)
+        return {'symbols': symbols, **self._stats}
+
+    def _plan(self, symbol: str, start_date: date, end_date: date) -> date:
+        """Decide the first date to download for a symbol (caller holds its lock)."""
+        frame, coverage = self._load(symbol)
+
+        if frame is None or coverage is None or start_date < coverage[0]:
+            self._stats['full_fetches'] += 1
+            return start_date
+
+        # Re-fetch the last stored bar too: it may have been a partial day
+        self._stats['incremental_fetches'] += 1
+        return min(frame.index[-1], end_date) if not frame.empty else coverage[1]
+
+    def _apply(
+        self,
+        symbol: str,
+        downloaded: Optional[pd.DataFrame],
+        fetch_start: date,
+        start_date: date,
+        end_date: date
+    ) -> Optional[pd.DataFrame]:
+        """Merge downloaded bars into the store and return the requested window (caller holds the lock)."""
+        frame, coverage = self._load(symbol)
+
+        if downloaded is not None and not downloaded.empty:
+            downloaded = self._normalize(downloaded)
+            self._stats['rows_downloaded'] += len(downloaded)
+            frame = downloaded if frame is None else self._merge(frame, downloaded)
+            new_start = fetch_start if coverage is None else min(coverage[0], fetch_start)
+            if len(frame) >= self.max_bars:
+                # Oldest bars were trimmed; coverage now starts at the first kept bar
+                new_start = max(new_start, frame.index[0])
+            coverage = (new_start, end_date)
+            self._save(symbol, frame, downloaded, coverage)
+        elif frame is None:
+            return None
+
+        return frame[frame.index >= start_date].copy()
+
+    def _load(self, symbol: str) -> Tuple[Optional[pd.DataFrame], Optional[Tuple[date, date]]]:
+        """Return the symbol's bars and coverage from memory or disk."""
+        with self._lock:
+            cached = self._frames.get(symbol)
+            if cached is not None:
+                self._frames.move_to_end(symbol)
+                return cached
+
+            conn = self._get_conn()
+            if conn is None:
+                return None, None
+            try:
+                row = conn.execute(
+                    "SELECT start_date, end_date FROM bar_coverage WHERE symbol = ?", (symbol,)
+                ).fetchone()
+                if row is None:
+                    return None, None
+                rows = conn.execute(
+                    "SELECT date, open, high, low, close, volume FROM bars WHERE symbol = ? ORDER BY date",
+                    (symbol,)
+                ).fetchall()
+            except sqlite3.Error as e:
+                print(f"Error reading bars for {symbol}: {e}")
+                return None, None
+
+        if not rows:
+            return None, None
+
+        frame = pd.DataFrame(rows, columns=['date'] + BAR_COLUMNS)
+        frame['date'] = pd.to_datetime(frame['date']).dt.date
+        # Missing values were stored as NULL
+        frame = frame.set_index('date').astype(float)
+        coverage = (date.fromisoformat(row[0]), date.fromisoformat(row[1]))
+
+        self._remember(symbol, frame, coverage)
+        return frame, coverage
+
+    def _remember(self, symbol: str, frame: pd.DataFrame, coverage: Tuple[date, date]) -> None:
+        """Keep a symbol's bars in memory, evicting the least recently used beyond max_symbols."""
+        with self._lock:
+            self._frames[symbol] = (frame, coverage)
+            self._frames.move_to_end(symbol)
+            while len(self._frames) > self.max_symbols:
+                self._frames.popitem(last=False)
+
+    def _save(self, symbol: str, frame: pd.DataFrame, downloaded: pd.DataFrame, coverage: Tuple[date, date]) -> None:
+        """Keep the merged bars in memory and upsert the downloaded rows to disk."""
+        self._remember(symbol, frame, coverage)
+
+        with self._lock:
+            conn = self._get_conn()
+            if conn is None:
+                return
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO bars (symbol, date, open, high, low, close, volume) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        [
+                            (symbol, bar_date.isoformat(), *(None if pd.isna(value) else float(value) for value in row))
+                            for bar_date, row in downloaded[BAR_COLUMNS].iterrows()
+                        ]
+                    )
+                    conn.execute(
+                        "DELETE FROM bars WHERE symbol = ? AND date < ?",
+                        (symbol, frame.index[0].isoformat())
+                    )
+                    conn.execute(
+                        "INSERT OR REPLACE INTO bar_coverage (symbol, start_date, end_date) VALUES (?, ?, ?)",
+                        (symbol, coverage[0].isoformat(), coverage[1].isoformat())
+                    )
+            except sqlite3.Error as e:
+                print(f"Error saving bars for {symbol}: {e}")
+
+    def _merge(self, frame: pd.DataFrame, downloaded: pd.DataFrame) -> pd.DataFrame:
+        """Combine stored and new bars, newest values winning, capped at max_bars."""
+        merged = pd.concat([frame, downloaded])
+        merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+        return merged.iloc[-self.max_bars:]
+
+    @staticmethod
+    def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Index provider output by calendar date and keep only OHLCV columns.
+
+        Columns the provider did not return (e.g. volume for some
+        instruments) are added as NaN, so every frame has BAR_COLUMNS.
+        """
+        df = df.copy()
+        if 'date' in df.columns:
+            df = df.set_index('date')
+        df.index = pd.to_datetime(df.index).date
+        df.index.name = 'date'
+        df = df.reindex(columns=BAR_COLUMNS).astype(float)
+        df = df[~df.index.duplicated(keep='last')].sort_index()
+        return df
+
+
+def history_window(days: int = config.BAR_HISTORY_DAYS) -> Tuple[date, date]:
+    """Return the (start, end) dates of the indicator lookback window ending today."""
+    end_date = date.today()
+    return end_date - timedelta(days=days), end_date
+
+
+# Global bar store instance
+bar_store = BarStore()
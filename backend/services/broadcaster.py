@@ -0,0 +1,195 @@
+"""
+Server-Sent Events broadcaster for market snapshot updates.
+Pushes the current snapshot to new subscribers, then only what changed.
+"""
+
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+import config
+from services.market_snapshot import MarketSnapshot, VOLATILE_FIELDS
+
+
+class MarketBroadcaster:
+    """
+    Fan-out of snapshot updates to SSE subscribers.
+
+    Each update is serialized once into an SSE frame (bytes) and the same
+    frame is queued for every subscriber, so the cost of publishing does
+    not depend on payload size times subscriber count. Idle subscribers
+    are just coroutines parked on their queue; a single heartbeat task
+    keeps connections alive through proxies.
+
+    A subscriber that falls config.STREAM_QUEUE_SIZE frames behind has its
+    backlog replaced by one full snapshot frame, so it resyncs instead of
+    growing memory without bound.
+    """
+
+    def __init__(
+        self,
+        queue_size: int = config.STREAM_QUEUE_SIZE,
+        heartbeat_seconds: float = config.STREAM_HEARTBEAT_SECONDS
+    ):
+        self.queue_size = queue_size
+        self.heartbeat_seconds = heartbeat_seconds
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._snapshot_frame: Optional[bytes] = None
+        self._version: Optional[int] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._stats = {'events_published': 0, 'resyncs': 0}
+
+    def on_snapshot(self, previous: Optional[MarketSnapshot], current: MarketSnapshot) -> None:
+        """
+        Snapshot listener: publish a delta (or a full snapshot) for a new version.
+
+        Args:
+            previous: Snapshot that was replaced (None on the first build)
+            current: Newly published snapshot
+        """
+        self._snapshot_frame = _frame('snapshot', current.version, _snapshot_payload(current))
+        self._version = current.version
+
+        if previous is None:
+            self._publish(self._snapshot_frame)
+        else:
+            self._publish(_frame('delta', current.version, _delta_payload(previous, current)))
+
+    def _publish(self, frame: bytes) -> None:
+        """Queue one pre-serialized frame for every subscriber."""
+        self._stats['events_published'] += 1
+        for queue in self._subscribers:
+            if queue.full():
+                self._resync(queue)
+            else:
+                queue.put_nowait(frame)
+
+    def _resync(self, queue: asyncio.Queue) -> None:
+        """Replace a lagging subscriber's backlog with the full snapshot."""
+        while not queue.empty():
+            queue.get_nowait()
+        if self._snapshot_frame is not None:
+            queue.put_nowait(self._snapshot_frame)
+        self._stats['resyncs'] += 1
+
+    async def subscribe(self, last_event_id: Optional[str] = None) -> AsyncIterator[bytes]:
+        """
+        Yield SSE frames for one subscriber until it disconnects.
+
+        The first frame is the current snapshot unless the client already
+        has it (its Last-Event-ID equals the current version).
+
+        Args:
+            last_event_id: Value of the client's Last-Event-ID header, if any
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        if self._snapshot_frame is not None and last_event_id != str(self._version):
+            queue.put_nowait(self._snapshot_frame)
+        self._subscribers.add(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._subscribers.discard(queue)
+
+    async def run_heartbeat(self) -> None:
+        """Send an SSE comment to idle subscribers every heartbeat interval."""
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            for queue in self._subscribers:
+                # Only idle connections need it; heartbeats must never fill a queue
+                if queue.empty():
+                    queue.put_nowait(b": keep-alive\n\n")
+
+    def start(self) -> None:
+        """Start the heartbeat task on the running event loop."""
+        if self._heartbeat_task is None or self._heartbeat_task.done():
+            self._heartbeat_task = asyncio.get_running_loop().create_task(self.run_heartbeat())
+
+    async def stop(self) -> None:
+        """Cancel the heartbeat task, if running."""
+        task, self._heartbeat_task = self._heartbeat_task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get subscriber count and publish counters."""
+        return {
+            'subscribers': len(self._subscribers),
+            'version': self._version,
+            **self._stats
+        }
+
+
+def _frame(event: str, version: int, payload: Dict[str, Any]) -> bytes:
+    """Serialize one SSE frame; the version doubles as the event id."""
+    data = json.dumps(payload, separators=(',', ':'), default=str)
+    return f"event: {event}\nid: {version}\ndata: {data}\n\n".encode('utf-8')
+
+
+def _snapshot_payload(snapshot: MarketSnapshot) -> Dict[str, Any]:
+    """Full snapshot payload sent to new subscribers."""
+    return {
+        'version': snapshot.version,
+        'trending': list(snapshot.trending),
+        'indicators': dict(snapshot.indicators),
+        'summary': snapshot.summary.model_dump(),
+        'scan': snapshot.scan.model_dump()
+    }
+
+
+def _delta_payload(previous: MarketSnapshot, current: MarketSnapshot) -> Dict[str, Any]:
+    """
+    Changes between two snapshots.
+
+    Tickers and indicators are reported per symbol with only the changed
+    fields (new symbols in full) plus the symbols that were removed.
+    Summary and scan are included whole, and only when they changed.
+    Changes to VOLATILE_FIELDS alone (timestamps) are not reported.
+    """
+    old_trending = {ticker['symbol']: ticker for ticker in previous.trending}
+    new_trending = {ticker['symbol']: ticker for ticker in current.trending}
+
+    payload: Dict[str, Any] = {
+        'version': current.version,
+        'previous_version': previous.version,
+        'trending': _diff_records(old_trending, new_trending),
+        'indicators': _diff_records(dict(previous.indicators), dict(current.indicators)),
+    }
+    if list(old_trending) != list(new_trending):
+        payload['trending']['order'] = list(new_trending)
+
+    for name in ('summary', 'scan'):
+        old_model, new_model = getattr(previous, name), getattr(current, name)
+        if old_model.model_dump(exclude=VOLATILE_FIELDS) != new_model.model_dump(exclude=VOLATILE_FIELDS):
+            payload[name] = new_model.model_dump()
+    return payload
+
+
+def _diff_records(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Per-key field changes between two symbol -> record mappings.
+
+    A record whose only changes are VOLATILE_FIELDS is left out; one with
+    real changes carries its new timestamps along with them.
+    """
+    changed: Dict[str, Any] = {}
+    for symbol, record in new.items():
+        previous = old.get(symbol)
+        if not previous or not record:
+            if previous != record:
+                changed[symbol] = record
+            continue
+        fields = {key: value for key, value in record.items() if previous.get(key) != value}
+        if not fields.keys() <= VOLATILE_FIELDS:
+            changed[symbol] = fields
+
+    removed: List[str] = [symbol for symbol in old if symbol not in new]
+    return {'changed': changed, 'removed': removed}
+
+
+# Global broadcaster instance
+market_broadcaster = MarketBroadcaster()
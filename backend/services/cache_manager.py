@@ -3,23 +3,262 @@ In-memory cache manager with TTL support.
 Thread-safe implementation for caching API responses.
 """
 
+import asyncio
+import contextvars
+import heapq
+import sys
 import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from threading import Lock
-from typing import Any, Optional, Dict
+from typing import Any, Awaitable, Callable, Optional, Dict, List, Set, Tuple
 from datetime import datetime, timedelta
 import config
 
 
+# Origin recorded on entries written in the current context: REQUEST_ORIGIN by
+# default, PREWARM_ORIGIN inside the pre-warm scheduler (services.prewarm) and
+# SNAPSHOT_ORIGIN while a market snapshot is built (services.market_snapshot).
+# Only hits in request context count as prewarmed_hits.
+REQUEST_ORIGIN = 'request'
+PREWARM_ORIGIN = 'prewarm'
+SNAPSHOT_ORIGIN = 'snapshot'
+cache_origin: contextvars.ContextVar[str] = contextvars.ContextVar('cache_origin', default=REQUEST_ORIGIN)
+
+
+def _estimate_size(value: Any, _seen: Optional[Set[int]] = None) -> int:
+    """
+    Approximate the memory footprint of a cached value in bytes.
+
+    Walks dicts, lists, tuples and sets recursively; good enough for the
+    JSON-like payloads this cache holds.
+    """
+    if _seen is None:
+        _seen = set()
+    if id(value) in _seen:
+        return 0
+    _seen.add(id(value))
+
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_estimate_size(k, _seen) + _estimate_size(v, _seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_estimate_size(item, _seen) for item in value)
+    return size
+
+
+class _FrequencySketch:
+    """
+    Count-min sketch of key access frequency (TinyLFU admission).
+
+    Counters saturate at 15 and are halved after every sample_size
+    increments, so the sketch tracks recent popularity in fixed memory.
+    """
+
+    _DEPTH = 4
+    _MAX_COUNT = 15
+
+    def __init__(self, capacity: int):
+        width = 1
+        while width < max(capacity, 16) * 2:
+            width <<= 1
+        self._mask = width - 1
+        self._rows = [bytearray(width) for _ in range(self._DEPTH)]
+        self._sample_size = max(capacity, 16) * 10
+        self._additions = 0
+
+    def _indexes(self, key: str):
+        for seed in range(self._DEPTH):
+            yield seed, hash((seed, key)) & self._mask
+
+    def increment(self, key: str) -> None:
+        """Record one access to key."""
+        for row, index in self._indexes(key):
+            if self._rows[row][index] < self._MAX_COUNT:
+                self._rows[row][index] += 1
+
+        self._additions += 1
+        if self._additions >= self._sample_size:
+            self._additions = 0
+            for row in self._rows:
+                for i in range(len(row)):
+                    row[i] >>= 1
+
+    def frequency(self, key: str) -> int:
+        """Estimated recent access count for key."""
+        return min(self._rows[row][index] for row, index in self._indexes(key))
+
+
+class _SharedEntry:
+    """Marker for a load result that is already a full entry from the shared store."""
+
+    __slots__ = ('entry',)
+
+    def __init__(self, entry: Dict[str, Any]):
+        self.entry = entry
+
+
+class _CacheShard:
+    """
+    One lock stripe of the cache: its own entries, LRU order, byte count,
+    expiry heap, admission sketch, in-flight loads and counters.
+    """
+
+    # Heaps smaller than this are never compacted
+    HEAP_COMPACT_MIN = 64
+
+    def __init__(self, max_entries: int, max_bytes: int, eviction_policy: str):
+        self.lock = Lock()
+        # Ordered from least to most recently used
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.sketch = _FrequencySketch(max_entries) if eviction_policy == 'tinylfu' else None
+        # Min-heap of (retain_until, seq, key); items for replaced or evicted
+        # entries are skipped lazily when popped, and dropped in bulk by
+        # compact_heap once they outnumber the live ones
+        self.expiry_heap: List[Tuple[float, int, str]] = []
+        self.next_seq = 0
+        # One Future per key currently being loaded (single-flight)
+        self.inflight: Dict[str, Future] = {}
+        self.stats = dict.fromkeys(CacheManager.COUNTERS, 0)
+
+    def record_access(self, key: str) -> None:
+        """Feed the admission sketch (caller must hold the lock)."""
+        if self.sketch is not None:
+            self.sketch.increment(key)
+
+    def record_hit_origin(self, entry: Dict[str, Any]) -> None:
+        """Count a request served from an entry the pre-warm scheduler wrote."""
+        if entry.get('origin') == PREWARM_ORIGIN and cache_origin.get() == REQUEST_ORIGIN:
+            self.stats['prewarmed_hits'] += 1
+
+    def admit(self, key: str, size: int) -> bool:
+        """
+        Decide whether a value may be stored (caller must hold the lock).
+
+        Replacing an existing key is always allowed. Values larger than the
+        whole byte budget never are. Under 'tinylfu', a new key competes
+        with the LRU victim on recent access frequency when the shard is full.
+        """
+        if size > self.max_bytes:
+            return False
+        if key in self.entries or self.sketch is None:
+            return True
+        if len(self.entries) < self.max_entries and self.total_bytes + size <= self.max_bytes:
+            return True
+
+        victim_key = next(iter(self.entries))
+        return self.sketch.frequency(key) > self.sketch.frequency(victim_key)
+
+    def schedule_expiry(self, key: str, entry: Dict[str, Any]) -> None:
+        """Push an entry's retain_until deadline (caller must hold the lock)."""
+        heapq.heappush(self.expiry_heap, (entry['retain_until'], entry['seq'], key))
+
+    def compact_heap(self) -> None:
+        """
+        Rebuild the expiry heap from live entries if it has grown past
+        twice their number (caller must hold the lock).
+
+        Replaced and evicted entries leave items behind that are otherwise
+        only dropped at their retain_until, so a busy shard's heap would
+        grow without bound. Rebuilding is O(n), at most once per n pushes.
+        """
+        if len(self.expiry_heap) <= max(2 * len(self.entries), self.HEAP_COMPACT_MIN):
+            return
+        self.expiry_heap = [(entry['retain_until'], entry['seq'], key) for key, entry in self.entries.items()]
+        heapq.heapify(self.expiry_heap)
+
+    def evict_over_budget(self) -> None:
+        """Evict least recently used entries until within budget (caller must hold the lock)."""
+        while self.entries and (len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes):
+            _, entry = self.entries.popitem(last=False)
+            self.total_bytes -= entry['size']
+            self.stats['evictions'] += 1
+
+
 class CacheManager:
     """
     Simple in-memory cache with time-to-live (TTL) support.
     Thread-safe for concurrent access.
+
+    The cache is bounded by entry count and by an approximate byte budget.
+    Least recently used entries are evicted first; with the 'tinylfu'
+    policy a new key is only admitted when it has been requested more
+    often recently than the entry it would evict.
+
+    Each entry has three deadlines:
+    - expires_at (soft TTL): served as fresh until then
+    - stale_until (hard TTL): served immediately while a background
+      refresh runs
+    - retain_until: kept only as a fallback for when the upstream fails
+
+    force_refresh is honoured at most once per force_refresh_min_seconds
+    per key: younger entries are served as normal hits, and concurrent
+    refreshes of one key share a single load.
+
+    Entries are removed at retain_until by a background timer that pops
+    a deadline-ordered heap in small batches (see expire_due).
+
+    Keys are spread over independently locked shards by hash, so threads
+    touching different keys rarely contend. Entry and byte limits are
+    split evenly across shards.
     """
 
-    def __init__(self, ttl_seconds: int = config.CACHE_TTL_SECONDS):
-        self._cache: Dict[str, Dict[str, Any]] = {}
-        self._lock = Lock()
+    COUNTERS = (
+        'hits',
+        'misses',
+        'stale_served',
+        'fallback_served',
+        'evictions',
+        'admission_rejections',
+        'expired',
+        'prewarmed_hits',
+        'refreshes_throttled'
+    )
+
+    def __init__(
+        self,
+        ttl_seconds: int = config.CACHE_TTL_SECONDS,
+        stale_ttl_seconds: int = config.CACHE_STALE_TTL_SECONDS,
+        retention_seconds: int = config.CACHE_FALLBACK_RETENTION_SECONDS,
+        max_entries: int = config.CACHE_MAX_ENTRIES,
+        max_bytes: int = config.CACHE_MAX_BYTES,
+        eviction_policy: str = config.CACHE_EVICTION_POLICY,
+        shard_count: int = config.CACHE_SHARDS,
+        force_refresh_min_seconds: float = config.FORCE_REFRESH_MIN_INTERVAL_SECONDS
+    ):
+        if eviction_policy not in ('lru', 'tinylfu'):
+            raise ValueError(f"Unknown cache eviction policy: {eviction_policy}")
+
         self.ttl_seconds = ttl_seconds
+        self.stale_ttl_seconds = stale_ttl_seconds
+        self.retention_seconds = retention_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.eviction_policy = eviction_policy
+        self.force_refresh_min_seconds = force_refresh_min_seconds
+        self._shards = [
+            _CacheShard(
+                max(1, max_entries // shard_count),
+                max(1, max_bytes // shard_count),
+                eviction_policy
+            )
+            for _ in range(shard_count)
+        ]
+        self._expiry_task: Optional[asyncio.Task] = None
+        self._l2: Optional[Any] = None
+        self._shared: Optional[Any] = None
+        self._background_tasks: Set[asyncio.Task] = set()
+        self._refresh_executor = ThreadPoolExecutor(
+            max_workers=config.CACHE_REFRESH_WORKERS,
+            thread_name_prefix="cache-refresh"
+        )
+
+    def _shard_for(self, key: str) -> _CacheShard:
+        """Return the shard that owns key."""
+        return self._shards[hash(key) % len(self._shards)]
 
     def get(self, key: str) -> Optional[Any]:
         """
@@ -29,38 +268,662 @@ class CacheManager:
             key: Cache key
 
         Returns:
-            Cached value if valid, None if expired or not found
+            Cached value if fresh, None if past its soft TTL or not found
         """
-        with self._lock:
-            if key not in self._cache:
+        shard = self._shard_for(key)
+        with shard.lock:
+            shard.record_access(key)
+            entry = shard.entries.get(key)
+            if entry is None or time.time() > entry['expires_at']:
                 return None
 
-            entry = self._cache[key]
+            shard.entries.move_to_end(key)
+            shard.record_hit_origin(entry)
+            return entry['value']
+
+    def refresh_allowed(self, key: str) -> bool:
+        """
+        Check whether a force_refresh may bypass the entry for key.
 
-            # Check if entry has expired
-            if time.time() > entry['expires_at']:
-                del self._cache[key]
+        For callers that read entries with get() and fetch misses
+        themselves (batched loads). Entries younger than
+        force_refresh_min_seconds are not refreshed again.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            False if the entry exists and is too young to refresh, else True
+        """
+        shard = self._shard_for(key)
+        with shard.lock:
+            entry = shard.entries.get(key)
+            if entry is not None and time.time() - entry['created_at'] < self.force_refresh_min_seconds:
+                shard.stats['refreshes_throttled'] += 1
+                return False
+            return True
+
+    def get_stale(self, key: str) -> Optional[Any]:
+        """
+        Retrieve a value from cache regardless of its soft/hard TTL.
+
+        Used as a fallback when the upstream is failing. Entries past their
+        retention deadline are not returned.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value if still retained, None otherwise
+        """
+        shard = self._shard_for(key)
+        with shard.lock:
+            entry = shard.entries.get(key)
+            if entry is None or time.time() > entry['retain_until']:
                 return None
 
             return entry['value']
 
-    def set(self, key: str, value: Any, ttl_seconds: Optional[int] = None) -> None:
+    def get_metadata(self, key: str, value: Optional[Any] = None) -> Optional[Dict[str, float]]:
+        """
+        Get an entry's timestamps without reading its value or counting a hit.
+
+        Args:
+            key: Cache key
+            value: If given, only the entry holding this very object counts,
+                so the timestamps describe a value the caller already has
+                even if the entry was reloaded since
+
+        Returns:
+            Dict with created_at, expires_at, stale_until and retain_until,
+            or None if the key is not cached (or holds another value)
+        """
+        shard = self._shard_for(key)
+        with shard.lock:
+            entry = shard.entries.get(key)
+            if entry is None or (value is not None and entry['value'] is not value):
+                return None
+            return {
+                name: entry[name]
+                for name in ('created_at', 'expires_at', 'stale_until', 'retain_until')
+            }
+
+    def expires_in(self, key: str) -> Optional[float]:
+        """
+        Seconds until key passes its soft TTL (negative once it has).
+
+        Returns:
+            Remaining fresh lifetime, or None if the key is not cached
+        """
+        shard = self._shard_for(key)
+        with shard.lock:
+            entry = shard.entries.get(key)
+            if entry is None:
+                return None
+            return entry['expires_at'] - time.time()
+
+    def prewarmed_keys(self, keys: List[str]) -> Tuple[str, ...]:
+        """
+        Filter keys down to those whose current entry the pre-warm scheduler wrote.
+
+        Does not count hits; used to remember which inputs of a derived
+        result (e.g. a market snapshot) were pre-warmed.
+        """
+        prewarmed = []
+        for key in keys:
+            shard = self._shard_for(key)
+            with shard.lock:
+                entry = shard.entries.get(key)
+                if entry is not None and entry.get('origin') == PREWARM_ORIGIN:
+                    prewarmed.append(key)
+        return tuple(prewarmed)
+
+    def record_prewarmed_hits(self, keys: Tuple[str, ...]) -> None:
+        """
+        Count a request served from pre-warmed entries without reading them.
+
+        For responses built ahead of time from cache entries, such as
+        market snapshot bodies; keys come from prewarmed_keys.
+        """
+        for key in keys:
+            shard = self._shard_for(key)
+            with shard.lock:
+                shard.stats['prewarmed_hits'] += 1
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl_seconds: Optional[int] = None,
+        stale_ttl_seconds: Optional[int] = None
+    ) -> None:
         """
         Store a value in cache with TTL.
 
         Args:
             key: Cache key
             value: Value to cache
-            ttl_seconds: Optional custom TTL (uses default if not provided)
+            ttl_seconds: Optional custom soft TTL (uses default if not provided)
+            stale_ttl_seconds: Optional custom hard TTL (defaults to the larger
+                of the soft TTL and the cache's stale TTL)
         """
+        self._store(key, self._build_entry(value, ttl_seconds, stale_ttl_seconds))
+
+    def _build_entry(
+        self,
+        value: Any,
+        ttl_seconds: Optional[int] = None,
+        stale_ttl_seconds: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Build an entry dict (value plus deadlines) starting now."""
         ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        stale_ttl = stale_ttl_seconds if stale_ttl_seconds is not None else max(ttl, self.stale_ttl_seconds)
+        now = time.time()
+        return {
+            'value': value,
+            'expires_at': now + ttl,
+            'stale_until': now + stale_ttl,
+            'retain_until': now + max(stale_ttl, self.retention_seconds),
+            'created_at': now,
+            'origin': cache_origin.get()
+        }
 
-        with self._lock:
-            self._cache[key] = {
-                'value': value,
-                'expires_at': time.time() + ttl,
-                'created_at': time.time()
-            }
+    def _store(self, key: str, entry: Dict[str, Any], persist: bool = True) -> bool:
+        """
+        Insert a fully built entry (value plus deadlines) into its shard.
+
+        Args:
+            key: Cache key
+            entry: Dict with value, created_at, expires_at, stale_until, retain_until
+            persist: If True, also hand the entry to the L2 store
+
+        Returns:
+            True if the entry was admitted
+        """
+        size = _estimate_size(entry['value']) + sys.getsizeof(key)
+
+        shard = self._shard_for(key)
+        with shard.lock:
+            if not shard.admit(key, size):
+                shard.stats['admission_rejections'] += 1
+                return False
+
+            old_entry = shard.entries.pop(key, None)
+            if old_entry is not None:
+                shard.total_bytes -= old_entry['size']
+
+            seq = shard.next_seq
+            shard.next_seq += 1
+            shard.entries[key] = {**entry, 'size': size, 'seq': seq}
+            shard.total_bytes += size
+            shard.schedule_expiry(key, shard.entries[key])
+            shard.evict_over_budget()
+            shard.compact_heap()
+
+        if persist and self._l2 is not None:
+            self._l2.enqueue_put(key, entry)
+        return True
+
+    def attach_l2(self, l2: Any) -> None:
+        """
+        Back this cache with a persistent L2 store (see services.disk_cache).
+
+        Every set and invalidate is forwarded to the store's write-behind
+        queue. With a plain DiskCache reads never go to disk. With a
+        SharedCacheStore (l2.shared is True), loads also consult the store
+        and take a cross-process lease, so only one worker process
+        refreshes a given key.
+        """
+        self._l2 = l2
+        self._shared = l2 if getattr(l2, 'shared', False) else None
+
+    def rehydrate(self, limit: int = config.CACHE_REHYDRATE_LIMIT) -> int:
+        """
+        Load hot entries from the L2 store, keeping their original deadlines.
+
+        Args:
+            limit: Maximum number of entries to restore
+
+        Returns:
+            Number of entries restored
+        """
+        if self._l2 is None:
+            return 0
+
+        restored = 0
+        for entry in self._l2.load_hot(limit):
+            key = entry.pop('key')
+            if self._store(key, entry, persist=False):
+                restored += 1
+        return restored
+
+    def get_or_compute(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        ttl_seconds: Optional[int] = None,
+        force_refresh: bool = False
+    ) -> Optional[Any]:
+        """
+        Return the cached value for key, loading it at most once on a miss.
+
+        Concurrent callers that miss on the same key share a single call to
+        loader: the first caller runs it and the rest wait for its result.
+        A loader result of None is treated as a failed load and not cached.
+
+        Past the soft TTL the stale value is returned immediately and the
+        refresh runs in the background. Past the hard TTL callers wait for
+        the load, and only get the old value back if the load fails.
+
+        Args:
+            key: Cache key
+            loader: Zero-argument callable that fetches the value
+            ttl_seconds: Optional custom TTL (uses default if not provided)
+            force_refresh: If True, skip the cached value (but still join
+                an in-flight load for the same key)
+
+        Returns:
+            Cached or freshly loaded value, or None if the load failed and
+            nothing was retained
+        """
+        future, is_owner, cached = self._claim(key, force_refresh)
+
+        if cached is not None:
+            if is_owner:
+                # Run in a copy of the caller's context so the refresh keeps its origin
+                self._refresh_executor.submit(
+                    contextvars.copy_context().run,
+                    self._load_sync, key, loader, future, ttl_seconds, force_refresh
+                )
+            return cached
+
+        if not is_owner:
+            return future.result()
+
+        self._load_sync(key, loader, future, ttl_seconds, force_refresh)
+        return future.result()
+
+    async def get_or_compute_async(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl_seconds: Optional[int] = None,
+        force_refresh: bool = False
+    ) -> Optional[Any]:
+        """
+        Async variant of get_or_compute; loader is a coroutine function.
+
+        Shares the same in-flight table as get_or_compute, so sync and async
+        callers for one key are coalesced into a single load. The load runs
+        in its own task, so cancelling one waiter (e.g. on timeout) does not
+        abort it for the others.
+        """
+        future, is_owner, cached = self._claim(key, force_refresh)
+
+        if is_owner:
+            task = asyncio.ensure_future(self._load_async(key, loader, future, ttl_seconds, force_refresh))
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
+
+        if cached is not None:
+            return cached
+
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    def get_or_compute_many(
+        self,
+        keys: List[str],
+        loader: Callable[[List[str]], Dict[str, Any]],
+        ttl_seconds: Optional[int] = None,
+        force_refresh: bool = False
+    ) -> Dict[str, Optional[Any]]:
+        """
+        Batch variant of get_or_compute: one loader call for all missing keys.
+
+        Every key is claimed in the same in-flight table as get_or_compute,
+        so keys another caller is already loading are waited on instead of
+        fetched again, and only the keys this call owns are passed to
+        loader. Stale keys are served as-is and refreshed in the
+        background, together in one loader call.
+
+        Args:
+            keys: Cache keys (duplicates are loaded once)
+            loader: Callable taking a list of keys and returning a dict of
+                key -> value; keys missing from it (or None) failed to load
+            ttl_seconds: Optional custom TTL (uses default if not provided)
+            force_refresh: If True, skip cached values (but still join
+                in-flight loads for the same keys)
+
+        Returns:
+            Dictionary of key -> cached or loaded value, None where the load
+            failed and nothing was retained
+        """
+        results: Dict[str, Optional[Any]] = {}
+        owned: Dict[str, Future] = {}
+        refreshing: Dict[str, Future] = {}
+        waiting: Dict[str, Future] = {}
+        for key in dict.fromkeys(keys):
+            future, is_owner, cached = self._claim(key, force_refresh)
+            if cached is not None:
+                results[key] = cached
+                if is_owner:
+                    refreshing[key] = future
+            elif is_owner:
+                owned[key] = future
+            else:
+                waiting[key] = future
+
+        if refreshing:
+            self._refresh_executor.submit(
+                contextvars.copy_context().run,
+                self._load_many_sync, refreshing, loader, ttl_seconds, force_refresh
+            )
+        if owned:
+            self._load_many_sync(owned, loader, ttl_seconds, force_refresh)
+
+        for key, future in {**owned, **waiting}.items():
+            try:
+                results[key] = future.result()
+            except Exception:
+                results[key] = None
+
+        return {key: results.get(key) for key in keys}
+
+    def _load_sync(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        future: Future,
+        ttl_seconds: Optional[int],
+        force_refresh: bool = False
+    ) -> None:
+        """Run a sync loader and publish its outcome to waiting callers."""
+        try:
+            if self._shared is not None:
+                value = self._load_shared_sync(key, loader, ttl_seconds, force_refresh)
+            else:
+                value = loader()
+        except BaseException as e:
+            self._finish_load(key, future, error=e)
+            return
+
+        self._finish_load(key, future, value=value, ttl_seconds=ttl_seconds)
+
+    async def _load_async(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        future: Future,
+        ttl_seconds: Optional[int],
+        force_refresh: bool = False
+    ) -> None:
+        """Run an async loader and publish its outcome to waiting callers."""
+        try:
+            if self._shared is not None:
+                value = await self._load_shared_async(key, loader, ttl_seconds, force_refresh)
+            else:
+                value = await loader()
+        except BaseException as e:
+            self._finish_load(key, future, error=e)
+            return
+
+        self._finish_load(key, future, value=value, ttl_seconds=ttl_seconds)
+
+    def _load_many_sync(
+        self,
+        futures: Dict[str, Future],
+        loader: Callable[[List[str]], Dict[str, Any]],
+        ttl_seconds: Optional[int],
+        force_refresh: bool = False
+    ) -> None:
+        """Run a batch loader for owned keys and publish each outcome to its waiters."""
+        try:
+            if self._shared is not None:
+                values = self._load_shared_many(list(futures), loader, ttl_seconds, force_refresh)
+            else:
+                values = loader(list(futures)) or {}
+        except BaseException as e:
+            for key, future in futures.items():
+                self._finish_load(key, future, error=e)
+            return
+
+        for key, future in futures.items():
+            self._finish_load(key, future, value=values.get(key), ttl_seconds=ttl_seconds)
+
+    def _load_shared_sync(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        ttl_seconds: Optional[int],
+        force_refresh: bool
+    ) -> Any:
+        """
+        Load through the shared store with cross-process single-flight.
+
+        1. Use a fresh entry another worker already wrote, if any.
+        2. Otherwise take the key's lease and run loader, publishing the
+           result to the store before releasing the lease.
+        3. If another worker holds the lease, wait for it to publish; run
+           loader ourselves only if it gives up or the lease times out.
+        """
+        store = self._shared
+
+        if not force_refresh:
+            entry = store.get_entry(key)
+            if entry is not None and time.time() <= entry['expires_at']:
+                return _SharedEntry(entry)
+
+        owner = store.try_acquire_lease(key)
+        if owner is None:
+            deadline = time.time() + store.lease_seconds
+            while time.time() < deadline and store.lease_active(key):
+                time.sleep(store.poll_interval)
+                entry = store.get_entry(key)
+                if entry is not None and time.time() <= entry['expires_at']:
+                    return _SharedEntry(entry)
+            return loader()
+
+        try:
+            value = loader()
+            if value is None:
+                return None
+            entry = self._build_entry(value, ttl_seconds)
+            store.put_entry(key, entry)
+            return _SharedEntry(entry)
+        finally:
+            store.release_lease(key, owner)
+
+    async def _load_shared_async(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl_seconds: Optional[int],
+        force_refresh: bool
+    ) -> Any:
+        """Async variant of _load_shared_sync; store calls run in a thread."""
+        store = self._shared
+
+        if not force_refresh:
+            entry = await asyncio.to_thread(store.get_entry, key)
+            if entry is not None and time.time() <= entry['expires_at']:
+                return _SharedEntry(entry)
+
+        owner = await asyncio.to_thread(store.try_acquire_lease, key)
+        if owner is None:
+            deadline = time.time() + store.lease_seconds
+            while time.time() < deadline and await asyncio.to_thread(store.lease_active, key):
+                await asyncio.sleep(store.poll_interval)
+                entry = await asyncio.to_thread(store.get_entry, key)
+                if entry is not None and time.time() <= entry['expires_at']:
+                    return _SharedEntry(entry)
+            return await loader()
+
+        try:
+            value = await loader()
+            if value is None:
+                return None
+            entry = self._build_entry(value, ttl_seconds)
+            await asyncio.to_thread(store.put_entry, key, entry)
+            return _SharedEntry(entry)
+        finally:
+            await asyncio.to_thread(store.release_lease, key, owner)
+
+    def _load_shared_many(
+        self,
+        keys: List[str],
+        loader: Callable[[List[str]], Dict[str, Any]],
+        ttl_seconds: Optional[int],
+        force_refresh: bool
+    ) -> Dict[str, Any]:
+        """
+        Batch variant of _load_shared_sync.
+
+        Fresh store entries are used as-is; keys whose lease we get are
+        loaded in one loader call and published; keys leased by another
+        worker are polled until it publishes, and loaded ourselves only if
+        it gives up or the lease times out.
+        """
+        store = self._shared
+        values: Dict[str, Any] = {}
+
+        if not force_refresh:
+            for key in keys:
+                entry = store.get_entry(key)
+                if entry is not None and time.time() <= entry['expires_at']:
+                    values[key] = _SharedEntry(entry)
+
+        leases: Dict[str, Any] = {}
+        contended: List[str] = []
+        for key in keys:
+            if key in values:
+                continue
+            owner = store.try_acquire_lease(key)
+            if owner is None:
+                contended.append(key)
+            else:
+                leases[key] = owner
+
+        try:
+            if leases:
+                loaded = loader(list(leases)) or {}
+                for key in leases:
+                    value = loaded.get(key)
+                    if value is not None:
+                        entry = self._build_entry(value, ttl_seconds)
+                        store.put_entry(key, entry)
+                        values[key] = _SharedEntry(entry)
+        finally:
+            for key, owner in leases.items():
+                store.release_lease(key, owner)
+
+        abandoned: List[str] = []
+        deadline = time.time() + store.lease_seconds
+        while contended and time.time() < deadline:
+            time.sleep(store.poll_interval)
+            pending = []
+            for key in contended:
+                entry = store.get_entry(key)
+                if entry is not None and time.time() <= entry['expires_at']:
+                    values[key] = _SharedEntry(entry)
+                elif store.lease_active(key):
+                    pending.append(key)
+                else:
+                    abandoned.append(key)
+            contended = pending
+
+        leftover = abandoned + contended
+        if leftover:
+            values.update(loader(leftover) or {})
+        return values
+
+    def _claim(self, key: str, force_refresh: bool) -> Tuple[Optional[Future], bool, Optional[Any]]:
+        """
+        Check the cache and register (or join) an in-flight load for key.
+
+        Returns:
+            Tuple of (future, is_owner, cached_value):
+            - cached_value set, not owner: fresh hit (or stale with a
+              refresh already running)
+            - cached_value set, owner: stale hit, caller must start a
+              background refresh
+            - cached_value None: caller must run (owner) or wait for the load
+        """
+        shard = self._shard_for(key)
+        with shard.lock:
+            shard.record_access(key)
+            entry = shard.entries.get(key)
+            now = time.time()
+
+            if force_refresh and entry is not None and now - entry['created_at'] < self.force_refresh_min_seconds:
+                # Just loaded; serve it rather than hitting the upstream again
+                shard.stats['refreshes_throttled'] += 1
+                force_refresh = False
+
+            if not force_refresh and entry is not None:
+                shard.entries.move_to_end(key)
+                if now <= entry['expires_at']:
+                    shard.stats['hits'] += 1
+                    shard.record_hit_origin(entry)
+                    return None, False, entry['value']
+
+                if now <= entry['stale_until']:
+                    shard.stats['stale_served'] += 1
+                    shard.record_hit_origin(entry)
+                    if key in shard.inflight:
+                        return None, False, entry['value']
+                    future = Future()
+                    shard.inflight[key] = future
+                    return future, True, entry['value']
+
+            shard.stats['misses'] += 1
+
+            future = shard.inflight.get(key)
+            if future is not None:
+                return future, False, None
+
+            future = Future()
+            shard.inflight[key] = future
+            return future, True, None
+
+    def _finish_load(
+        self,
+        key: str,
+        future: Future,
+        value: Any = None,
+        ttl_seconds: Optional[int] = None,
+        error: Optional[BaseException] = None
+    ) -> None:
+        """
+        Store a loaded value and wake every caller waiting on the key.
+
+        If the load failed (raised or returned None), waiters receive the
+        retained stale value instead when one exists.
+        """
+        shard = self._shard_for(key)
+
+        if isinstance(value, _SharedEntry):
+            # Already persisted in the shared store; keep its deadlines
+            self._store(key, value.entry, persist=False)
+            value = value.entry['value']
+        elif error is None and value is not None:
+            self.set(key, value, ttl_seconds)
+        else:
+            stale_value = self.get_stale(key)
+            if stale_value is not None:
+                if error is not None:
+                    print(f"Serving stale cache for {key} after load error: {error}")
+                with shard.lock:
+                    shard.stats['fallback_served'] += 1
+                value, error = stale_value, None
+
+        with shard.lock:
+            if shard.inflight.get(key) is future:
+                del shard.inflight[key]
+
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(value)
 
     def invalidate(self, key: str) -> bool:
         """
@@ -72,49 +935,152 @@ class CacheManager:
         Returns:
             True if key was removed, False if it didn't exist
         """
-        with self._lock:
-            if key in self._cache:
-                del self._cache[key]
-                return True
-            return False
+        shard = self._shard_for(key)
+        with shard.lock:
+            removed = key in shard.entries
+            if removed:
+                shard.total_bytes -= shard.entries.pop(key)['size']
+
+        if self._l2 is not None:
+            self._l2.enqueue_delete(key)
+        return removed
 
     def clear(self) -> None:
         """Clear all cache entries."""
-        with self._lock:
-            self._cache.clear()
+        for shard in self._shards:
+            with shard.lock:
+                if self._l2 is not None:
+                    for key in shard.entries:
+                        self._l2.enqueue_delete(key)
+                shard.entries.clear()
+                shard.expiry_heap.clear()
+                shard.total_bytes = 0
 
-    def get_stats(self) -> Dict[str, Any]:
+    def get_stats(self, include_keys: bool = False) -> Dict[str, Any]:
         """
         Get cache statistics.
 
+        Counters are summed per shard, so this costs O(shards) rather than
+        O(entries) unless include_keys is set.
+
+        Args:
+            include_keys: If True, also list every cached key
+
         Returns:
-            Dictionary with cache size and keys
+            Dictionary with cache size, limits and counters
         """
-        with self._lock:
-            return {
-                'total_entries': len(self._cache),
-                'keys': list(self._cache.keys()),
-                'ttl_seconds': self.ttl_seconds
-            }
+        totals = dict.fromkeys(self.COUNTERS, 0)
+        total_entries = 0
+        size_bytes = 0
+        inflight_loads = 0
+        expiry_heap_size = 0
+        keys: List[str] = []
+
+        for shard in self._shards:
+            with shard.lock:
+                total_entries += len(shard.entries)
+                size_bytes += shard.total_bytes
+                inflight_loads += len(shard.inflight)
+                expiry_heap_size += len(shard.expiry_heap)
+                for name in self.COUNTERS:
+                    totals[name] += shard.stats[name]
+                if include_keys:
+                    keys.extend(shard.entries.keys())
+
+        stats = {
+            'total_entries': total_entries,
+            'size_bytes': size_bytes,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'eviction_policy': self.eviction_policy,
+            'shards': len(self._shards),
+            'ttl_seconds': self.ttl_seconds,
+            'stale_ttl_seconds': self.stale_ttl_seconds,
+            'inflight_loads': inflight_loads,
+            'expiry_heap_size': expiry_heap_size,
+            **totals
+        }
+        if self._l2 is not None:
+            stats['l2'] = self._l2.get_stats()
+        if include_keys:
+            stats['keys'] = keys
+        return stats
 
     def cleanup_expired(self) -> int:
         """
-        Remove all expired entries from cache.
+        Remove all entries past their retention deadline from cache.
+
+        Returns:
+            Number of entries removed
+        """
+        return self.expire_due()
+
+    def expire_due(self, batch_size: int = config.CACHE_EXPIRY_BATCH_SIZE) -> int:
+        """
+        Pop due deadlines off the expiry heap and delete their entries.
+
+        Work is done in batches of at most batch_size heap pops, releasing
+        the lock between batches, so readers are never blocked for a full
+        pass. Each removal costs O(log n).
+
+        Args:
+            batch_size: Maximum heap items processed per lock acquisition
 
         Returns:
             Number of entries removed
         """
-        with self._lock:
-            current_time = time.time()
-            expired_keys = [
-                key for key, entry in self._cache.items()
-                if current_time > entry['expires_at']
-            ]
+        removed = 0
+
+        for shard in self._shards:
+            while True:
+                with shard.lock:
+                    now = time.time()
+                    popped = 0
+
+                    while shard.expiry_heap and popped < batch_size:
+                        deadline, seq, key = shard.expiry_heap[0]
+                        if deadline > now:
+                            break
+
+                        heapq.heappop(shard.expiry_heap)
+                        popped += 1
+
+                        entry = shard.entries.get(key)
+                        if entry is not None and entry['seq'] == seq:
+                            shard.total_bytes -= shard.entries.pop(key)['size']
+                            shard.stats['expired'] += 1
+                            removed += 1
+
+                    more_due = bool(shard.expiry_heap) and shard.expiry_heap[0][0] <= now
+
+                if not more_due:
+                    break
+
+        return removed
+
+    async def run_expiry_loop(self, interval_seconds: float = config.CACHE_EXPIRY_INTERVAL_SECONDS) -> None:
+        """Expire due entries every interval_seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                self.expire_due()
+            except Exception as e:
+                print(f"Error expiring cache entries: {e}")
 
-            for key in expired_keys:
-                del self._cache[key]
+    def start_expiry_timer(self, interval_seconds: float = config.CACHE_EXPIRY_INTERVAL_SECONDS) -> None:
+        """Start the background expiry loop on the running event loop."""
+        if self._expiry_task is None or self._expiry_task.done():
+            self._expiry_task = asyncio.get_running_loop().create_task(self.run_expiry_loop(interval_seconds))
 
-            return len(expired_keys)
+    async def stop_expiry_timer(self) -> None:
+        """Cancel the background expiry loop, if running."""
+        task, self._expiry_task = self._expiry_task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
 
 
 # Global cache instance
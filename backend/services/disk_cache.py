@@ -0,0 +1,402 @@
+"""
+SQLite-backed L2 cache so restarts start warm.
+Writes are batched on a background thread; request paths never touch disk.
+
+With CACHE_BACKEND = "sqlite" the same database (in WAL mode) is also
+shared by every worker process, with leases for cross-process single-flight.
+"""
+
+import json
+import os
+import sqlite3
+import time
+import uuid
+from threading import Event, Lock, Thread, local
+from typing import Any, Dict, List, Optional
+import config
+
+
+class DiskCache:
+    """
+    Persistent store for cache entries with their TTL metadata.
+
+    CacheManager hands every write to enqueue_put/enqueue_delete, which
+    only touch an in-memory pending map. A writer thread flushes that map
+    to SQLite every flush_interval seconds (or sooner once batch_size
+    changes are pending), keeping only the latest change per key.
+    """
+
+    # Whether CacheManager should read through and lease via this store
+    shared = False
+
+    def __init__(
+        self,
+        db_path: str = config.CACHE_DB_PATH,
+        flush_interval: float = config.CACHE_L2_FLUSH_INTERVAL_SECONDS,
+        batch_size: int = config.CACHE_L2_BATCH_SIZE
+    ):
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._pending: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._pending_lock = Lock()
+        self._wakeup = Event()
+        self._stopping = Event()
+        self._writer: Optional[Thread] = None
+        self._stats = {'rows_written': 0, 'rows_deleted': 0, 'flushes': 0, 'write_errors': 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection, creating the database and schema if needed."""
+        directory = os.path.dirname(os.path.abspath(self.db_path))
+        os.makedirs(directory, exist_ok=True)
+
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                stale_until REAL NOT NULL,
+                retain_until REAL NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_cache_entries_retain ON cache_entries (retain_until)"
+        )
+        return conn
+
+    def start(self) -> None:
+        """Start the write-behind thread."""
+        if self._writer is not None and self._writer.is_alive():
+            return
+
+        self._stopping.clear()
+        self._writer = Thread(target=self._writer_loop, name="cache-l2-writer", daemon=True)
+        self._writer.start()
+
+    def stop(self) -> None:
+        """Flush pending writes and stop the writer thread."""
+        if self._writer is None:
+            return
+
+        self._stopping.set()
+        self._wakeup.set()
+        self._writer.join()
+        self._writer = None
+
+    def enqueue_put(self, key: str, entry: Dict[str, Any]) -> None:
+        """
+        Schedule an entry to be persisted.
+
+        Args:
+            key: Cache key
+            entry: Dict with value, created_at, expires_at, stale_until, retain_until
+        """
+        with self._pending_lock:
+            self._pending[key] = entry
+            pending_count = len(self._pending)
+
+        if pending_count >= self.batch_size:
+            self._wakeup.set()
+
+    def enqueue_delete(self, key: str) -> None:
+        """Schedule a key to be removed from disk."""
+        with self._pending_lock:
+            self._pending[key] = None
+
+    def load_hot(self, limit: int = config.CACHE_REHYDRATE_LIMIT) -> List[Dict[str, Any]]:
+        """
+        Load the most recently written entries that are still retained.
+
+        Args:
+            limit: Maximum number of entries to return
+
+        Returns:
+            List of entry dicts (key, value and TTL metadata), newest first
+        """
+        try:
+            conn = self._connect()
+        except sqlite3.Error as e:
+            print(f"Error opening cache database {self.db_path}: {e}")
+            return []
+
+        try:
+            rows = conn.execute(
+                """
+                SELECT key, value, created_at, expires_at, stale_until, retain_until
+                FROM cache_entries
+                WHERE retain_until > ?
+                ORDER BY created_at DESC
+                LIMIT ?
+                """,
+                (time.time(), limit)
+            ).fetchall()
+        except sqlite3.Error as e:
+            print(f"Error reading cache database: {e}")
+            return []
+        finally:
+            conn.close()
+
+        entries = []
+        for key, value, created_at, expires_at, stale_until, retain_until in rows:
+            try:
+                entries.append({
+                    'key': key,
+                    'value': json.loads(value),
+                    'created_at': created_at,
+                    'expires_at': expires_at,
+                    'stale_until': stale_until,
+                    'retain_until': retain_until
+                })
+            except ValueError as e:
+                print(f"Skipping unreadable cache row {key}: {e}")
+
+        return entries
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get write-behind counters and current backlog."""
+        with self._pending_lock:
+            pending = len(self._pending)
+        return {'db_path': self.db_path, 'pending_writes': pending, **self._stats}
+
+    def _writer_loop(self) -> None:
+        """Flush pending changes until stopped, then flush once more."""
+        try:
+            conn = self._connect()
+        except sqlite3.Error as e:
+            print(f"Cache L2 disabled, cannot open {self.db_path}: {e}")
+            return
+
+        try:
+            while not self._stopping.is_set():
+                self._wakeup.wait(self.flush_interval)
+                self._wakeup.clear()
+                self._flush(conn)
+            self._flush(conn)
+        finally:
+            conn.close()
+
+    def _flush(self, conn: sqlite3.Connection) -> None:
+        """Write one batch of pending changes in a single transaction."""
+        with self._pending_lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+
+        upserts = []
+        deletes = []
+        for key, entry in pending.items():
+            if entry is None:
+                deletes.append((key,))
+                continue
+            try:
+                encoded = json.dumps(entry['value'], default=str)
+            except (TypeError, ValueError) as e:
+                print(f"Not persisting cache entry {key}: {e}")
+                continue
+            upserts.append((
+                key, encoded, entry['created_at'], entry['expires_at'],
+                entry['stale_until'], entry['retain_until']
+            ))
+
+        try:
+            with conn:
+                conn.executemany(
+                    """
+                    INSERT INTO cache_entries
+                        (key, value, created_at, expires_at, stale_until, retain_until)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(key) DO UPDATE SET
+                        value = excluded.value,
+                        created_at = excluded.created_at,
+                        expires_at = excluded.expires_at,
+                        stale_until = excluded.stale_until,
+                        retain_until = excluded.retain_until
+                    WHERE excluded.created_at >= cache_entries.created_at
+                    """,
+                    upserts
+                )
+                conn.executemany("DELETE FROM cache_entries WHERE key = ?", deletes)
+                conn.execute("DELETE FROM cache_entries WHERE retain_until <= ?", (time.time(),))
+            self._stats['rows_written'] += len(upserts)
+            self._stats['rows_deleted'] += len(deletes)
+            self._stats['flushes'] += 1
+        except sqlite3.Error as e:
+            self._stats['write_errors'] += 1
+            print(f"Error writing cache database: {e}")
+
+
+class SharedCacheStore(DiskCache):
+    """
+    DiskCache that several worker processes use as one shared cache.
+
+    On top of write-behind persistence it offers synchronous reads and
+    writes (so other processes see a refresh immediately) and per-key
+    leases that let exactly one process load a key at a time. Leases
+    expire after lease_seconds so a crashed worker cannot block a key.
+    """
+
+    shared = True
+
+    def __init__(
+        self,
+        db_path: str = config.CACHE_DB_PATH,
+        lease_seconds: float = config.CACHE_LEASE_SECONDS,
+        poll_interval: float = config.CACHE_LEASE_POLL_SECONDS,
+        **kwargs
+    ):
+        super().__init__(db_path=db_path, **kwargs)
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self._local = local()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection and make sure the lease table exists."""
+        conn = super()._connect()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache_leases (
+                key TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+        conn.commit()
+        return conn
+
+    def _thread_conn(self) -> sqlite3.Connection:
+        """Return this thread's connection (sqlite3 connections are per-thread)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            conn.isolation_level = None  # autocommit
+            self._local.conn = conn
+        return conn
+
+    def get_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Read one entry directly from the shared database.
+
+        Returns:
+            Entry dict (value plus deadlines), or None if absent/unreadable
+        """
+        try:
+            row = self._thread_conn().execute(
+                """
+                SELECT value, created_at, expires_at, stale_until, retain_until
+                FROM cache_entries WHERE key = ? AND retain_until > ?
+                """,
+                (key, time.time())
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Error reading shared cache entry {key}: {e}")
+            return None
+
+        if row is None:
+            return None
+
+        value, created_at, expires_at, stale_until, retain_until = row
+        try:
+            decoded = json.loads(value)
+        except ValueError:
+            return None
+
+        return {
+            'value': decoded,
+            'created_at': created_at,
+            'expires_at': expires_at,
+            'stale_until': stale_until,
+            'retain_until': retain_until
+        }
+
+    def put_entry(self, key: str, entry: Dict[str, Any]) -> None:
+        """Write one entry immediately so other processes can see it."""
+        try:
+            encoded = json.dumps(entry['value'], default=str)
+        except (TypeError, ValueError) as e:
+            print(f"Not sharing cache entry {key}: {e}")
+            return
+
+        try:
+            self._thread_conn().execute(
+                """
+                INSERT INTO cache_entries
+                    (key, value, created_at, expires_at, stale_until, retain_until)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    value = excluded.value,
+                    created_at = excluded.created_at,
+                    expires_at = excluded.expires_at,
+                    stale_until = excluded.stale_until,
+                    retain_until = excluded.retain_until
+                WHERE excluded.created_at >= cache_entries.created_at
+                """,
+                (key, encoded, entry['created_at'], entry['expires_at'],
+                 entry['stale_until'], entry['retain_until'])
+            )
+            self._stats['rows_written'] += 1
+        except sqlite3.Error as e:
+            self._stats['write_errors'] += 1
+            print(f"Error writing shared cache entry {key}: {e}")
+
+    def try_acquire_lease(self, key: str) -> Optional[str]:
+        """
+        Try to become the only process loading key.
+
+        Returns:
+            An owner token to pass to release_lease, or None if another
+            process holds an unexpired lease
+        """
+        owner = f"{os.getpid()}:{uuid.uuid4().hex}"
+        now = time.time()
+        try:
+            cursor = self._thread_conn().execute(
+                """
+                INSERT INTO cache_leases (key, owner, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    owner = excluded.owner,
+                    expires_at = excluded.expires_at
+                WHERE cache_leases.expires_at <= ?
+                """,
+                (key, owner, now + self.lease_seconds, now)
+            )
+        except sqlite3.Error as e:
+            # Fail open: loading without a lease only costs a duplicate fetch
+            print(f"Error acquiring cache lease for {key}: {e}")
+            return owner
+
+        return owner if cursor.rowcount == 1 else None
+
+    def lease_active(self, key: str) -> bool:
+        """Check whether some process holds an unexpired lease on key."""
+        try:
+            row = self._thread_conn().execute(
+                "SELECT 1 FROM cache_leases WHERE key = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+        except sqlite3.Error:
+            return False
+        return row is not None
+
+    def release_lease(self, key: str, owner: str) -> None:
+        """Release a lease taken with try_acquire_lease."""
+        try:
+            self._thread_conn().execute(
+                "DELETE FROM cache_leases WHERE key = ? AND owner = ?",
+                (key, owner)
+            )
+        except sqlite3.Error as e:
+            print(f"Error releasing cache lease for {key}: {e}")
+
+
+if config.CACHE_BACKEND not in ('memory', 'sqlite'):
+    raise ValueError(f"Unknown CACHE_BACKEND: {config.CACHE_BACKEND}")
+
+# Global L2 instance (database is opened when started)
+disk_cache = SharedCacheStore() if config.CACHE_BACKEND == 'sqlite' else DiskCache()
@@ -0,0 +1,283 @@
+"""
+Vectorized technical indicator engine.
+Computes RSI, MACD and SMAs for many symbols at once from a 2-D array of closes.
+
+IndicatorState keeps the same indicators for one symbol as a compact
+recursive state that is updated in O(1) per bar or intraday quote.
+
+Formulas follow pandas_ta defaults so values match the previous per-symbol
+DataFrame path:
+- RSI: Wilder's RMA (ewm alpha=1/length, adjust=True) of gains and losses
+- EMA: seeded with the SMA of the first `length` values, then ewm(adjust=False)
+- MACD signal: EMA of the MACD line starting at its first valid value
+- SMA: simple rolling mean, NaN until `length` values are available
+"""
+
+import math
+from array import array
+from datetime import date
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+
+
+RSI_LENGTH = 14
+MACD_FAST = 12
+MACD_SLOW = 26
+MACD_SIGNAL = 9
+SMA_LENGTHS = (20, 50)
+
+INDICATOR_KEYS = ('rsi', 'macd', 'macd_signal', 'macd_histogram', 'sma_20', 'sma_50')
+
+
+def stack_closes(series: Sequence[Sequence[float]], bars: Optional[int] = None) -> np.ndarray:
+    """
+    Build a (symbols x bars) array from per-symbol close histories.
+
+    Histories are right-aligned so the latest bar of every symbol sits in
+    the last column; shorter histories are left-padded with NaN.
+
+    Args:
+        series: One sequence of closes per symbol, oldest first
+        bars: Number of columns (defaults to the longest history)
+
+    Returns:
+        2-D float array
+    """
+    width = bars if bars is not None else max((len(s) for s in series), default=0)
+    closes = np.full((len(series), width), np.nan)
+    for row, values in enumerate(series):
+        values = np.asarray(values, dtype=float)[-width:] if width else np.empty(0)
+        if len(values):
+            closes[row, width - len(values):] = values
+    return closes
+
+
+def _first_valid(x: np.ndarray) -> np.ndarray:
+    """Index of the first non-NaN column per row (x.shape[1] if none)."""
+    valid = ~np.isnan(x)
+    return np.where(valid.any(axis=1), valid.argmax(axis=1), x.shape[1])
+
+
+def ema(x: np.ndarray, length: int) -> np.ndarray:
+    """
+    SMA-seeded exponential moving average along the bar axis.
+
+    Each row may start with NaN padding; its EMA starts `length - 1` bars
+    after its first valid value.
+    """
+    symbols, bars = x.shape
+    alpha = 2.0 / (length + 1)
+    seed_index = _first_valid(x) + length - 1
+
+    # Rolling sum over the last `length` bars, used for the SMA seed
+    filled = np.nan_to_num(x)
+    csum = np.cumsum(filled, axis=1)
+    window_sum = csum.copy()
+    window_sum[:, length:] -= csum[:, :-length]
+
+    out = np.full((symbols, bars), np.nan)
+    state = np.full(symbols, np.nan)
+    for t in range(bars):
+        state = np.where(
+            t == seed_index,
+            window_sum[:, t] / length,
+            np.where(t > seed_index, (1.0 - alpha) * state + alpha * x[:, t], np.nan)
+        )
+        out[:, t] = state
+    return out
+
+
+def rsi_latest(closes: np.ndarray, length: int = RSI_LENGTH) -> np.ndarray:
+    """Latest RSI per symbol (NaN if fewer than length price changes)."""
+    symbols = closes.shape[0]
+    beta = 1.0 - 1.0 / length
+    diff = np.diff(closes, axis=1)
+    valid = ~np.isnan(diff)
+    gains = np.where(diff > 0, diff, 0.0)
+    losses = np.where(diff < 0, -diff, 0.0)
+
+    # Weighted sums of an adjusted EWM; the shared denominator cancels out
+    avg_gain = np.zeros(symbols)
+    avg_loss = np.zeros(symbols)
+    count = np.zeros(symbols, dtype=int)
+    for t in range(diff.shape[1]):
+        v = valid[:, t]
+        avg_gain = np.where(v, gains[:, t] + beta * avg_gain, avg_gain)
+        avg_loss = np.where(v, losses[:, t] + beta * avg_loss, avg_loss)
+        count += v
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rsi = 100.0 * avg_gain / (avg_gain + avg_loss)
+    return np.where(count >= length, rsi, np.nan)
+
+
+def sma_latest(closes: np.ndarray, length: int) -> np.ndarray:
+    """Latest simple moving average per symbol (NaN if any of the last length bars is missing)."""
+    if closes.shape[1] < length:
+        return np.full(closes.shape[0], np.nan)
+    window = closes[:, -length:]
+    return window.mean(axis=1)  # NaN propagates for short histories
+
+
+def compute_indicators(closes: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Compute the latest RSI-14, MACD 12/26/9 and SMA-20/50 for every symbol.
+
+    Args:
+        closes: (symbols x bars) array from stack_closes
+
+    Returns:
+        Dictionary of indicator name -> 1-D array with one value per symbol
+    """
+    closes = np.asarray(closes, dtype=float)
+    if closes.ndim != 2:
+        raise ValueError("closes must be a 2-D (symbols x bars) array")
+    if closes.shape[1] == 0:
+        # No bars at all (e.g. only empty histories): nothing is defined yet
+        return {key: np.full(closes.shape[0], np.nan) for key in INDICATOR_KEYS}
+
+    macd_line = ema(closes, MACD_FAST) - ema(closes, MACD_SLOW)
+    signal_line = ema(macd_line, MACD_SIGNAL)
+
+    return {
+        'rsi': rsi_latest(closes),
+        'macd': macd_line[:, -1],
+        'macd_signal': signal_line[:, -1],
+        'macd_histogram': macd_line[:, -1] - signal_line[:, -1],
+        'sma_20': sma_latest(closes, SMA_LENGTHS[0]),
+        'sma_50': sma_latest(closes, SMA_LENGTHS[1]),
+    }
+
+
+def indicators_for_rows(results: Dict[str, np.ndarray]) -> List[Dict[str, Optional[float]]]:
+    """
+    Split compute_indicators output into one dict per symbol row.
+
+    NaN values become None, matching what the API reports for indicators
+    that cannot be computed yet.
+    """
+    rows = len(next(iter(results.values()))) if results else 0
+    return [
+        {
+            key: (None if np.isnan(results[key][row]) else float(results[key][row]))
+            for key in INDICATOR_KEYS
+        }
+        for row in range(rows)
+    ]
+
+
+def _ema_step(value: float, count: int, seed_sum: float, x: float, length: int):
+    """One SMA-seeded EMA step; returns (value, count, seed_sum) after adding x."""
+    if count < length:
+        seed_sum += x
+        count += 1
+        value = seed_sum / length if count == length else math.nan
+        return value, count, seed_sum
+    alpha = 2.0 / (length + 1)
+    return (1.0 - alpha) * value + alpha * x, count + 1, seed_sum
+
+
+class IndicatorState:
+    """
+    Incrementally updatable RSI/MACD/SMA state for one symbol.
+
+    Seed it once from completed daily closes with from_closes, then call
+    push() when a bar completes (O(1)) or preview() with an intraday price
+    to get indicators as if that price closed the current bar, without
+    changing the state. Matches compute_indicators over the same closes.
+
+    open_date is the date of the bar that preview() prices (the newest bar,
+    which may still be in progress).
+    """
+
+    __slots__ = (
+        'open_date', 'last_close',
+        'rsi_gain', 'rsi_loss', 'rsi_count',
+        'fast', 'fast_count', 'fast_sum',
+        'slow', 'slow_count', 'slow_sum',
+        'signal', 'signal_count', 'signal_sum',
+        'window', 'window_pos', 'window_count', 'sum_short', 'sum_long',
+    )
+
+    def __init__(self):
+        self.open_date: Optional[date] = None
+        self.last_close = math.nan
+        self.rsi_gain = 0.0
+        self.rsi_loss = 0.0
+        self.rsi_count = 0
+        self.fast, self.fast_count, self.fast_sum = math.nan, 0, 0.0
+        self.slow, self.slow_count, self.slow_sum = math.nan, 0, 0.0
+        self.signal, self.signal_count, self.signal_sum = math.nan, 0, 0.0
+        # Ring buffer of the last SMA_LENGTHS[1] closes
+        self.window = array('d', [0.0] * SMA_LENGTHS[1])
+        self.window_pos = 0
+        self.window_count = 0
+        self.sum_short = 0.0
+        self.sum_long = 0.0
+
+    @classmethod
+    def from_closes(cls, closes: Sequence[float], open_date: Optional[date] = None) -> 'IndicatorState':
+        """Build a state from completed closes, oldest first."""
+        state = cls()
+        for close in closes:
+            state.push(float(close))
+        state.open_date = open_date
+        return state
+
+    def push(self, close: float) -> None:
+        """Commit a completed bar."""
+        self._step(close, commit=True)
+
+    def preview(self, close: float) -> Dict[str, Optional[float]]:
+        """Indicators if close ended the current (not yet completed) bar."""
+        return self._step(close, commit=False)
+
+    def _step(self, close: float, commit: bool) -> Dict[str, Optional[float]]:
+        """Advance every indicator by one bar, optionally committing the result."""
+        short_len, long_len = SMA_LENGTHS
+
+        # RSI (Wilder RMA as adjusted EWM sums)
+        gain, loss, rsi_count = self.rsi_gain, self.rsi_loss, self.rsi_count
+        if not math.isnan(self.last_close):
+            change = close - self.last_close
+            beta = 1.0 - 1.0 / RSI_LENGTH
+            gain = max(change, 0.0) + beta * gain
+            loss = max(-change, 0.0) + beta * loss
+            rsi_count += 1
+
+        # MACD
+        fast, fast_count, fast_sum = _ema_step(self.fast, self.fast_count, self.fast_sum, close, MACD_FAST)
+        slow, slow_count, slow_sum = _ema_step(self.slow, self.slow_count, self.slow_sum, close, MACD_SLOW)
+        macd = fast - slow
+        signal, signal_count, signal_sum = self.signal, self.signal_count, self.signal_sum
+        if not math.isnan(macd):
+            signal, signal_count, signal_sum = _ema_step(signal, signal_count, signal_sum, macd, MACD_SIGNAL)
+
+        # SMAs from the ring buffer: drop the values leaving each window
+        count = self.window_count + 1
+        leaving_long = self.window[self.window_pos] if self.window_count >= long_len else 0.0
+        leaving_short = self.window[(self.window_pos - short_len) % long_len] if self.window_count >= short_len else 0.0
+        sum_long = self.sum_long + close - leaving_long
+        sum_short = self.sum_short + close - leaving_short
+
+        if commit:
+            self.last_close = close
+            self.rsi_gain, self.rsi_loss, self.rsi_count = gain, loss, rsi_count
+            self.fast, self.fast_count, self.fast_sum = fast, fast_count, fast_sum
+            self.slow, self.slow_count, self.slow_sum = slow, slow_count, slow_sum
+            self.signal, self.signal_count, self.signal_sum = signal, signal_count, signal_sum
+            self.window[self.window_pos] = close
+            self.window_pos = (self.window_pos + 1) % long_len
+            self.window_count = count
+            self.sum_long, self.sum_short = sum_long, sum_short
+
+        rsi = 100.0 * gain / (gain + loss) if rsi_count >= RSI_LENGTH and gain + loss > 0 else math.nan
+        values = {
+            'rsi': rsi,
+            'macd': macd,
+            'macd_signal': signal,
+            'macd_histogram': macd - signal,
+            'sma_20': sum_short / short_len if count >= short_len else math.nan,
+            'sma_50': sum_long / long_len if count >= long_len else math.nan,
+        }
+        return {key: (None if math.isnan(value) else value) for key, value in values.items()}
@@ -0,0 +1,339 @@
+"""
+Immutable, versioned market snapshot.
+Trending tickers, their indicators, the market summary and scan results are
+built together in the background and swapped in atomically, so request
+handlers read one consistent view without locks or recomputation.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+import config
+from models.schemas import MarketSummary, ScanResponse, ScanSignal, TrendingResponse, TrendingTicker
+from services.analysis import build_scan, build_summary
+from services.openbb_client import openbb_client
+from services.stocktwits_client import stocktwits_client
+from services.serialization import EncodedBody
+from services.rate_limiter import Priority, priority_scope
+from services.upstream_pool import OverloadedError
+from services.cache_manager import cache, cache_origin, SNAPSHOT_ORIGIN
+
+# Fields stamped on every load or build rather than carrying market data.
+# They are left out when deciding whether a snapshot (or a record) changed.
+VOLATILE_FIELDS = frozenset({'last_updated', 'snapshot_version'})
+
+
+@dataclass(frozen=True)
+class MarketSnapshot:
+    """
+    One consistent, read-only view of the market.
+
+    Never mutated after construction: a refresh builds a new snapshot and
+    replaces the reference. Response models are built once here, and
+    serialized (plus gzip/brotli compressed) once into `bodies`, keyed
+    'trending', 'summary' and 'scan', so handlers can send bytes as-is.
+    `prewarmed` holds, per body, the cache keys it was built from that the
+    pre-warm scheduler had written, for handlers to count as prewarmed_hits.
+    """
+    version: int
+    fingerprint: str
+    created_at: float
+    built_at: str
+    trending: Tuple[Dict[str, Any], ...]
+    indicators: Mapping[str, Optional[Dict[str, Any]]]
+    trending_response: TrendingResponse
+    summary: MarketSummary
+    scan: ScanResponse
+    bodies: Mapping[str, EncodedBody]
+    prewarmed: Mapping[str, Tuple[str, ...]]
+
+
+class MarketSnapshotManager:
+    """
+    Builds market snapshots and publishes the latest one.
+
+    A background loop rebuilds every interval_seconds from the (cached)
+    trending list and indicators. A new version is only published when the
+    inputs actually changed, detected by a fingerprint of the inputs.
+    Publishing is a single reference assignment, so readers of `current`
+    never see a half-built snapshot and never take a lock. Builds read the
+    cache with the 'snapshot' origin, so they never count as requests
+    served from pre-warmed entries.
+    """
+
+    def __init__(self, interval_seconds: float = config.SNAPSHOT_REFRESH_SECONDS):
+        self.interval_seconds = interval_seconds
+        self.current: Optional[MarketSnapshot] = None
+        self._build_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self._listeners: List[Callable[[Optional[MarketSnapshot], MarketSnapshot], None]] = []
+
+    def add_listener(self, listener: Callable[[Optional[MarketSnapshot], MarketSnapshot], None]) -> None:
+        """
+        Register a callback run with (previous, current) after each new version.
+
+        Listeners run on the event loop right after the swap and must not block.
+        """
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    async def get(self, force_refresh: bool = False) -> Optional[MarketSnapshot]:
+        """
+        Return the current snapshot, building one first if needed.
+
+        Args:
+            force_refresh: If True, rebuild from freshly fetched trending data
+                (ignored while the cached trending list is younger than
+                config.FORCE_REFRESH_MIN_INTERVAL_SECONDS)
+
+        Returns:
+            Current snapshot, or None if trending data is unavailable
+        """
+        snapshot = self.current
+        if snapshot is not None and not force_refresh:
+            return snapshot
+        # Forced: refresh() decides, once and under its lock, whether to refetch
+        return await self.refresh(force_refresh=force_refresh)
+
+    async def refresh(self, force_refresh: bool = False) -> Optional[MarketSnapshot]:
+        """
+        Rebuild the snapshot and publish it if its inputs changed.
+
+        Concurrent callers are serialized; a caller that waited for another
+        build reuses its result unless force_refresh is set and the trending
+        list was last fetched from upstream more than
+        config.FORCE_REFRESH_MIN_INTERVAL_SECONDS ago.
+
+        Returns:
+            The published snapshot (new or unchanged), or None if trending
+            data is unavailable and nothing was published yet
+        """
+        if self._build_lock is None:
+            self._build_lock = asyncio.Lock()
+
+        previous = self.current
+        token = cache_origin.set(SNAPSHOT_ORIGIN)
+        try:
+            async with self._build_lock:
+                if force_refresh:
+                    # Coalesce forced refreshes: one that just ran serves them all
+                    if self.current is not None and not self._refresh_allowed():
+                        return self.current
+                elif self.current is not previous:
+                    return self.current
+
+                trending = await stocktwits_client.get_trending_tickers_async(force_refresh=force_refresh)
+                if not trending:
+                    return self.current
+
+                symbols = [ticker['symbol'] for ticker in trending]
+                indicators = await fetch_indicators_concurrently(symbols)
+                fingerprint = _fingerprint(trending, indicators)
+
+                if self.current is not None and self.current.fingerprint == fingerprint:
+                    return self.current
+
+                prewarmed = cache.prewarmed_keys(
+                    [stocktwits_client.cache_key] + [f"indicators_{symbol}" for symbol in symbols]
+                )
+                replaced = self.current
+                self.current = self._build(trending, indicators, fingerprint, prewarmed)
+
+                for listener in self._listeners:
+                    try:
+                        listener(replaced, self.current)
+                    except Exception as e:
+                        print(f"Error in market snapshot listener: {e}")
+                return self.current
+        finally:
+            cache_origin.reset(token)
+
+    def _refresh_allowed(self) -> bool:
+        """
+        True if a forced rebuild may refetch trending data.
+
+        Gated on the age of the cached trending entry, i.e. the last actual
+        upstream fetch, not on the last rebuild: background rebuilds read
+        the cache and must not keep forced refreshes locked out. Counts a
+        throttled refresh in the cache stats, so it is checked once per
+        forced request.
+        """
+        return cache.refresh_allowed(stocktwits_client.cache_key)
+
+    def _build(
+        self,
+        trending: List[Dict[str, Any]],
+        indicators: Dict[str, Optional[Dict[str, Any]]],
+        fingerprint: str,
+        prewarmed: Tuple[str, ...] = ()
+    ) -> MarketSnapshot:
+        """Compute summary and scan results and freeze them into a snapshot."""
+        version = self.current.version + 1 if self.current is not None else 1
+        created_at = time.time()
+        built_at = datetime.fromtimestamp(created_at).isoformat()
+        scan = build_scan(trending, indicators)
+
+        trending_response = TrendingResponse(
+            tickers=[TrendingTicker(**ticker) for ticker in trending],
+            count=len(trending),
+            last_updated=built_at,
+            snapshot_version=version
+        )
+        summary = MarketSummary(
+            **build_summary(trending, indicators),
+            last_updated=built_at,
+            snapshot_version=version
+        )
+        scan_response = ScanResponse(
+            bullish=[ScanSignal(**signal) for signal in scan['bullish']],
+            bearish=[ScanSignal(**signal) for signal in scan['bearish']],
+            total_scanned=scan['total_scanned'],
+            last_updated=built_at,
+            snapshot_version=version
+        )
+
+        return MarketSnapshot(
+            version=version,
+            fingerprint=fingerprint,
+            created_at=created_at,
+            built_at=built_at,
+            trending=tuple(trending),
+            indicators=MappingProxyType(dict(indicators)),
+            trending_response=trending_response,
+            summary=summary,
+            scan=scan_response,
+            bodies=MappingProxyType({
+                'trending': EncodedBody(trending_response),
+                'summary': EncodedBody(summary),
+                'scan': EncodedBody(scan_response)
+            }),
+            prewarmed=MappingProxyType({
+                'trending': tuple(key for key in prewarmed if key == stocktwits_client.cache_key),
+                'summary': prewarmed,
+                'scan': prewarmed
+            })
+        )
+
+    async def run_loop(self) -> None:
+        """Rebuild the snapshot every interval until cancelled."""
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error refreshing market snapshot: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        """Start the background refresh loop on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run_loop())
+
+    async def stop(self) -> None:
+        """Cancel the background refresh loop, if running."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+
+def _fingerprint(trending: List[Dict[str, Any]], indicators: Dict[str, Optional[Dict[str, Any]]]) -> str:
+    """
+    Stable hash of snapshot inputs, used to skip rebuilding unchanged data.
+
+    VOLATILE_FIELDS are excluded: indicators are re-stamped with
+    last_updated on every load even when their values did not change.
+    """
+    payload = json.dumps(
+        [
+            [without_volatile(ticker) for ticker in trending],
+            {symbol: without_volatile(record) for symbol, record in indicators.items()}
+        ],
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def without_volatile(record: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Copy of a ticker/indicator record without VOLATILE_FIELDS (None stays None)."""
+    if not record:
+        return record
+    return {key: value for key, value in record.items() if key not in VOLATILE_FIELDS}
+
+
+# Helper functions for indicator fan-out
+
+async def fetch_indicators_concurrently(symbols: List[str]) -> Dict[str, Optional[dict]]:
+    """
+    Fetch technical indicators for many symbols with batched provider calls.
+
+    Symbols are split into batches of config.OPENBB_BATCH_SIZE; at most
+    config.SCAN_CONCURRENCY batches are in flight at once and each one gets
+    config.SCAN_SYMBOL_TIMEOUT seconds. Symbols in batches that time out or
+    fail get their retained indicators, or None if nothing is retained, so
+    callers can still build a partial result.
+
+    Args:
+        symbols: Ticker symbols to fetch (duplicates are fetched once)
+
+    Returns:
+        Dictionary of symbol -> indicators dict (or None on failure)
+    """
+    semaphore = asyncio.Semaphore(config.SCAN_CONCURRENCY)
+    unique_symbols = list(dict.fromkeys(symbols))
+    results: Dict[str, Optional[dict]] = {}
+    for batch_result in await asyncio.gather(
+        *(fetch_indicator_batch(batch, semaphore) for batch in symbol_batches(unique_symbols))
+    ):
+        results.update(batch_result)
+
+    return {symbol: results.get(symbol) for symbol in unique_symbols}
+
+
+async def fetch_indicator_batch(
+    batch: List[str],
+    semaphore: asyncio.Semaphore,
+    force_refresh: bool = False
+) -> Dict[str, Optional[dict]]:
+    """
+    Fetch one batch of indicators.
+
+    Runs at bulk priority (or background, inside a pre-warm cycle), so
+    interactive requests get upstream capacity first. A batch that is shed
+    under load, times out or fails gets retained (stale) indicators.
+    """
+    async with semaphore:
+        try:
+            with priority_scope(Priority.BULK):
+                return await asyncio.wait_for(
+                    openbb_client.get_technical_indicators_batch_async(batch, force_refresh=force_refresh),
+                    timeout=config.SCAN_SYMBOL_TIMEOUT
+                )
+        except asyncio.TimeoutError:
+            print(f"Timed out fetching indicators for {', '.join(batch)}")
+        except OverloadedError:
+            # Shed: answer with whatever is retained instead of queueing
+            pass
+        except Exception as e:
+            print(f"Error fetching indicators for {', '.join(batch)}: {e}")
+        return {symbol: cache.get_stale(f"indicators_{symbol}") for symbol in batch}
+
+
+def symbol_batches(symbols: List[str]) -> List[List[str]]:
+    """Split symbols into provider batches of config.OPENBB_BATCH_SIZE."""
+    size = max(1, config.OPENBB_BATCH_SIZE)
+    return [symbols[i:i + size] for i in range(0, len(symbols), size)]
+
+
+# Global snapshot manager instance
+market_snapshot = MarketSnapshotManager()
@@ -3,17 +3,29 @@ OpenBB Platform client for fetching market data, indicators, and news.
 Handles technical analysis, quotes, and news for stocks and crypto.
 """
 
+import functools
+import importlib.util
+import math
+import time
+from concurrent.futures import Future
+from threading import Lock, Thread
 from typing import Dict, List, Optional, Any
-from datetime import datetime, timedelta
+from datetime import date, datetime
 import config
 from services.cache_manager import cache
-
-try:
-    from openbb import obb
-    import pandas_ta as ta
-    OPENBB_AVAILABLE = True
-except ImportError:
-    OPENBB_AVAILABLE = False
+from services.upstream_pool import upstream_pools
+from services.resilience import CircuitOpenError, openbb_guard
+from services.sentiment import sentiment_scorer
+from services.indicators import IndicatorState, compute_indicators, indicators_for_rows, stack_closes
+
+# Heavy analytics imports (OpenBB, and pandas via the bar store) are loaded in
+# a background thread by OpenBBClient.start_loading so startup stays fast
+obb = None
+bar_store = None
+history_window = None
+
+OPENBB_AVAILABLE = importlib.util.find_spec("openbb") is not None
+if not OPENBB_AVAILABLE:
     print("Warning: OpenBB not installed. Install with: pip install openbb")
 
 
@@ -22,6 +34,88 @@ class OpenBBClient:
 
     def __init__(self):
         self.available = OPENBB_AVAILABLE
+        self.import_seconds: Optional[float] = None
+        self.load_error: Optional[str] = None
+        self._load_future: Optional[Future] = None
+        self._load_lock = Lock()
+        # Per-symbol incremental indicator state, advanced by history syncs and quote ticks
+        self._states: Dict[str, IndicatorState] = {}
+        self._states_lock = Lock()
+
+    def start_loading(self) -> Future:
+        """
+        Import OpenBB and the bar store in a background thread (idempotent).
+
+        Called from the app startup hook so the server accepts connections
+        while the import runs; calls that need OpenBB wait for it.
+
+        Returns:
+            Future resolving to True once loaded, False if unavailable
+        """
+        with self._load_lock:
+            if self._load_future is None:
+                self._load_future = Future()
+                if self.available:
+                    Thread(target=self._load_analytics, name="openbb-import", daemon=True).start()
+                else:
+                    self.load_error = "OpenBB is not installed"
+                    self._load_future.set_result(False)
+            return self._load_future
+
+    def _load_analytics(self) -> None:
+        """Import the analytics stack and publish the outcome on the load future."""
+        global obb, bar_store, history_window
+        started = time.perf_counter()
+        try:
+            from openbb import obb as openbb_obb
+            from services.bar_store import bar_store as store, history_window as window
+            obb, bar_store, history_window = openbb_obb, store, window
+            loaded = True
+        except Exception as e:
+            print(f"Error importing OpenBB: {e}")
+            self.load_error = f"Error importing OpenBB: {e}"
+            self.available = False
+            loaded = False
+
+        self.import_seconds = round(time.perf_counter() - started, 3)
+        self._load_future.set_result(loaded)
+
+    def _require_analytics(self) -> None:
+        """Block until the analytics stack is imported; raise if it failed."""
+        if not self.start_loading().result():
+            raise RuntimeError("OpenBB is not available")
+
+    def is_ready(self) -> bool:
+        """Check if the OpenBB import has finished successfully."""
+        future = self._load_future
+        return future is not None and future.done() and future.result()
+
+    def get_load_status(self) -> Dict[str, Any]:
+        """
+        Get the state of the background OpenBB import.
+
+        Returns:
+            Dictionary with available, loading, ready, import_seconds and
+            error (why OpenBB is not ready, or None once it is)
+        """
+        future = self._load_future
+        loading = future is not None and not future.done()
+        ready = self.is_ready()
+        if ready:
+            error = None
+        elif future is None:
+            error = "OpenBB loading has not started"
+        elif loading:
+            error = "OpenBB is still loading"
+        else:
+            error = self.load_error
+        return {
+            'available': self.available,
+            'loading': loading,
+            'ready': ready,
+            'import_seconds': self.import_seconds,
+            'error': error
+        }
 
     def get_quote(self, symbol: str, force_refresh: bool = False) -> Optional[Dict[str, Any]]:
         """
@@ -37,16 +131,19 @@ class OpenBBClient:
         if not self.available:
             return None
 
-        cache_key = f"quote_{symbol}"
-
-        if not force_refresh:
-            cached = cache.get(cache_key)
-            if cached:
-                return cached
+        return cache.get_or_compute(
+            f"quote_{symbol}",
+            functools.partial(self._fetch_quote, symbol),
+            force_refresh=force_refresh
+        )
 
+    def _fetch_quote(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Fetch quote data for a symbol from the provider (no caching)."""
         try:
+            self._require_analytics()
+
             # Fetch quote data
-            result = obb.equity.price.quote(symbol=symbol, provider="yfinance")
+            result = openbb_guard.call(obb.equity.price.quote, symbol=symbol, provider="yfinance")
 
             if result and hasattr(result, 'results') and result.results:
                 data = result.results[0]
@@ -59,14 +156,83 @@ class OpenBBClient:
                     'last_updated': datetime.now().isoformat()
                 }
 
-                cache.set(cache_key, quote_data)
+                self._on_quote_tick(symbol, quote_data)
                 return quote_data
 
+        except CircuitOpenError:
+            # Provider is failing; the cache answers with retained data
+            return None
+
         except Exception as e:
             print(f"Error fetching quote for {symbol}: {e}")
 
         return None
 
+    def get_quotes(self, symbols: List[str], force_refresh: bool = False) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Get quotes for many symbols using multi-symbol provider requests.
+
+        Quotes are loaded through cache.get_or_compute_many: cached quotes
+        are reused, quotes another caller is already fetching are waited
+        on, and the rest are fetched in chunks of config.OPENBB_BATCH_SIZE.
+
+        Args:
+            symbols: Stock or crypto ticker symbols
+            force_refresh: If True, bypass cache
+
+        Returns:
+            Dictionary of symbol -> quote data (None if unavailable)
+        """
+        symbols = list(dict.fromkeys(symbols))
+        if not self.available:
+            return {symbol: None for symbol in symbols}
+
+        quotes = cache.get_or_compute_many(
+            [f"quote_{symbol}" for symbol in symbols],
+            self._load_quotes,
+            force_refresh=force_refresh
+        )
+        return {symbol: quotes[f"quote_{symbol}"] for symbol in symbols}
+
+    def _load_quotes(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Batch loader for quote_{symbol} cache keys (no caching)."""
+        loaded = {}
+        for chunk in _chunks([_key_symbol(key) for key in keys], config.OPENBB_BATCH_SIZE):
+            for symbol, quote_data in self._fetch_quotes(chunk).items():
+                self._on_quote_tick(symbol, quote_data)
+                loaded[f"quote_{symbol}"] = quote_data
+        return loaded
+
+    def _fetch_quotes(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch quotes for several symbols in one provider request (no caching)."""
+        quotes = {}
+        try:
+            self._require_analytics()
+            result = openbb_guard.call(obb.equity.price.quote, symbol=",".join(symbols), provider="yfinance")
+
+            if result and hasattr(result, 'results') and result.results:
+                now = datetime.now().isoformat()
+                for data in result.results:
+                    symbol = getattr(data, 'symbol', None) or (symbols[0] if len(symbols) == 1 else None)
+                    if symbol not in symbols:
+                        continue
+                    quotes[symbol] = {
+                        'symbol': symbol,
+                        'price': getattr(data, 'last_price', None) or getattr(data, 'price', 0),
+                        'volume': getattr(data, 'volume', 0),
+                        'change': getattr(data, 'change', 0),
+                        'change_percent': getattr(data, 'change_percent', 0),
+                        'last_updated': now
+                    }
+
+        except CircuitOpenError:
+            pass
+
+        except Exception as e:
+            print(f"Error fetching quotes for {', '.join(symbols)}: {e}")
+
+        return quotes
+
     def get_technical_indicators(self, symbol: str, force_refresh: bool = False) -> Optional[Dict[str, Any]]:
         """
         Get technical indicators (RSI, MACD, SMAs) for a symbol.
@@ -81,75 +247,260 @@ class OpenBBClient:
         if not self.available:
             return None
 
-        cache_key = f"indicators_{symbol}"
-
-        if not force_refresh:
-            cached = cache.get(cache_key)
-            if cached:
-                return cached
+        return cache.get_or_compute(
+            f"indicators_{symbol}",
+            functools.partial(self._fetch_technical_indicators, symbol),
+            force_refresh=force_refresh
+        )
 
+    def _fetch_technical_indicators(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Download history and calculate indicators for a symbol (no caching)."""
         try:
-            # Fetch historical data for calculations
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=100)  # Need enough data for 50-day SMA
-
-            historical = obb.equity.price.historical(
-                symbol=symbol,
-                start_date=start_date.strftime('%Y-%m-%d'),
-                end_date=end_date.strftime('%Y-%m-%d'),
-                provider="yfinance"
-            )
-
-            if not historical or not hasattr(historical, 'results'):
+            # Today's bar is already seeded: a quote is enough, no history download
+            if self._has_live_state(symbol):
+                quote = self.get_quote(symbol)
+                if quote and quote.get('price'):
+                    indicators = self._indicators_from_state(symbol, quote)
+                    if indicators is not None:
+                        return indicators
+
+            # Fetch historical data for calculations (only missing bars are downloaded)
+            self._require_analytics()
+            start_date, end_date = history_window()  # Need enough data for 50-day SMA
+            df = bar_store.get_bars(symbol, start_date, end_date, self._download_history)
+
+            if df is None or df.empty:
                 return None
 
-            # Convert to DataFrame for technical analysis
-            df = historical.to_dataframe()
+            self._sync_state(symbol, df)
+            return self._indicators_from_bars({symbol: df})[symbol]
 
-            if df.empty:
-                return None
+        except CircuitOpenError:
+            return None
 
-            # Calculate RSI using pandas_ta
-            df.ta.rsi(length=14, append=True)
-            rsi_value = float(df['RSI_14'].iloc[-1]) if 'RSI_14' in df.columns else None
+        except Exception as e:
+            print(f"Error calculating indicators for {symbol}: {e}")
+            return None
 
-            # Calculate MACD using pandas_ta
-            df.ta.macd(fast=12, slow=26, signal=9, append=True)
-            macd_value = float(df['MACD_12_26_9'].iloc[-1]) if 'MACD_12_26_9' in df.columns else None
-            macd_signal = float(df['MACDs_12_26_9'].iloc[-1]) if 'MACDs_12_26_9' in df.columns else None
-            macd_histogram = float(df['MACDh_12_26_9'].iloc[-1]) if 'MACDh_12_26_9' in df.columns else None
+    def get_technical_indicators_batch(self, symbols: List[str], force_refresh: bool = False) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Get technical indicators for many symbols with batched provider calls.
 
-            # Calculate SMAs using pandas_ta
-            df.ta.sma(length=20, append=True)
-            df.ta.sma(length=50, append=True)
+        Indicators are loaded through cache.get_or_compute_many: cached
+        indicators are reused and symbols another caller is already loading
+        are waited on. Of the rest, symbols with live indicator state are
+        priced from one batched quote request; the others share batched
+        history downloads and one vectorized indicator pass.
 
-            sma_20_value = float(df['SMA_20'].iloc[-1]) if 'SMA_20' in df.columns else None
-            sma_50_value = float(df['SMA_50'].iloc[-1]) if 'SMA_50' in df.columns else None
+        Args:
+            symbols: Stock or crypto ticker symbols
+            force_refresh: If True, bypass cache
 
-            # Get latest price and volume
-            latest_price = float(df['close'].iloc[-1])
-            latest_volume = int(df['volume'].iloc[-1])
+        Returns:
+            Dictionary of symbol -> indicators dict (None if unavailable)
+        """
+        symbols = list(dict.fromkeys(symbols))
+        if not self.available:
+            return {symbol: None for symbol in symbols}
+
+        indicators = cache.get_or_compute_many(
+            [f"indicators_{symbol}" for symbol in symbols],
+            functools.partial(self._load_indicators, force_refresh=force_refresh),
+            force_refresh=force_refresh
+        )
+        return {symbol: indicators[f"indicators_{symbol}"] for symbol in symbols}
+
+    def _load_indicators(self, keys: List[str], force_refresh: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Batch loader for indicators_{symbol} cache keys (no caching)."""
+        symbols = [_key_symbol(key) for key in keys]
+        results: Dict[str, Dict[str, Any]] = {}
+
+        # Symbols already seeded for today only need a quote
+        live = [symbol for symbol in symbols if self._has_live_state(symbol)]
+        if live:
+            quotes = self.get_quotes(live, force_refresh=force_refresh)
+            for symbol in live:
+                quote = quotes.get(symbol)
+                if quote and quote.get('price'):
+                    indicators = self._indicators_from_state(symbol, quote)
+                    if indicators is not None:
+                        results[symbol] = indicators
+
+        need_history = [symbol for symbol in symbols if symbol not in results]
+        if need_history and self.start_loading().result():
+            start_date, end_date = history_window()
+            frames = self.get_histories(need_history, start_date, end_date)
+            frames = {symbol: df for symbol, df in frames.items() if df is not None and not df.empty}
+            if frames:
+                for symbol, df in frames.items():
+                    self._sync_state(symbol, df)
+                results.update(self._indicators_from_bars(frames))
+
+        return {f"indicators_{symbol}": indicators for symbol, indicators in results.items()}
+
+    def get_histories(self, symbols: List[str], start_date: date, end_date: date) -> Dict[str, Optional[Any]]:
+        """
+        Get daily bars for many symbols through the bar store.
+
+        Only missing bars are downloaded, in multi-symbol requests of up to
+        config.OPENBB_BATCH_SIZE symbols. Symbols in a request that failed
+        map to None, so callers fall back to their retained results.
 
-            indicators = {
+        Args:
+            symbols: Stock or crypto ticker symbols
+            start_date: First date of the window
+            end_date: Last date of the window
+
+        Returns:
+            Dictionary of symbol -> DataFrame of bars (None if unavailable)
+        """
+        if not self.available or not self.start_loading().result():
+            return {symbol: None for symbol in symbols}
+
+        results: Dict[str, Optional[Any]] = {}
+        for chunk in _chunks(list(dict.fromkeys(symbols)), config.OPENBB_BATCH_SIZE):
+            try:
+                results.update(bar_store.get_bars_batch(chunk, start_date, end_date, self._download_histories))
+            except CircuitOpenError:
+                results.update(dict.fromkeys(chunk))
+            except Exception as e:
+                print(f"Error downloading bars for {', '.join(chunk)}: {e}")
+                results.update(dict.fromkeys(chunk))
+        return results
+
+    def _has_live_state(self, symbol: str) -> bool:
+        """True if the symbol's state is seeded up to and including today's open bar."""
+        with self._states_lock:
+            state = self._states.get(symbol)
+            return state is not None and state.open_date == date.today()
+
+    def _sync_state(self, symbol: str, df: Any) -> None:
+        """
+        Bring a symbol's indicator state up to date with its daily bars.
+
+        Every bar except the newest is committed; the newest stays open so
+        quote ticks can price it. An existing state is rolled forward by the
+        bars completed since its open bar; otherwise it is seeded from scratch.
+        """
+        closes = df['close'].to_numpy(dtype=float)
+        dates = list(df.index)
+
+        with self._states_lock:
+            state = self._states.get(symbol)
+            if state is not None and state.open_date in dates:
+                start = dates.index(state.open_date)
+                for close in closes[start:-1]:
+                    state.push(float(close))
+            else:
+                state = IndicatorState.from_closes(closes[:-1])
+                self._states[symbol] = state
+            state.open_date = dates[-1]
+
+    def _indicators_from_state(self, symbol: str, quote: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Price the open bar of a symbol's state with a quote (O(1))."""
+        with self._states_lock:
+            state = self._states.get(symbol)
+            if state is None:
+                return None
+            values = state.preview(float(quote['price']))
+
+        return {
+            'symbol': symbol,
+            **values,
+            'price': float(quote['price']),
+            'volume': int(quote.get('volume') or 0),
+            'last_updated': datetime.now().isoformat()
+        }
+
+    def _on_quote_tick(self, symbol: str, quote: Dict[str, Any]) -> None:
+        """Refresh cached indicators from a new quote when the symbol has live state."""
+        if not quote.get('price') or not self._has_live_state(symbol):
+            return
+        indicators = self._indicators_from_state(symbol, quote)
+        if indicators is not None:
+            cache.set(f"indicators_{symbol}", indicators)
+
+    @staticmethod
+    def _indicators_from_bars(frames: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        Calculate indicators for many symbols in one vectorized pass.
+
+        Args:
+            frames: Dictionary of symbol -> non-empty DataFrame of daily bars
+
+        Returns:
+            Dictionary of symbol -> indicators dict
+        """
+        symbols = list(frames)
+        closes = stack_closes([frames[symbol]['close'].to_numpy(dtype=float) for symbol in symbols])
+        values = indicators_for_rows(compute_indicators(closes))
+        now = datetime.now().isoformat()
+
+        results = {}
+        for symbol, indicator_values in zip(symbols, values):
+            df = frames[symbol]
+            volume = float(df['volume'].iloc[-1])
+            results[symbol] = {
                 'symbol': symbol,
-                'rsi': rsi_value,
-                'macd': macd_value,
-                'macd_signal': macd_signal,
-                'macd_histogram': macd_histogram,
-                'sma_20': sma_20_value,
-                'sma_50': sma_50_value,
-                'price': latest_price,
-                'volume': latest_volume,
-                'last_updated': datetime.now().isoformat()
+                **indicator_values,
+                # Latest price and volume (NaN when the provider sends none)
+                'price': float(df['close'].iloc[-1]),
+                'volume': 0 if math.isnan(volume) else int(volume),
+                'last_updated': now
             }
+        return results
 
-            cache.set(cache_key, indicators)
-            return indicators
+    @staticmethod
+    def _download_history(symbol: str, start_date: date, end_date: date) -> Optional[Any]:
+        """
+        Download daily bars for a date range from the provider.
 
-        except Exception as e:
-            print(f"Error calculating indicators for {symbol}: {e}")
+        Returns:
+            DataFrame of bars, or None if the provider returned nothing
+        """
+        historical = openbb_guard.call(
+            obb.equity.price.historical,
+            symbol=symbol,
+            start_date=start_date.strftime('%Y-%m-%d'),
+            end_date=end_date.strftime('%Y-%m-%d'),
+            provider="yfinance"
+        )
+
+        if not historical or not hasattr(historical, 'results'):
             return None
 
+        return historical.to_dataframe()
+
+    @staticmethod
+    def _download_histories(symbols: List[str], start_date: date, end_date: date) -> Dict[str, Any]:
+        """
+        Download daily bars for several symbols in one provider request.
+
+        Returns:
+            Dictionary of symbol -> DataFrame of bars (symbols without data are omitted)
+        """
+        historical = openbb_guard.call(
+            obb.equity.price.historical,
+            symbol=",".join(symbols),
+            start_date=start_date.strftime('%Y-%m-%d'),
+            end_date=end_date.strftime('%Y-%m-%d'),
+            provider="yfinance"
+        )
+
+        if not historical or not hasattr(historical, 'results'):
+            return {}
+
+        df = historical.to_dataframe()
+        if 'symbol' not in df.columns:
+            # Single-symbol responses carry no symbol column
+            return {symbols[0]: df} if len(symbols) == 1 else {}
+
+        return {
+            symbol: group.drop(columns='symbol')
+            for symbol, group in df.groupby('symbol', sort=False)
+            if symbol in symbols
+        }
+
     def get_news(self, symbol: str, limit: int = 10, force_refresh: bool = False) -> List[Dict[str, Any]]:
         """
         Get recent news for a symbol.
@@ -165,69 +516,102 @@ class OpenBBClient:
         if not self.available:
             return []
 
-        cache_key = f"news_{symbol}"
-
-        if not force_refresh:
-            cached = cache.get(cache_key)
-            if cached:
-                return cached
+        news_items = cache.get_or_compute(
+            f"news_{symbol}",
+            functools.partial(self._fetch_news, symbol, limit),
+            force_refresh=force_refresh
+        )
+        return news_items if news_items is not None else []
 
+    def _fetch_news(self, symbol: str, limit: int) -> Optional[List[Dict[str, Any]]]:
+        """Fetch news articles for a symbol from the provider (no caching)."""
         try:
+            self._require_analytics()
+
             # Fetch company news
-            result = obb.news.company(symbol=symbol, limit=limit, provider="yfinance")
+            result = openbb_guard.call(obb.news.company, symbol=symbol, limit=limit, provider="yfinance")
 
             if not result or not hasattr(result, 'results'):
-                return []
+                return None
+
+            articles = list(result.results)
+            sentiments = sentiment_scorer.score_batch([getattr(article, 'title', '') for article in articles])
 
             news_items = []
-            for article in result.results:
+            for article, sentiment in zip(articles, sentiments):
                 news_items.append({
                     'title': getattr(article, 'title', 'No title'),
                     'source': getattr(article, 'source', 'Unknown'),
                     'published_date': str(getattr(article, 'date', datetime.now())),
                     'url': getattr(article, 'url', ''),
-                    'sentiment': self._analyze_sentiment(getattr(article, 'title', ''))
+                    'sentiment': sentiment
                 })
 
-            cache.set(cache_key, news_items)
             return news_items
 
+        except CircuitOpenError:
+            return None
+
         except Exception as e:
             print(f"Error fetching news for {symbol}: {e}")
-            return []
+            return None
 
-    @staticmethod
-    def _analyze_sentiment(text: str) -> str:
-        """
-        Simple rule-based sentiment analysis.
+    async def get_quote_async(self, symbol: str, force_refresh: bool = False) -> Optional[Dict[str, Any]]:
+        """Async variant of get_quote; runs misses in the OpenBB worker pool."""
+        if not self.available:
+            return None
 
-        Args:
-            text: Text to analyze (headline)
+        return await cache.get_or_compute_async(
+            f"quote_{symbol}",
+            functools.partial(upstream_pools.run, 'openbb', self._fetch_quote, symbol),
+            force_refresh=force_refresh
+        )
 
-        Returns:
-            'positive', 'negative', or 'neutral'
-        """
-        text_lower = text.lower()
+    async def get_technical_indicators_async(self, symbol: str, force_refresh: bool = False) -> Optional[Dict[str, Any]]:
+        """Async variant of get_technical_indicators; runs misses in the OpenBB worker pool."""
+        if not self.available:
+            return None
 
-        # Positive keywords
-        positive_words = ['gain', 'up', 'surge', 'rally', 'buy', 'bullish', 'growth', 'profit', 'beat', 'success']
-        # Negative keywords
-        negative_words = ['loss', 'down', 'fall', 'drop', 'sell', 'bearish', 'decline', 'miss', 'fail', 'cut']
+        return await cache.get_or_compute_async(
+            f"indicators_{symbol}",
+            functools.partial(upstream_pools.run, 'openbb', self._fetch_technical_indicators, symbol),
+            force_refresh=force_refresh
+        )
 
-        positive_count = sum(1 for word in positive_words if word in text_lower)
-        negative_count = sum(1 for word in negative_words if word in text_lower)
+    async def get_technical_indicators_batch_async(self, symbols: List[str], force_refresh: bool = False) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Async variant of get_technical_indicators_batch; runs in the OpenBB worker pool."""
+        if not self.available:
+            return {symbol: None for symbol in symbols}
 
-        if positive_count > negative_count:
-            return 'positive'
-        elif negative_count > positive_count:
-            return 'negative'
-        else:
-            return 'neutral'
+        return await upstream_pools.run('openbb', self.get_technical_indicators_batch, symbols, force_refresh)
+
+    async def get_news_async(self, symbol: str, limit: int = 10, force_refresh: bool = False) -> List[Dict[str, Any]]:
+        """Async variant of get_news; runs misses in the OpenBB worker pool."""
+        if not self.available:
+            return []
+
+        news_items = await cache.get_or_compute_async(
+            f"news_{symbol}",
+            functools.partial(upstream_pools.run, 'openbb', self._fetch_news, symbol, limit),
+            force_refresh=force_refresh
+        )
+        return news_items if news_items is not None else []
 
     def is_available(self) -> bool:
         """Check if OpenBB is available."""
         return self.available
 
 
+def _chunks(items: List[str], size: int) -> List[List[str]]:
+    """Split a list into consecutive chunks of at most size items."""
+    size = max(1, size)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _key_symbol(key: str) -> str:
+    """Symbol of a per-symbol cache key such as "quote_AAPL"."""
+    return key.partition('_')[2]
+
+
 # Global client instance
 openbb_client = OpenBBClient()
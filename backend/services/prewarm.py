@@ -0,0 +1,176 @@
+"""
+Background pre-warm scheduler for trending symbols.
+Refreshes the trending list on a fixed cadence and reloads quote, indicator
+and news entries for every trending symbol before their TTL lapses.
+"""
+
+import asyncio
+import random
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+import config
+from services.cache_manager import cache, cache_origin, PREWARM_ORIGIN
+from services.stocktwits_client import stocktwits_client
+from services.openbb_client import openbb_client
+from services.upstream_pool import upstream_pools
+from services.rate_limiter import Priority, priority_scope
+from services.market_snapshot import symbol_batches
+
+
+class PrewarmScheduler:
+    """
+    Periodically warms the cache for the current trending symbols.
+
+    Each cycle force-refreshes the trending list, then reloads every
+    quote_, indicators_ and news_ entry of a trending symbol that is missing
+    or would expire before the next cycle. Quotes and indicators are loaded
+    in provider batches; news is loaded per symbol. Every warm task starts
+    after a random delay of up to jitter_seconds and at most concurrency
+    tasks run at once, so a cycle never bursts against the upstreams.
+
+    Loads run with the cache origin set to 'prewarm'; the cache counts
+    requests later served from those entries as prewarmed_hits.
+    """
+
+    def __init__(
+        self,
+        interval_seconds: float = config.PREWARM_INTERVAL_SECONDS,
+        jitter_seconds: float = config.PREWARM_JITTER_SECONDS,
+        concurrency: int = config.PREWARM_CONCURRENCY
+    ):
+        self.interval_seconds = interval_seconds
+        self.jitter_seconds = jitter_seconds
+        self.concurrency = concurrency
+        self._task: Optional[asyncio.Task] = None
+        self._stats: Dict[str, Any] = {
+            'cycles': 0,
+            'entries_warmed': 0,
+            'errors': 0,
+            'symbols': 0,
+            'last_run': None,
+            'last_duration_seconds': None
+        }
+
+    async def run_once(self) -> int:
+        """
+        Run one warm cycle.
+
+        Returns:
+            Number of cache entries refreshed
+        """
+        token = cache_origin.set(PREWARM_ORIGIN)
+        try:
+            with priority_scope(Priority.BACKGROUND):
+                return await self._run_cycle()
+        finally:
+            cache_origin.reset(token)
+
+    async def _run_cycle(self) -> int:
+        """Refresh trending, then warm every due entry of its symbols."""
+        started = time.time()
+
+        trending = await stocktwits_client.get_trending_tickers_async(force_refresh=True)
+        symbols = list(dict.fromkeys(ticker['symbol'] for ticker in trending or []))
+
+        # Only reload what would otherwise expire before the next cycle
+        horizon = self.interval_seconds + self.jitter_seconds
+        due = {
+            prefix: [symbol for symbol in symbols if self._is_due(f"{prefix}_{symbol}", horizon)]
+            for prefix in ('quote', 'indicators', 'news')
+        }
+
+        if not openbb_client.is_available():
+            due = {prefix: [] for prefix in due}
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = [
+            self._warm(semaphore, len(batch), upstream_pools.run, 'openbb', openbb_client.get_quotes, batch, True)
+            for batch in symbol_batches(due['quote'])
+        ] + [
+            self._warm(
+                semaphore, len(batch), upstream_pools.run, 'openbb',
+                openbb_client.get_technical_indicators_batch, batch, True
+            )
+            for batch in symbol_batches(due['indicators'])
+        ] + [
+            self._warm(semaphore, 1, openbb_client.get_news_async, symbol, config.MAX_NEWS_ARTICLES, True)
+            for symbol in due['news']
+        ]
+        warmed = sum(await asyncio.gather(*tasks))
+
+        self._stats['cycles'] += 1
+        self._stats['entries_warmed'] += warmed
+        self._stats['symbols'] = len(symbols)
+        self._stats['last_run'] = datetime.fromtimestamp(started).isoformat()
+        self._stats['last_duration_seconds'] = round(time.time() - started, 3)
+        return warmed
+
+    async def _warm(
+        self,
+        semaphore: asyncio.Semaphore,
+        entries: int,
+        func: Callable[..., Awaitable[Any]],
+        *args
+    ) -> int:
+        """Run one warm task after a random delay; returns entries warmed (0 on error)."""
+        await asyncio.sleep(random.uniform(0, self.jitter_seconds))
+        async with semaphore:
+            try:
+                await func(*args)
+                return entries
+            except Exception as e:
+                self._stats['errors'] += 1
+                print(f"Error pre-warming cache: {e}")
+                return 0
+
+    @staticmethod
+    def _is_due(key: str, horizon: float) -> bool:
+        """True if key is missing or would go stale within horizon seconds."""
+        remaining = cache.expires_in(key)
+        return remaining is None or remaining < horizon
+
+    async def run_loop(self) -> None:
+        """Run warm cycles every interval (plus jitter) until cancelled."""
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._stats['errors'] += 1
+                print(f"Error in pre-warm cycle: {e}")
+            await asyncio.sleep(self.interval_seconds + random.uniform(0, self.jitter_seconds))
+
+    def start(self) -> None:
+        """Start the scheduler on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run_loop())
+
+    async def stop(self) -> None:
+        """Cancel the scheduler, if running."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get scheduler counters plus how many reads were served from warmed entries.
+
+        Returns:
+            Dictionary of pre-warm statistics
+        """
+        return {
+            'enabled': self._task is not None and not self._task.done(),
+            'interval_seconds': self.interval_seconds,
+            **self._stats,
+            'prewarmed_hits': cache.get_stats()['prewarmed_hits']
+        }
+
+
+# Global scheduler instance
+prewarm_scheduler = PrewarmScheduler()
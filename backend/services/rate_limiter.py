@@ -0,0 +1,192 @@
+"""
+Per-provider rate limiting with priorities.
+A token bucket paces calls to each upstream; when callers have to wait,
+interactive requests are served before bulk work, and bulk work before
+background work such as cache pre-warming.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from threading import Condition
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import config
+
+
+class Priority(IntEnum):
+    """Scheduling priority of upstream work; lower values are served first."""
+    INTERACTIVE = 0
+    BULK = 1
+    BACKGROUND = 2
+
+
+# Priority of the work running in the current context. Carried into worker
+# threads by upstream_pools.run, so raw provider calls inherit it.
+request_priority: ContextVar[Priority] = ContextVar('request_priority', default=Priority.INTERACTIVE)
+
+
+@contextmanager
+def priority_scope(priority: Priority) -> Iterator[Priority]:
+    """
+    Run a block at `priority`, or at the current priority if that is lower.
+
+    Scopes only ever demote: bulk work started from a background job stays
+    background.
+
+    Yields:
+        The effective priority inside the block
+    """
+    effective = max(request_priority.get(), priority)
+    token = request_priority.set(effective)
+    try:
+        yield effective
+    finally:
+        request_priority.reset(token)
+
+
+class RateLimiter:
+    """
+    Token bucket with priority-ordered waiters, shared by threads and coroutines.
+
+    Tokens refill at rate_per_second up to `burst`. A caller takes one token
+    per upstream call; if none is available it queues, and the queue is
+    ordered by (priority, arrival). Queue-wait time is recorded per priority,
+    so the configured rate can be tuned to use the provider quota without
+    being throttled.
+    """
+
+    def __init__(self, name: str, rate_per_second: float, burst: int):
+        self.name = name
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._cond = Condition()
+        self._waiters: List[Tuple[int, int]] = []
+        self._sequence = itertools.count()
+        self._stats = {
+            priority: {'acquired': 0, 'wait_seconds_total': 0.0, 'wait_seconds_max': 0.0}
+            for priority in Priority
+        }
+
+    def acquire(self, priority: Optional[Priority] = None) -> float:
+        """
+        Take one token, blocking the calling thread until it is this caller's turn.
+
+        Args:
+            priority: Defaults to the current request_priority
+
+        Returns:
+            Seconds spent waiting
+        """
+        priority = request_priority.get() if priority is None else priority
+        started = time.monotonic()
+        with self._cond:
+            ticket = self._enqueue(priority)
+            while True:
+                wait = self._try_take(ticket)
+                if wait == 0:
+                    break
+                self._cond.wait(wait)
+            return self._record(priority, started)
+
+    async def acquire_async(self, priority: Optional[Priority] = None) -> float:
+        """
+        Async variant of acquire; sleeps instead of blocking the event loop.
+
+        A cancelled waiter leaves the queue without taking a token.
+        """
+        priority = request_priority.get() if priority is None else priority
+        started = time.monotonic()
+        with self._cond:
+            ticket = self._enqueue(priority)
+        try:
+            while True:
+                with self._cond:
+                    wait = self._try_take(ticket)
+                    if wait == 0:
+                        return self._record(priority, started)
+                await asyncio.sleep(wait)
+        except BaseException:
+            with self._cond:
+                if ticket in self._waiters:
+                    self._waiters.remove(ticket)
+                    heapq.heapify(self._waiters)
+                    self._cond.notify_all()
+            raise
+
+    def _enqueue(self, priority: Priority) -> Tuple[int, int]:
+        """Add a waiter ticket to the priority queue (lock held)."""
+        ticket = (int(priority), next(self._sequence))
+        heapq.heappush(self._waiters, ticket)
+        return ticket
+
+    def _try_take(self, ticket: Tuple[int, int]) -> float:
+        """
+        Take a token for `ticket` if it is first in line (lock held).
+
+        Returns:
+            0 if the token was taken, otherwise seconds to wait before retrying
+        """
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate_per_second)
+        self._updated = now
+
+        if self._waiters[0] == ticket and self._tokens >= 1:
+            heapq.heappop(self._waiters)
+            self._tokens -= 1
+            # Let the next caller in line re-check
+            self._cond.notify_all()
+            return 0
+
+        if self._tokens >= 1:
+            # A token is free but someone is ahead; they are about to take it
+            return 0.005
+        return max((1 - self._tokens) / self.rate_per_second, 0.001)
+
+    def _record(self, priority: Priority, started: float) -> float:
+        """Record the queue-wait time of one acquisition (lock held)."""
+        waited = time.monotonic() - started
+        stats = self._stats[priority]
+        stats['acquired'] += 1
+        stats['wait_seconds_total'] += waited
+        stats['wait_seconds_max'] = max(stats['wait_seconds_max'], waited)
+        return waited
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get bucket state and queue-wait statistics per priority.
+
+        Returns:
+            Dictionary with rate, burst, tokens, waiting and per-priority waits
+        """
+        with self._cond:
+            waiting = {priority.name.lower(): 0 for priority in Priority}
+            for priority, _ in self._waiters:
+                waiting[Priority(priority).name.lower()] += 1
+            return {
+                'rate_per_second': self.rate_per_second,
+                'burst': self.burst,
+                'tokens': round(self._tokens, 2),
+                'waiting': waiting,
+                'queue_wait': {
+                    priority.name.lower(): {
+                        'acquired': stats['acquired'],
+                        'avg_wait_ms': round(stats['wait_seconds_total'] / stats['acquired'] * 1000, 1)
+                        if stats['acquired'] else 0.0,
+                        'max_wait_ms': round(stats['wait_seconds_max'] * 1000, 1)
+                    }
+                    for priority, stats in self._stats.items()
+                }
+            }
+
+
+# Global limiter instances, one per upstream
+upstream_limiters = {
+    'stocktwits': RateLimiter('stocktwits', config.STOCKTWITS_RATE_PER_SECOND, config.STOCKTWITS_RATE_BURST),
+    'openbb': RateLimiter('openbb', config.OPENBB_RATE_PER_SECOND, config.OPENBB_RATE_BURST),
+}
@@ -0,0 +1,423 @@
+"""
+Resilience primitives for upstream calls.
+Per-upstream circuit breaker, latency-based adaptive timeout and retry
+budget, so a degraded provider fails fast instead of tying up workers.
+"""
+
+import asyncio
+import contextvars
+import functools
+import math
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from threading import Lock
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+import config
+from services.rate_limiter import RateLimiter, upstream_limiters
+from services.upstream_pool import upstream_pools
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker with half-open probing.
+
+    closed:    calls flow; failure_threshold failures in a row open it
+    open:      calls are rejected until recovery_seconds have passed
+    half_open: a single probe call is let through; success closes the
+               breaker, failure opens it again for another recovery period
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(
+        self,
+        failure_threshold: int = config.BREAKER_FAILURE_THRESHOLD,
+        recovery_seconds: float = config.BREAKER_RECOVERY_SECONDS
+    ):
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = Lock()
+        self._stats = {'trips': 0, 'rejected': 0}
+
+    @property
+    def state(self) -> str:
+        """Current state, reporting 'half_open' once an open breaker may probe."""
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_seconds:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """
+        Check whether a call may go to the upstream now.
+
+        Returns:
+            True if the call may proceed (it must then be recorded with
+            record_success or record_failure), False if it is rejected
+        """
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_seconds:
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+
+            self._stats['rejected'] += 1
+            return False
+
+    def record_success(self) -> None:
+        """Record a successful call; closes a half-open breaker."""
+        with self._lock:
+            self._failures = 0
+            self._state = self.CLOSED
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """Record a failed call; may open the breaker."""
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or (
+                self._state == self.CLOSED and self._failures >= self.failure_threshold
+            ):
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+                self._stats['trips'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get state, consecutive failures and trip/reject counters."""
+        state = self.state
+        with self._lock:
+            return {'state': state, 'consecutive_failures': self._failures, **self._stats}
+
+
+class AdaptiveTimeout:
+    """
+    Timeout derived from recent successful call latencies.
+
+    The timeout is the configured percentile of the last `window` latencies
+    times a multiplier, clamped to [minimum, maximum]. Until min_samples
+    latencies are known, the maximum (the upstream's configured timeout)
+    is used.
+    """
+
+    def __init__(
+        self,
+        maximum: float,
+        minimum: float = config.ADAPTIVE_TIMEOUT_MIN_SECONDS,
+        percentile: float = config.ADAPTIVE_TIMEOUT_PERCENTILE,
+        multiplier: float = config.ADAPTIVE_TIMEOUT_MULTIPLIER,
+        window: int = config.ADAPTIVE_TIMEOUT_WINDOW,
+        min_samples: int = 20
+    ):
+        self.maximum = maximum
+        self.minimum = min(minimum, maximum)
+        self.percentile = percentile
+        self.multiplier = multiplier
+        self.min_samples = min_samples
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._cached: Optional[float] = None
+        self._lock = Lock()
+
+    def observe(self, seconds: float) -> None:
+        """Record the latency of a successful call."""
+        with self._lock:
+            self._samples.append(seconds)
+            self._cached = None
+
+    def current(self) -> float:
+        """Timeout in seconds to use for the next call."""
+        with self._lock:
+            if self._cached is None:
+                if len(self._samples) < self.min_samples:
+                    self._cached = self.maximum
+                else:
+                    budget = _percentile(sorted(self._samples), self.percentile) * self.multiplier
+                    self._cached = max(self.minimum, min(self.maximum, budget))
+            return self._cached
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the current timeout and latency percentiles (seconds)."""
+        timeout = self.current()
+        with self._lock:
+            samples = sorted(self._samples)
+        return {
+            'timeout_seconds': round(timeout, 3),
+            'latency_p50': round(_percentile(samples, 50), 3) if samples else None,
+            'latency_p99': round(_percentile(samples, 99), 3) if samples else None,
+            'samples': len(samples)
+        }
+
+
+class RetryBudget:
+    """
+    Token bucket limiting retries to a fraction of call volume.
+
+    Every call deposits `ratio` tokens (up to max_tokens) and every retry
+    withdraws one, so retries can never multiply load on a struggling
+    upstream by more than 1 + ratio.
+    """
+
+    def __init__(
+        self,
+        ratio: float = config.RETRY_BUDGET_RATIO,
+        max_tokens: float = config.RETRY_BUDGET_MAX_TOKENS
+    ):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._lock = Lock()
+        self._stats = {'retries': 0, 'retries_denied': 0}
+
+    def record_call(self) -> None:
+        """Deposit the share of a retry earned by one call."""
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_retry(self) -> bool:
+        """Withdraw one retry if the budget allows it."""
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                self._stats['retries'] += 1
+                return True
+            self._stats['retries_denied'] += 1
+            return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get remaining tokens and retry counters."""
+        with self._lock:
+            return {'retry_tokens': round(self._tokens, 2), **self._stats}
+
+
+class UpstreamGuard:
+    """
+    Circuit breaker, adaptive timeout and retry budget for one upstream.
+
+    Wrap every raw provider call in call()/call_async(). Only upstream
+    failures (see is_upstream_failure) count against the breaker and are
+    retried, up to max_retries times while the budget allows; other errors
+    are raised as-is. Calls are cut off at the adaptive timeout with a
+    TimeoutError, which counts as a failure: async calls are cancelled, and
+    blocking calls run on the guard's own threads and are abandoned there,
+    so the caller's worker is freed at the deadline (a blocking provider
+    call cannot be interrupted, so it finishes in the background).
+    While the breaker is open, calls raise CircuitOpenError immediately and
+    clients fall back to cached data. Admitted calls (and retries) then
+    take a token from the upstream's rate limiter; time spent queued there
+    does not count against the timeout.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        timeout_seconds: float,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_retries: int = config.UPSTREAM_MAX_RETRIES,
+        max_threads: int = 4
+    ):
+        self.name = name
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.breaker = CircuitBreaker()
+        self.timeout = AdaptiveTimeout(maximum=timeout_seconds)
+        self.retry_budget = RetryBudget()
+        self._executor = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix=f"{name}-call")
+
+    def call(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Call a blocking upstream function under the guard.
+
+        Args:
+            func: Raw provider call
+            *args, **kwargs: Arguments forwarded to func
+
+        Returns:
+            Whatever func returns
+
+        Raises:
+            CircuitOpenError: If the breaker rejected the call
+            TimeoutError: If the last attempt exceeded the adaptive timeout
+        """
+        self.retry_budget.record_call()
+        attempt = 0
+        while True:
+            self._admit()
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            timeout = self.timeout.current()
+            started = time.monotonic()
+            try:
+                result = self._run_with_deadline(func, args, kwargs, timeout)
+            except Exception as e:
+                if not is_upstream_failure(e):
+                    # The upstream answered (e.g. no data for a bad symbol):
+                    # not a sign of ill health, and retrying won't change it
+                    self._record(time.monotonic() - started, timeout)
+                    raise
+                self.breaker.record_failure()
+                if not self._should_retry(attempt):
+                    raise
+                attempt += 1
+                continue
+
+            self._record(time.monotonic() - started, timeout)
+            return result
+
+    async def call_async(self, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """
+        Await an async upstream call under the guard, cancelling it at the timeout.
+
+        Raises:
+            CircuitOpenError: If the breaker rejected the call
+            asyncio.TimeoutError: If the last attempt exceeded the adaptive timeout
+        """
+        self.retry_budget.record_call()
+        attempt = 0
+        while True:
+            self._admit()
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async()
+            timeout = self.timeout.current()
+            started = time.monotonic()
+            try:
+                result = await asyncio.wait_for(func(*args, **kwargs), timeout=timeout)
+            except Exception as e:
+                if not is_upstream_failure(e):
+                    # The upstream answered (e.g. no data for a bad symbol):
+                    # not a sign of ill health, and retrying won't change it
+                    self._record(time.monotonic() - started, timeout)
+                    raise
+                self.breaker.record_failure()
+                if not self._should_retry(attempt):
+                    raise
+                attempt += 1
+                continue
+
+            self._record(time.monotonic() - started, timeout)
+            return result
+
+    def _run_with_deadline(self, func: Callable[..., Any], args: tuple, kwargs: dict, timeout: float) -> Any:
+        """Run func on a guard thread and wait at most `timeout` seconds for it."""
+        # Carry context variables into the guard thread like upstream_pools.run does
+        ctx = contextvars.copy_context()
+        future = self._executor.submit(functools.partial(ctx.run, func, *args, **kwargs))
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            # Not started yet: drop it; already running: abandon it
+            future.cancel()
+            raise TimeoutError(f"{self.name} call exceeded its {timeout:.1f}s timeout") from None
+
+    def _admit(self) -> None:
+        """Raise CircuitOpenError unless the breaker lets the call through."""
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"Circuit breaker open for {self.name}")
+
+    def _should_retry(self, attempt: int) -> bool:
+        """True if another attempt is allowed by max_retries and the budget."""
+        return attempt < self.max_retries and self.retry_budget.try_retry()
+
+    def _record(self, elapsed: float, timeout: float) -> None:
+        """Record a completed call; one slower than its timeout counts as a failure."""
+        if elapsed > timeout:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        self.timeout.observe(elapsed)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get breaker state, timeout, retry budget and rate limit statistics."""
+        stats = {
+            **self.breaker.get_stats(),
+            **self.timeout.get_stats(),
+            **self.retry_budget.get_stats()
+        }
+        if self.rate_limiter is not None:
+            stats['rate_limit'] = self.rate_limiter.get_stats()
+        return stats
+
+
+def is_upstream_failure(exc: BaseException) -> bool:
+    """
+    Check whether an exception means the upstream itself is unhealthy.
+
+    Timeouts, connection/transport errors and HTTP 5xx responses are
+    failures. Anything else (4xx responses, "no results" errors for unknown
+    symbols, parsing errors) means the upstream answered, so it must not
+    trip the breaker or spend retry budget. Wrapped errors are classified
+    by their cause.
+
+    Args:
+        exc: Exception raised by a raw provider call
+
+    Returns:
+        True if the exception should count as an upstream failure
+    """
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        status = getattr(getattr(exc, 'response', None), 'status_code', None)
+        if isinstance(status, int):
+            return status >= 500
+        if isinstance(exc, (asyncio.TimeoutError, TimeoutError, OSError)):
+            # OSError covers socket errors and requests' RequestException
+            return True
+        if any(cls.__name__ in _TRANSPORT_ERROR_NAMES for cls in type(exc).__mro__):
+            return True
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+
+# Transport error base classes of HTTP clients that don't derive from OSError
+# (httpx, curl_cffi), matched by name so neither has to be installed
+_TRANSPORT_ERROR_NAMES = frozenset({'TransportError', 'TimeoutException', 'CurlError'})
+
+
+def _percentile(sorted_values, percentile: float) -> float:
+    """Nearest-rank percentile of an already sorted, non-empty sequence."""
+    index = max(0, math.ceil(percentile / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def get_upstream_stats() -> Dict[str, Dict[str, Any]]:
+    """Get guard and worker pool statistics for every upstream (shown in /api/health)."""
+    pool_stats = upstream_pools.get_stats()
+    return {
+        name: {**guard.get_stats(), 'pool': pool_stats.get(name)}
+        for name, guard in upstream_guards.items()
+    }
+
+
+# Global guard instances, one per upstream
+upstream_guards = {
+    'stocktwits': UpstreamGuard(
+        'stocktwits',
+        timeout_seconds=config.STOCKTWITS_TIMEOUT,
+        rate_limiter=upstream_limiters['stocktwits'],
+        max_threads=config.STOCKTWITS_MAX_WORKERS * config.UPSTREAM_CALL_THREADS_PER_WORKER
+    ),
+    'openbb': UpstreamGuard(
+        'openbb',
+        timeout_seconds=config.OPENBB_TIMEOUT,
+        rate_limiter=upstream_limiters['openbb'],
+        max_threads=config.OPENBB_MAX_WORKERS * config.UPSTREAM_CALL_THREADS_PER_WORKER
+    ),
+}
+stocktwits_guard = upstream_guards['stocktwits']
+openbb_guard = upstream_guards['openbb']
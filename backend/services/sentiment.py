@@ -0,0 +1,159 @@
+"""
+Rule-based headline sentiment.
+Headlines are split into words once and looked up in positive/negative
+lexicons from config, with memoized results.
+"""
+
+import functools
+import re
+from typing import Any, Dict, FrozenSet, Iterable, List, Set, Tuple
+import config
+
+_VOWELS = set('aeiou')
+
+# Split on the same word boundaries as the regex \b. ASCII headlines (the
+# common case) take one bytes.translate pass that lowercases and turns
+# non-word characters into spaces; other text falls back to the regex.
+_NON_WORD = re.compile(r"\W+")
+_ASCII_WORDS = bytes.maketrans(
+    bytes(range(128)),
+    bytes(
+        ord(chr(c).lower()) if chr(c).isalnum() or chr(c) == '_' else ord(' ')
+        for c in range(128)
+    )
+)
+
+POSITIVE = 'positive'
+NEGATIVE = 'negative'
+NEUTRAL = 'neutral'
+
+
+class SentimentScorer:
+    """
+    Scores headlines as 'positive', 'negative' or 'neutral'.
+
+    A headline is positive when it mentions more distinct positive lexicon
+    words than negative ones (and vice versa). Only whole words match, so
+    "update" does not count as "up" and "execute" not as "cut"; common
+    inflections of each lexicon word ("gains", "dropped", "rallies") do.
+
+    Results are memoized per headline (LRU, config.SENTIMENT_CACHE_SIZE),
+    since the same headlines come back on every news refresh.
+    """
+
+    def __init__(
+        self,
+        positive_words: Iterable[str] = config.SENTIMENT_POSITIVE_WORDS,
+        negative_words: Iterable[str] = config.SENTIMENT_NEGATIVE_WORDS,
+        cache_size: int = config.SENTIMENT_CACHE_SIZE
+    ):
+        # UTF-8 surface form -> (polarity, base word); a base word counts once per headline
+        self._lexicon: Dict[bytes, Tuple[int, str]] = {}
+        ambiguous: Set[bytes] = set()
+        for polarity, words in ((1, positive_words), (-1, negative_words)):
+            for base in words:
+                base = base.lower()
+                for form in map(str.encode, _inflections(base)):
+                    existing = self._lexicon.get(form)
+                    if existing is not None and existing[0] != polarity:
+                        ambiguous.add(form)
+                    self._lexicon[form] = (polarity, base)
+        for form in ambiguous:
+            del self._lexicon[form]
+
+        # Headline words are intersected with this set in one C-level pass
+        self._forms: FrozenSet[bytes] = frozenset(self._lexicon)
+
+        self._score_cached = functools.lru_cache(maxsize=cache_size)(self._score)
+
+    def score(self, headline: str) -> str:
+        """
+        Score one headline.
+
+        Args:
+            headline: Text to analyze
+
+        Returns:
+            'positive', 'negative', or 'neutral'
+        """
+        return self._score_cached(headline or '')
+
+    def score_batch(self, headlines: List[str]) -> List[str]:
+        """
+        Score many headlines at once.
+
+        Duplicates within the batch are scored once.
+
+        Args:
+            headlines: Texts to analyze
+
+        Returns:
+            Labels in the same order as headlines
+        """
+        labels: Dict[str, str] = {}
+        for headline in headlines:
+            headline = headline or ''
+            if headline not in labels:
+                labels[headline] = self._score_cached(headline)
+        return [labels[headline or ''] for headline in headlines]
+
+    def _score(self, headline: str) -> str:
+        """Split and score a headline (uncached)."""
+        hits = self._forms.intersection(_words(headline))
+        if not hits:
+            return NEUTRAL
+        lexicon = self._lexicon
+        balance = sum(polarity for polarity, _ in {lexicon[word] for word in hits})
+
+        if balance > 0:
+            return POSITIVE
+        elif balance < 0:
+            return NEGATIVE
+        else:
+            return NEUTRAL
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get lexicon size and memoization counters."""
+        info = self._score_cached.cache_info()
+        return {
+            'lexicon_forms': len(self._lexicon),
+            'cache_hits': info.hits,
+            'cache_misses': info.misses,
+            'cache_size': info.currsize
+        }
+
+
+def _words(text: str) -> List[bytes]:
+    """Split text into lowercase UTF-8 words in one pass."""
+    if text.isascii():
+        return text.encode('ascii').translate(_ASCII_WORDS).split()
+    return [word.encode() for word in _NON_WORD.split(text.lower())]
+
+
+def _inflections(word: str) -> Set[str]:
+    """
+    Regular inflections of an English word (plural / 3rd person, -ed, -ing).
+
+    Over-generation is harmless here: forms that are not real words never
+    appear in headlines.
+    """
+    forms = {word, word + 's', word + 'es', word + 'ed', word + 'ing'}
+    if word.endswith('e'):
+        # surge -> surged, surging
+        forms |= {word + 'd', word[:-1] + 'ing'}
+    if len(word) > 1 and word.endswith('y') and word[-2] not in _VOWELS:
+        # rally -> rallies, rallied
+        forms |= {word[:-1] + 'ies', word[:-1] + 'ied'}
+    if (
+        len(word) >= 3
+        and word[-1] not in _VOWELS and word[-1] not in 'wxy'
+        and word[-2] in _VOWELS
+        and word[-3] not in _VOWELS
+    ):
+        # drop -> dropped, cut -> cutting
+        forms |= {word + word[-1] + 'ed', word + word[-1] + 'ing'}
+    return forms
+
+
+# Global scorer instance
+sentiment_scorer = SentimentScorer()
@@ -0,0 +1,91 @@
+"""
+Response serialization helpers.
+Encodes hot responses to JSON bytes once and keeps compressed variants so
+they can be served as-is, with Content-Encoding negotiation.
+"""
+
+import gzip
+import json
+from typing import Any, Dict, List, Optional, Tuple
+from pydantic import BaseModel
+import config
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize to compact JSON bytes (orjson when installed)."""
+    if isinstance(obj, BaseModel):
+        obj = obj.model_dump(mode='json')
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':'), default=str).encode('utf-8')
+
+
+class EncodedBody:
+    """
+    One response body serialized once, plus its compressed variants.
+
+    Bodies smaller than config.RESPONSE_COMPRESSION_MIN_BYTES are kept
+    uncompressed only. Brotli is produced when the brotli package is
+    installed; gzip always.
+    """
+
+    __slots__ = ('variants',)
+
+    def __init__(self, payload: Any):
+        identity = dumps(payload)
+        self.variants: Dict[str, bytes] = {'identity': identity}
+
+        if len(identity) >= config.RESPONSE_COMPRESSION_MIN_BYTES:
+            if brotli is not None:
+                self.variants['br'] = brotli.compress(identity, quality=config.RESPONSE_BROTLI_QUALITY)
+            self.variants['gzip'] = gzip.compress(identity, compresslevel=config.RESPONSE_GZIP_LEVEL, mtime=0)
+
+    def select(self, accept_encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+        """
+        Pick the best variant the client accepts.
+
+        Args:
+            accept_encoding: Value of the request's Accept-Encoding header
+
+        Returns:
+            Tuple of (body, content_encoding); content_encoding is None for
+            the uncompressed body
+        """
+        accepted = _parse_accept_encoding(accept_encoding)
+        for encoding in ('br', 'gzip'):
+            if encoding in self.variants and accepted.get(encoding, accepted.get('*', 0.0)) > 0:
+                return self.variants[encoding], encoding
+        return self.variants['identity'], None
+
+
+def _parse_accept_encoding(header: Optional[str]) -> Dict[str, float]:
+    """Map each coding in an Accept-Encoding header to its q-value."""
+    accepted: Dict[str, float] = {}
+    if not header:
+        return accepted
+
+    for part in header.split(','):
+        params: List[str] = part.strip().split(';')
+        coding = params[0].strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params[1:]:
+            name, _, value = param.strip().partition('=')
+            if name.strip() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
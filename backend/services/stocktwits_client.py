@@ -3,10 +3,16 @@ Stocktwits client for fetching trending tickers.
 Uses Stocktwits API to fetch trending stocks and crypto.
 """
 
+import asyncio
+import functools
+import importlib.util
+import threading
 import requests
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional
 import config
 from services.cache_manager import cache
+from services.upstream_pool import upstream_pools
+from services.resilience import CircuitOpenError, stocktwits_guard
 
 try:
     from curl_cffi import requests as curl_requests
@@ -14,13 +20,46 @@ try:
 except ImportError:
     USE_CURL_CFFI = False
 
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+HTTP2_AVAILABLE = HTTPX_AVAILABLE and importlib.util.find_spec("h2") is not None
+
+IMPERSONATE = "chrome110"
+FALLBACK_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Accept': 'application/json'
+}
+
 
 class StocktwitsClient:
-    """Client for fetching trending data from Stocktwits API."""
+    """
+    Client for fetching trending data from Stocktwits API.
+
+    HTTP sessions are long-lived and reused, so repeated refreshes skip the
+    TCP/TLS handshake (and curl_cffi's browser impersonation setup). Sync
+    calls use one session per thread, since sessions are not safe to
+    share between threads; async calls share one pooled client (curl_cffi
+    AsyncSession, or httpx with HTTP/2 when available). close_async() is
+    called from the app shutdown hook.
+
+    Requests go through stocktwits_guard (circuit breaker, adaptive
+    timeout, retry budget); while its breaker is open, fetches return None
+    at once and the cache serves retained data.
+    """
 
     def __init__(self):
         self.api_url = "https://api.stocktwits.com/api/2/trending/symbols.json"
         self.timeout = config.STOCKTWITS_TIMEOUT
+        self.cache_key = "stocktwits_trending"
+        self._local = threading.local()
+        self._sessions: List[Any] = []
+        self._sessions_lock = threading.Lock()
+        self._async_client: Optional[Any] = None
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
 
     def get_trending_tickers(self, force_refresh: bool = False) -> List[Dict[str, any]]:
         """
@@ -32,50 +71,177 @@ class StocktwitsClient:
         Returns:
             List of dictionaries containing trending ticker data
         """
-        cache_key = "stocktwits_trending"
+        trending_data = cache.get_or_compute(
+            self.cache_key,
+            self._fetch_trending,
+            force_refresh=force_refresh
+        )
+        return trending_data if trending_data else []
+
+    async def get_trending_tickers_async(self, force_refresh: bool = False) -> List[Dict[str, any]]:
+        """
+        Async variant of get_trending_tickers.
 
-        # Check cache first
-        if not force_refresh:
-            cached_data = cache.get(cache_key)
-            if cached_data is not None:
-                return cached_data
+        Cache hits are answered inline; misses use the pooled async client,
+        or run the blocking HTTP call in the Stocktwits worker pool when no
+        async HTTP library is installed, so the event loop is never blocked.
+        Either way a miss takes a Stocktwits pool slot and is shed with
+        OverloadedError when the backlog is too deep.
+        """
+        if USE_CURL_CFFI or HTTPX_AVAILABLE:
+            loader = self._fetch_trending_async
+        else:
+            loader = functools.partial(upstream_pools.run, 'stocktwits', self._fetch_trending)
+
+        trending_data = await cache.get_or_compute_async(
+            self.cache_key,
+            loader,
+            force_refresh=force_refresh
+        )
+        return trending_data if trending_data else []
+
+    def _fetch_trending(self) -> Optional[List[Dict[str, any]]]:
+        """
+        Fetch and parse trending symbols from the Stocktwits API.
 
+        Returns:
+            List of trending tickers, or None if the request failed
+        """
         try:
-            # Fetch trending symbols from API using curl_cffi to bypass Cloudflare
-            if USE_CURL_CFFI:
-                response = curl_requests.get(
-                    self.api_url,
-                    impersonate="chrome110",
-                    timeout=self.timeout
-                )
-            else:
-                # Fallback to regular requests
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                    'Accept': 'application/json'
-                }
-                response = requests.get(self.api_url, headers=headers, timeout=self.timeout)
-
-            response.raise_for_status()
+            response = stocktwits_guard.call(self._get)
 
             # Parse JSON response
             data = response.json()
-            trending_data = self._parse_api_response(data)
+            return self._parse_api_response(data)
 
-            # Cache the results
-            cache.set(cache_key, trending_data)
-
-            return trending_data
+        except CircuitOpenError:
+            # Upstream is failing; the cache answers with retained data
+            return None
 
         except requests.RequestException as e:
             print(f"Error fetching Stocktwits trending data: {e}")
-            # Return cached data if available, even if expired
-            cached_data = cache.get(cache_key)
-            return cached_data if cached_data else []
+            return None
 
         except Exception as e:
             print(f"Error parsing Stocktwits data: {e}")
-            return []
+            return None
+
+    async def _fetch_trending_async(self) -> Optional[List[Dict[str, any]]]:
+        """
+        Async variant of _fetch_trending using the pooled async client.
+
+        The request holds a Stocktwits pool slot (upstream_pools.admit)
+        while in flight, so it is prioritized and shed like blocking calls.
+
+        Returns:
+            List of trending tickers, or None if the request failed
+
+        Raises:
+            OverloadedError: If the Stocktwits backlog is too deep
+        """
+        async with upstream_pools.admit('stocktwits'):
+            try:
+                response = await stocktwits_guard.call_async(self._get_async, self._get_async_client())
+                return self._parse_api_response(response.json())
+
+            except CircuitOpenError:
+                return None
+
+            except asyncio.TimeoutError:
+                print(f"Timed out fetching Stocktwits trending data after {stocktwits_guard.timeout.current():.1f}s")
+                return None
+
+            except Exception as e:
+                print(f"Error fetching Stocktwits trending data: {e}")
+                return None
+
+    def _get(self) -> Any:
+        """Request the trending endpoint with the adaptive timeout; raises on HTTP errors."""
+        # Runs on a guard thread, so the session is that thread's own
+        session = self._get_session()
+        timeout = stocktwits_guard.timeout.current()
+        if USE_CURL_CFFI:
+            # curl_cffi impersonates a browser to get past Cloudflare
+            response = session.get(self.api_url, impersonate=IMPERSONATE, timeout=timeout)
+        else:
+            response = session.get(self.api_url, timeout=timeout)
+        response.raise_for_status()
+        return response
+
+    async def _get_async(self, client: Any) -> Any:
+        """Async variant of _get; the guard cancels it at the adaptive timeout."""
+        if USE_CURL_CFFI:
+            response = await client.get(self.api_url, impersonate=IMPERSONATE, timeout=self.timeout)
+        else:
+            response = await client.get(self.api_url)
+        response.raise_for_status()
+        return response
+
+    def _get_session(self) -> Any:
+        """Return this thread's keep-alive session, creating it on first use."""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            if USE_CURL_CFFI:
+                session = curl_requests.Session(impersonate=IMPERSONATE)
+            else:
+                session = requests.Session()
+                session.headers.update(FALLBACK_HEADERS)
+            self._local.session = session
+            with self._sessions_lock:
+                self._sessions.append(session)
+        return session
+
+    def _get_async_client(self) -> Any:
+        """
+        Return the shared async client for the running event loop.
+
+        A client is bound to the loop it was created on, so a new one is
+        created if the loop changed (e.g. the app was restarted in-process).
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            if USE_CURL_CFFI:
+                self._async_client = curl_requests.AsyncSession(
+                    impersonate=IMPERSONATE,
+                    max_clients=config.STOCKTWITS_MAX_WORKERS
+                )
+            else:
+                self._async_client = httpx.AsyncClient(
+                    headers=FALLBACK_HEADERS,
+                    timeout=self.timeout,
+                    http2=config.STOCKTWITS_HTTP2 and HTTP2_AVAILABLE,
+                    limits=httpx.Limits(
+                        max_connections=config.STOCKTWITS_MAX_WORKERS,
+                        keepalive_expiry=config.STOCKTWITS_KEEPALIVE_SECONDS
+                    )
+                )
+            self._async_loop = loop
+        return self._async_client
+
+    def close(self) -> None:
+        """Close all per-thread sync sessions and their pooled connections."""
+        with self._sessions_lock:
+            sessions, self._sessions = self._sessions, []
+        # Threads that still hold a closed session get a fresh one next call
+        self._local = threading.local()
+        for session in sessions:
+            try:
+                session.close()
+            except Exception as e:
+                print(f"Error closing Stocktwits session: {e}")
+
+    async def close_async(self) -> None:
+        """Close the async client and all sync sessions (app shutdown hook)."""
+        client, self._async_client, self._async_loop = self._async_client, None, None
+        if client is not None:
+            try:
+                if USE_CURL_CFFI:
+                    await client.close()
+                else:
+                    await client.aclose()
+            except Exception as e:
+                print(f"Error closing Stocktwits async client: {e}")
+        self.close()
 
     def _parse_api_response(self, data: Dict) -> List[Dict[str, any]]:
         """
@@ -0,0 +1,237 @@
+"""
+Bounded thread pools for blocking upstream calls.
+Keeps the asyncio event loop free while Stocktwits/OpenBB requests run.
+"""
+
+import asyncio
+import contextvars
+import functools
+import heapq
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from threading import Lock
+from typing import Any, AsyncIterator, Callable, Dict, List, Tuple
+import config
+from services.rate_limiter import Priority, request_priority
+
+
+class OverloadedError(Exception):
+    """
+    Raised instead of queueing upstream work when a pool's backlog is too deep.
+
+    The cache answers with retained data when it has some; otherwise the app
+    returns 503 with a Retry-After header.
+    """
+
+    def __init__(self, upstream: str, retry_after: int = config.OVERLOAD_RETRY_AFTER_SECONDS):
+        super().__init__(f"{upstream} upstream is overloaded, retry in {retry_after}s")
+        self.upstream = upstream
+        self.retry_after = retry_after
+
+
+class _PriorityGate:
+    """
+    Admits at most `limit` jobs into a pool, waking waiters by priority.
+
+    Jobs wait here (on the event loop) instead of in the executor's FIFO
+    queue, so an interactive request is never stuck behind a backlog of
+    bulk or background jobs that were submitted first.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+
+    async def acquire(self, priority: Priority) -> None:
+        """Wait for a free slot; waiters are admitted in (priority, arrival) order."""
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (int(priority), next(self._sequence), future)
+        heapq.heappush(self._waiters, entry)
+        acquired = False
+        try:
+            await future
+            acquired = True
+        finally:
+            # Cancelled, or the coroutine was closed with its loop: a slot
+            # handed over in the meantime must not be lost
+            if not acquired:
+                if future.done() and not future.cancelled():
+                    self.release()
+                elif entry in self._waiters:
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+
+    def release(self) -> None:
+        """Hand the slot to the first waiter in line, or free it."""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            # Waiters whose loop has closed will never run; skip them
+            if not future.done() and not future.get_loop().is_closed():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    def waiting(self) -> int:
+        """Number of jobs waiting for a slot."""
+        return len(self._waiters)
+
+    def waiting_ahead(self, priority: Priority) -> int:
+        """Number of waiting jobs that would be admitted before one at `priority`."""
+        return sum(1 for waiter_priority, _, _ in self._waiters if waiter_priority <= priority)
+
+
+class UpstreamPools:
+    """
+    One bounded ThreadPoolExecutor per upstream provider.
+
+    A slow provider can only exhaust its own pool, so requests to other
+    upstreams (and endpoints with no upstream work, like /api/health)
+    are never stuck behind it. Within a pool, queued jobs are started in
+    request_priority order.
+
+    Work is shed instead of queued once max_queued jobs would run ahead of
+    it: piling up more only makes every caller time out.
+    """
+
+    def __init__(self, sizes: Dict[str, int], max_queued: int = config.UPSTREAM_MAX_QUEUED):
+        self._sizes = dict(sizes)
+        self.max_queued = max_queued
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+        self._gates = {name: _PriorityGate(size) for name, size in self._sizes.items()}
+        self._shed = dict.fromkeys(self._sizes, 0)
+        self._lock = Lock()
+
+    def _get_executor(self, upstream: str) -> ThreadPoolExecutor:
+        """Return the executor for an upstream, creating it on first use."""
+        with self._lock:
+            executor = self._executors.get(upstream)
+            if executor is None:
+                if upstream not in self._sizes:
+                    raise KeyError(f"Unknown upstream pool: {upstream}")
+                executor = ThreadPoolExecutor(
+                    max_workers=self._sizes[upstream],
+                    thread_name_prefix=f"{upstream}-worker"
+                )
+                self._executors[upstream] = executor
+            return executor
+
+    async def run(self, upstream: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run a blocking callable in the upstream's pool and await its result.
+
+        When the pool is busy the call waits for a worker at the caller's
+        request_priority, ahead of lower-priority work queued earlier.
+
+        Args:
+            upstream: Pool name (e.g. 'stocktwits', 'openbb')
+            func: Blocking callable to execute
+            *args, **kwargs: Arguments forwarded to func
+
+        Returns:
+            Whatever func returns (exceptions are re-raised in the caller)
+
+        Raises:
+            OverloadedError: If max_queued jobs are already waiting ahead
+        """
+        executor = self._get_executor(upstream)
+        gate = self._gates[upstream]
+        await self._enter(upstream, gate)
+
+        # The slot is ours until the done callback takes it over
+        handed_off = False
+        try:
+            loop = asyncio.get_running_loop()
+            # Carry context variables into the worker thread like asyncio.to_thread does
+            ctx = contextvars.copy_context()
+            call = functools.partial(ctx.run, func, *args, **kwargs)
+            future = executor.submit(call)
+            # Free the slot when the job finishes, even if the awaiting caller gave up
+            future.add_done_callback(functools.partial(_release_slot, loop, gate))
+            handed_off = True
+        finally:
+            if not handed_off:
+                gate.release()
+        return await asyncio.wrap_future(future)
+
+    @asynccontextmanager
+    async def admit(self, upstream: str) -> AsyncIterator[None]:
+        """
+        Hold one of the upstream's slots for async work done on the event loop.
+
+        Async HTTP calls don't need a worker thread, but they go through
+        the same admission as run(): they wait by request_priority, count
+        towards the pool's capacity and backlog, and are shed when the
+        backlog is too deep.
+
+        Args:
+            upstream: Pool name (e.g. 'stocktwits')
+
+        Raises:
+            OverloadedError: If max_queued jobs are already waiting ahead
+        """
+        if upstream not in self._gates:
+            raise KeyError(f"Unknown upstream pool: {upstream}")
+        gate = self._gates[upstream]
+        await self._enter(upstream, gate)
+        try:
+            yield
+        finally:
+            gate.release()
+
+    async def _enter(self, upstream: str, gate: _PriorityGate) -> None:
+        """Shed or wait for a slot at the caller's request_priority."""
+        priority = request_priority.get()
+        if gate.waiting_ahead(priority) >= self.max_queued:
+            self._shed[upstream] += 1
+            raise OverloadedError(upstream)
+        await gate.acquire(priority)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get pool sizes and current backlog per upstream.
+
+        Returns:
+            Dictionary keyed by upstream name
+        """
+        with self._lock:
+            return {
+                name: {
+                    'max_workers': size,
+                    'active': self._gates[name].active,
+                    'queued': self._gates[name].waiting(),
+                    'shed': self._shed[name]
+                }
+                for name, size in self._sizes.items()
+            }
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Shut down all pools (called from the app shutdown hook)."""
+        with self._lock:
+            executors = list(self._executors.values())
+            self._executors.clear()
+
+        for executor in executors:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+def _release_slot(loop: asyncio.AbstractEventLoop, gate: _PriorityGate, _future: Any) -> None:
+    """Release a gate slot on its event loop (called from the worker thread)."""
+    try:
+        loop.call_soon_threadsafe(gate.release)
+    except RuntimeError:
+        # Loop already closed (shutdown): release here so the slot isn't lost
+        gate.release()
+
+
+# Global pool instance
+upstream_pools = UpstreamPools({
+    'stocktwits': config.STOCKTWITS_MAX_WORKERS,
+    'openbb': config.OPENBB_MAX_WORKERS,
+})
@@ -0,0 +1,15 @@
+"""
+Shared pytest setup.
+Makes the backend importable from any working directory and keeps tests
+off the on-disk L2 cache and the pre-warm scheduler.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+
+config.CACHE_L2_ENABLED = False
+config.PREWARM_ENABLED = False
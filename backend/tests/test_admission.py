@@ -0,0 +1,130 @@
+"""
+Tests that async upstream calls go through the pools' admission control,
+and that admission slots survive cancellation and closed event loops.
+"""
+
+import asyncio
+import gc
+import threading
+
+import pytest
+
+import services.stocktwits_client as stocktwits_module
+from services.resilience import UpstreamGuard
+from services.stocktwits_client import StocktwitsClient
+from services.rate_limiter import Priority
+from services.upstream_pool import OverloadedError, UpstreamPools, _PriorityGate, upstream_pools
+
+
+class FakeResponse:
+    def json(self):
+        return {'symbols': []}
+
+
+@pytest.fixture
+def stalled_stocktwits(monkeypatch):
+    """A Stocktwits client whose async requests hang until `release` is set."""
+    release = asyncio.Event()
+
+    async def stalled_get(client):
+        await release.wait()
+        return FakeResponse()
+
+    client = StocktwitsClient()
+    monkeypatch.setattr(client, '_get_async', stalled_get)
+    monkeypatch.setattr(client, '_get_async_client', lambda: None)
+    # No rate limiter, so only admission decides who waits
+    monkeypatch.setattr(stocktwits_module, 'stocktwits_guard', UpstreamGuard('stocktwits', timeout_seconds=5))
+    monkeypatch.setattr(upstream_pools, 'max_queued', 1)
+    return client, release
+
+
+def test_async_fetches_are_shed_when_the_backlog_is_full(stalled_stocktwits):
+    client, release = stalled_stocktwits
+    slots = upstream_pools.get_stats()['stocktwits']['max_workers']
+
+    async def scenario():
+        shed_before = upstream_pools.get_stats()['stocktwits']['shed']
+        # Fill every slot, then one waiter: the backlog is now max_queued deep
+        in_flight = [asyncio.ensure_future(client._fetch_trending_async()) for _ in range(slots + 1)]
+        await asyncio.sleep(0.05)
+        stats = upstream_pools.get_stats()['stocktwits']
+        assert (stats['active'], stats['queued']) == (slots, 1)
+
+        with pytest.raises(OverloadedError):
+            await client._fetch_trending_async()
+        assert upstream_pools.get_stats()['stocktwits']['shed'] == shed_before + 1
+
+        release.set()
+        assert await asyncio.gather(*in_flight) == [[]] * (slots + 1)
+        assert upstream_pools.get_stats()['stocktwits']['active'] == 0
+
+    asyncio.run(scenario())
+
+
+def waiting_on_closed_loop(gate: _PriorityGate):
+    """Hold the gate's only slot and queue a waiter, then close their loop."""
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(gate.acquire(Priority.INTERACTIVE))
+    waiter = loop.create_task(gate.acquire(Priority.INTERACTIVE))
+    loop.run_until_complete(asyncio.sleep(0))
+    assert (gate.active, gate.waiting()) == (1, 1)
+    return loop, waiter
+
+
+def test_slot_is_not_handed_to_a_waiter_on_a_closed_loop():
+    gate = _PriorityGate(1)
+    loop, waiter = waiting_on_closed_loop(gate)
+    loop.close()
+
+    gate.release()
+    assert (gate.active, gate.waiting()) == (0, 0)
+
+
+def test_slot_granted_to_a_waiter_that_never_resumes_is_released():
+    gate = _PriorityGate(1)
+    loop, waiter = waiting_on_closed_loop(gate)
+
+    # Granted, but the loop closes before the waiter runs again
+    gate.release()
+    loop.close()
+    assert gate.active == 1
+
+    del waiter
+    gc.collect()
+    assert gate.active == 0
+
+
+def test_cancelled_waiter_releases_a_granted_slot():
+    gate = _PriorityGate(1)
+
+    async def scenario():
+        await gate.acquire(Priority.INTERACTIVE)
+        waiter = asyncio.ensure_future(gate.acquire(Priority.INTERACTIVE))
+        await asyncio.sleep(0)
+        gate.release()
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert (gate.active, gate.waiting()) == (0, 0)
+
+    asyncio.run(scenario())
+
+
+def test_job_finishing_after_its_loop_closed_frees_the_slot():
+    pools = UpstreamPools({'test': 1})
+    started, finish = threading.Event(), threading.Event()
+
+    def blocking():
+        started.set()
+        finish.wait(5)
+
+    loop = asyncio.new_event_loop()
+    loop.create_task(pools.run('test', blocking))
+    loop.run_until_complete(asyncio.sleep(0))
+    assert started.wait(5)
+    loop.close()
+
+    finish.set()
+    pools.shutdown(wait=True)
+    assert pools.get_stats()['test']['active'] == 0
@@ -0,0 +1,56 @@
+"""
+Tests for the incremental bar store: partial provider frames and the in-memory cap.
+"""
+
+import math
+from datetime import date, timedelta
+
+import pandas as pd
+
+from services.bar_store import BAR_COLUMNS, BarStore
+
+END = date(2025, 1, 31)
+START = END - timedelta(days=30)
+
+
+def bars(start: date, end: date, columns=BAR_COLUMNS) -> pd.DataFrame:
+    days = pd.date_range(start, end, freq='D')
+    return pd.DataFrame({col: [float(i + 1) for i in range(len(days))] for col in columns}, index=days)
+
+
+def test_frames_without_volume_are_stored_with_nan(tmp_path):
+    db_path = str(tmp_path / "bars.db")
+    store = BarStore(db_path=db_path)
+
+    def fetcher(symbol, start, end):
+        return bars(start, end, columns=['open', 'high', 'low', 'close'])
+
+    frame = store.get_bars('BTC-USD', START, END, fetcher)
+    assert list(frame.columns) == BAR_COLUMNS
+    assert frame['volume'].isna().all()
+    assert frame['close'].iloc[-1] == 31.0
+
+    # Persisted as NULL and read back as NaN
+    reloaded = BarStore(db_path=db_path).get_bars('BTC-USD', START, END, lambda *args: None)
+    assert len(reloaded) == len(frame)
+    assert math.isnan(reloaded['volume'].iloc[0])
+    assert reloaded['close'].iloc[-1] == 31.0
+
+
+def test_memory_holds_only_the_most_recently_used_symbols(tmp_path):
+    store = BarStore(db_path=str(tmp_path / "bars.db"), max_symbols=2)
+    calls = []
+
+    def fetcher(symbol, start, end):
+        calls.append((symbol, start))
+        return bars(start, end)
+
+    for symbol in ('AAA', 'BBB', 'CCC'):
+        store.get_bars(symbol, START, END, fetcher)
+    assert store.get_stats()['symbols'] == 2
+
+    # AAA was evicted from memory but is re-read from disk: still an incremental fetch
+    frame = store.get_bars('AAA', START, END, fetcher)
+    assert calls[-1] == ('AAA', END)
+    assert frame.index[0] == START and frame.index[-1] == END
+    assert store.get_stats()['symbols'] == 2
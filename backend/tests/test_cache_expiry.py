@@ -0,0 +1,104 @@
+"""
+Tests for the heap-driven expiry of CacheManager entries.
+"""
+
+import asyncio
+import random
+import threading
+import time
+
+from services.cache_manager import CacheManager
+
+
+def short_lived_cache(**kwargs) -> CacheManager:
+    """Cache whose entries are dropped well under a second after they go stale."""
+    return CacheManager(ttl_seconds=0.05, stale_ttl_seconds=0.05, retention_seconds=0.1, **kwargs)
+
+
+def test_expire_due_removes_only_entries_past_retention():
+    cache = short_lived_cache()
+    cache.set("short", 1)
+    cache.set("long", 2, ttl_seconds=60)
+
+    time.sleep(0.15)
+    assert cache.expire_due() == 1
+
+    assert cache.get_stale("short") is None
+    assert cache.get("long") == 2
+    assert cache.get_stats()['expired'] == 1
+
+
+def test_replaced_entry_keeps_its_new_deadline():
+    cache = short_lived_cache()
+    cache.set("key", "old")
+    cache.set("key", "new", ttl_seconds=60)
+
+    time.sleep(0.15)
+    # The old deadline comes due but must not remove the replacement
+    assert cache.expire_due() == 0
+    assert cache.get("key") == "new"
+
+
+def test_concurrent_set_get_never_serves_expired_values():
+    cache = short_lived_cache(max_entries=500)
+    stop = threading.Event()
+    errors = []
+
+    def writer_reader():
+        rng = random.Random()
+        while not stop.is_set():
+            key = f"k{rng.randrange(2000)}"
+            ttl = rng.random() * 0.2
+            cache.set(key, {'written_at': time.time(), 'ttl': ttl}, ttl_seconds=ttl)
+            value = cache.get(key)
+            if value is not None and time.time() > value['written_at'] + value['ttl'] + 0.01:
+                errors.append(f"{key} served past its TTL")
+
+    def expirer():
+        while not stop.is_set():
+            cache.expire_due(batch_size=16)
+            time.sleep(0.001)
+
+    threads = [threading.Thread(target=writer_reader) for _ in range(8)] + [threading.Thread(target=expirer)]
+    for thread in threads:
+        thread.start()
+    time.sleep(1.0)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+
+    # Once everything has passed retention, a sweep leaves the cache empty and consistent
+    time.sleep(0.35)
+    cache.expire_due()
+    stats = cache.get_stats()
+    assert stats['total_entries'] == 0
+    assert stats['size_bytes'] == 0
+    assert stats['expired'] > 0
+
+
+def test_expiry_heap_stays_proportional_to_live_entries():
+    cache = CacheManager(max_entries=160, shard_count=16)
+    for i in range(20000):
+        cache.set(f"hot{i % 10}", i)
+        cache.set(f"cold{i}", i)
+
+    stats = cache.get_stats()
+    assert stats['expiry_heap_size'] <= 2 * stats['total_entries'] + 16 * 64
+    assert cache.get("hot3") == 19993
+
+
+def test_expiry_timer_runs_on_the_event_loop():
+    cache = short_lived_cache()
+
+    async def scenario():
+        cache.set("key", 1)
+        cache.start_expiry_timer(interval_seconds=0.05)
+        try:
+            await asyncio.sleep(0.4)
+        finally:
+            await cache.stop_expiry_timer()
+
+    asyncio.run(scenario())
+    assert cache.get_stale("key") is None
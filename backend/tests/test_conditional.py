@@ -0,0 +1,72 @@
+"""
+Tests that validators describe the body actually sent, and that 304s are served.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import app
+from routes.conditional import entry_validators
+from services.cache_manager import cache
+from services.market_snapshot import market_snapshot
+from services.openbb_client import openbb_client
+from services.stocktwits_client import stocktwits_client
+
+
+def indicators(rsi: float) -> dict:
+    return {
+        'symbol': 'AAPL', 'rsi': rsi, 'macd': 0.5, 'macd_signal': 0.4, 'macd_histogram': 0.1,
+        'sma_20': 10.0, 'sma_50': 9.5, 'price': 100.0, 'volume': 1000, 'last_updated': 'now'
+    }
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(market_snapshot, 'current', None)
+    cache.clear()
+    yield TestClient(app)
+    cache.clear()
+
+
+def test_indicator_validators_come_from_the_returned_entry(client, monkeypatch):
+    key = "indicators_AAPL"
+
+    async def loaded(symbol, force_refresh=False):
+        value = indicators(55.0)
+        cache.set(key, value)
+        return value
+
+    monkeypatch.setattr(openbb_client, 'get_technical_indicators_async', loaded)
+    response = client.get("/api/indicators/AAPL")
+    assert response.headers['etag'] == entry_validators(key).etag
+
+
+def test_indicators_refreshed_after_the_read_get_no_stale_validators(client, monkeypatch):
+    key = "indicators_AAPL"
+
+    async def refreshed_meanwhile(symbol, force_refresh=False):
+        value = indicators(55.0)
+        cache.set(key, value)
+        # A background refresh lands before the handler builds its headers
+        cache.set(key, indicators(60.0))
+        return value
+
+    monkeypatch.setattr(openbb_client, 'get_technical_indicators_async', refreshed_meanwhile)
+    response = client.get("/api/indicators/AAPL")
+    assert response.json()['rsi'] == 55.0
+    assert 'etag' not in response.headers
+
+
+def test_trending_without_snapshot_answers_304(client):
+    cache.set(stocktwits_client.cache_key, [{
+        'symbol': 'AAPL', 'title': 'Apple', 'price': 100.0, 'percent_change': 1.5,
+        'volume': '1.2M', 'market_cap': '3T', 'direction': 'up'
+    }])
+
+    first = client.get("/api/trending")
+    assert first.status_code == 200
+    etag = first.headers['etag']
+
+    second = client.get("/api/trending", headers={'If-None-Match': etag})
+    assert second.status_code == 304
+    assert second.headers['etag'] == etag
@@ -0,0 +1,73 @@
+"""
+Tests that slow upstream calls never block the event loop.
+"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app import app
+from services.cache_manager import cache
+from services.market_snapshot import market_snapshot
+from services.openbb_client import openbb_client
+from services.stocktwits_client import stocktwits_client
+
+
+UPSTREAM_DELAY = 1.0
+
+TRENDING = [
+    {
+        'symbol': symbol,
+        'watchlist_count': 1000,
+        'price': 100.0,
+        'percent_change': 1.5,
+        'volume': '1.2M',
+        'market_cap': '10B',
+        'direction': 'up'
+    }
+    for symbol in ('AAPL', 'TSLA', 'NVDA')
+]
+
+
+@pytest.fixture
+def slow_upstreams(monkeypatch):
+    """Trending data is cached; every indicator load blocks its worker for UPSTREAM_DELAY."""
+    openbb_client.start_loading().result()
+    monkeypatch.setattr(openbb_client, 'available', True)
+
+    def slow_indicators(keys, force_refresh=False):
+        time.sleep(UPSTREAM_DELAY)
+        return {key: {'symbol': key.partition('_')[2], 'rsi': 55.0} for key in keys}
+
+    monkeypatch.setattr(openbb_client, '_load_indicators', slow_indicators)
+    monkeypatch.setattr(market_snapshot, 'current', None)
+    monkeypatch.setattr(market_snapshot, '_build_lock', None)
+    cache.clear()
+    cache.set(stocktwits_client.cache_key, TRENDING)
+    yield
+    cache.clear()
+
+
+def test_health_stays_fast_while_scan_waits_on_slow_upstreams(slow_upstreams):
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            scan = asyncio.ensure_future(client.get("/api/scan"))
+            await asyncio.sleep(0.1)
+
+            started = time.perf_counter()
+            health = await client.get("/api/health")
+            health_latency = time.perf_counter() - started
+            scan_pending = not scan.done()
+
+            return health, health_latency, scan_pending, await scan
+
+    health, health_latency, scan_pending, scan = asyncio.run(scenario())
+
+    assert health.status_code == 200
+    assert scan_pending
+    assert health_latency < UPSTREAM_DELAY / 4
+    assert scan.status_code == 200
+    assert scan.json()['total_scanned'] == len(TRENDING)
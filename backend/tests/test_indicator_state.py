@@ -0,0 +1,126 @@
+"""
+Parity tests for incremental indicator state: values produced from quote
+ticks must match a full recompute over the same closes, within a day and
+across bar rollovers.
+"""
+
+import random
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+import services.openbb_client as openbb_module
+from services.cache_manager import cache
+from services.indicators import INDICATOR_KEYS, IndicatorState, compute_indicators, indicators_for_rows, stack_closes
+
+TOLERANCE = 1e-9
+
+
+def recompute(closes: list) -> dict:
+    return indicators_for_rows(compute_indicators(stack_closes([closes])))[0]
+
+
+def assert_parity(actual: dict, closes: list) -> None:
+    expected = recompute(closes)
+    for key in INDICATOR_KEYS:
+        if expected[key] is None:
+            assert actual[key] is None, f"{len(closes)} bars: {key} should be undefined"
+        else:
+            assert actual[key] == pytest.approx(expected[key], rel=TOLERANCE, abs=TOLERANCE), f"{len(closes)} bars: {key}"
+
+
+def ticks(rng: random.Random, price: float, count: int) -> list:
+    prices = []
+    for _ in range(count):
+        price = max(1.0, price + rng.gauss(0, 1))
+        prices.append(price)
+    return prices
+
+
+def test_state_matches_recompute_across_ticks_and_rollovers():
+    rng = random.Random(11)
+    # Start short of every warm-up period so each boundary is crossed by rollovers
+    completed = ticks(rng, 100.0, 5)
+    state = IndicatorState.from_closes(completed)
+
+    for _ in range(70):
+        day = ticks(rng, completed[-1], 6)
+        for price in day:
+            assert_parity(state.preview(price), completed + [price])
+        # Rollover: the last tick closes the bar
+        state.push(day[-1])
+        completed.append(day[-1])
+
+    assert_parity(state.preview(completed[-1]), completed + [completed[-1]])
+
+
+def test_preview_does_not_change_state():
+    closes = ticks(random.Random(12), 100.0, 60)
+    state = IndicatorState.from_closes(closes)
+    first = state.preview(90.0)
+    state.preview(120.0)
+
+    assert state.preview(90.0) == first
+
+
+class MovableDate(date):
+    """date whose today() can be moved forward to simulate a new session."""
+    current = date(2024, 3, 1)
+
+    @classmethod
+    def today(cls):
+        return cls.current
+
+
+def bars(closes: list, end: date) -> pd.DataFrame:
+    index = [end - timedelta(days=len(closes) - 1 - i) for i in range(len(closes))]
+    return pd.DataFrame({'close': closes, 'volume': [1000.0] * len(closes)}, index=index)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(openbb_module, 'date', MovableDate)
+    monkeypatch.setattr(MovableDate, 'current', date(2024, 3, 1))
+    cache.clear()
+    yield openbb_module.OpenBBClient()
+    cache.clear()
+
+
+def tick(client, symbol: str, price: float) -> dict:
+    client._on_quote_tick(symbol, {'symbol': symbol, 'price': price, 'volume': 500})
+    return cache.get(f"indicators_{symbol}")
+
+
+def test_quote_ticks_match_recompute_across_session_rollovers(client):
+    rng = random.Random(13)
+    closes = ticks(rng, 100.0, 40)
+
+    for _ in range(15):
+        today = MovableDate.today()
+        client._sync_state("AAPL", bars(closes, today))
+
+        for price in ticks(rng, closes[-1], 5):
+            indicators = tick(client, "AAPL", price)
+            assert indicators['price'] == price
+            assert_parity(indicators, closes[:-1] + [price])
+            # Same as the batch path over the bars with the open bar repriced
+            batch = client._indicators_from_bars({"AAPL": bars(closes[:-1] + [price], today)})["AAPL"]
+            assert_parity(batch, closes[:-1] + [price])
+            closes[-1] = price
+
+        # Next session: ticks wait until the sync rolls the state forward
+        MovableDate.current = today + timedelta(days=1)
+        before = cache.get("indicators_AAPL")
+        assert tick(client, "AAPL", closes[-1] + 1.0) is before
+        closes.append(closes[-1])
+
+
+def test_ticks_are_ignored_until_the_state_reaches_today(client):
+    closes = ticks(random.Random(14), 100.0, 60)
+    client._sync_state("MSFT", bars(closes, MovableDate.today() - timedelta(days=1)))
+
+    assert tick(client, "MSFT", 101.0) is None
+
+    client._sync_state("MSFT", bars(closes + [101.0], MovableDate.today()))
+    assert_parity(tick(client, "MSFT", 102.0), closes + [102.0])
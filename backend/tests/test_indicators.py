@@ -0,0 +1,154 @@
+"""
+Correctness tests for the vectorized indicator engine, against a plain
+per-series reference implementation of the same formulas.
+"""
+
+import math
+import random
+
+import numpy as np
+import pytest
+
+from services.indicators import INDICATOR_KEYS, compute_indicators, indicators_for_rows, stack_closes
+
+TOLERANCE = 1e-9
+
+
+def reference_ema(values: list, length: int) -> list:
+    """EMA seeded with the SMA of the first `length` values (None before that)."""
+    alpha = 2.0 / (length + 1)
+    out = [None] * len(values)
+    if len(values) < length:
+        return out
+    value = sum(values[:length]) / length
+    out[length - 1] = value
+    for i in range(length, len(values)):
+        value = (1.0 - alpha) * value + alpha * values[i]
+        out[i] = value
+    return out
+
+
+def reference_rsi(closes: list, length: int = 14):
+    """Wilder RSI as an adjusted exponential average of gains and losses."""
+    changes = [b - a for a, b in zip(closes, closes[1:])]
+    if len(changes) < length:
+        return None
+    beta = 1.0 - 1.0 / length
+    weights = [beta ** (len(changes) - 1 - i) for i in range(len(changes))]
+    gain = sum(w * max(c, 0.0) for w, c in zip(weights, changes)) / sum(weights)
+    loss = sum(w * max(-c, 0.0) for w, c in zip(weights, changes)) / sum(weights)
+    if gain + loss == 0:
+        return None
+    return 100.0 * gain / (gain + loss)
+
+
+def reference_indicators(closes: list) -> dict:
+    """Latest RSI-14, MACD 12/26/9 and SMA-20/50 for one series."""
+    fast = reference_ema(closes, 12)
+    slow = reference_ema(closes, 26)
+    macd = [f - s for f, s in zip(fast, slow) if f is not None and s is not None]
+    signal = reference_ema(macd, 9)
+    latest_macd = macd[-1] if macd else None
+    latest_signal = signal[-1] if signal else None
+    return {
+        'rsi': reference_rsi(closes),
+        'macd': latest_macd,
+        'macd_signal': latest_signal,
+        'macd_histogram': latest_macd - latest_signal if latest_signal is not None else None,
+        'sma_20': sum(closes[-20:]) / 20 if len(closes) >= 20 else None,
+        'sma_50': sum(closes[-50:]) / 50 if len(closes) >= 50 else None,
+    }
+
+
+def random_walk(bars: int, seed: int) -> list:
+    rng = random.Random(seed)
+    closes, price = [], 100.0
+    for _ in range(bars):
+        price = max(1.0, price + rng.gauss(0, 2))
+        closes.append(price)
+    return closes
+
+
+def assert_matches(actual: dict, expected: dict, label: str = "") -> None:
+    for key in INDICATOR_KEYS:
+        if expected[key] is None:
+            assert actual[key] is None, f"{label} {key} should be undefined, got {actual[key]}"
+        else:
+            assert actual[key] == pytest.approx(expected[key], rel=TOLERANCE, abs=TOLERANCE), f"{label} {key}"
+
+
+def compute_rows(series: list) -> list:
+    return indicators_for_rows(compute_indicators(stack_closes(series)))
+
+
+LENGTHS = [0, 1, 2, 14, 15, 20, 25, 26, 33, 34, 35, 49, 50, 51, 120, 250]
+
+
+def test_matches_reference_across_warm_up_lengths():
+    # One matrix of mixed lengths, so shorter rows are left-padded with NaN
+    series = [random_walk(bars, seed) for seed, bars in enumerate(LENGTHS)]
+    for closes, row in zip(series, compute_rows(series)):
+        assert_matches(row, reference_indicators(closes), f"{len(closes)} bars:")
+
+
+@pytest.mark.parametrize("bars", LENGTHS)
+def test_padding_does_not_change_a_row(bars):
+    closes = random_walk(bars, seed=bars)
+    alone = compute_rows([closes])[0]
+    padded = compute_rows([closes, random_walk(300, seed=999)])[0]
+    assert alone == padded
+    assert_matches(alone, reference_indicators(closes))
+
+
+def test_warm_up_boundaries():
+    def first_defined(key: str) -> int:
+        return next(bars for bars in range(1, 80) if compute_rows([random_walk(bars, seed=1)])[0][key] is not None)
+
+    assert first_defined('rsi') == 15
+    assert first_defined('macd') == 26
+    assert first_defined('macd_signal') == 34
+    assert first_defined('macd_histogram') == 34
+    assert first_defined('sma_20') == 20
+    assert first_defined('sma_50') == 50
+
+
+def test_window_shorter_than_fifty_bars():
+    closes = random_walk(40, seed=3)
+    row = compute_rows([closes])[0]
+
+    assert row['sma_50'] is None
+    assert row['sma_20'] == pytest.approx(sum(closes[-20:]) / 20)
+    assert None not in (row['rsi'], row['macd'], row['macd_signal'], row['macd_histogram'])
+    assert_matches(row, reference_indicators(closes))
+
+
+def test_empty_and_all_nan_rows_are_undefined():
+    closes = random_walk(60, seed=4)
+    matrix = stack_closes([closes, [], [math.nan] * 60])
+    rows = indicators_for_rows(compute_indicators(matrix))
+
+    assert_matches(rows[0], reference_indicators(closes))
+    assert rows[1] == dict.fromkeys(INDICATOR_KEYS)
+    assert rows[2] == dict.fromkeys(INDICATOR_KEYS)
+
+
+def test_missing_close_in_window_leaves_sma_undefined():
+    closes = random_walk(60, seed=5)
+    closes[-5] = math.nan
+    row = compute_rows([closes])[0]
+
+    assert row['sma_20'] is None
+    assert row['sma_50'] is None
+
+
+def test_flat_series_has_no_rsi():
+    row = compute_rows([[50.0] * 60])[0]
+
+    assert row['rsi'] is None
+    assert row['sma_20'] == pytest.approx(50.0)
+    assert row['macd'] == pytest.approx(0.0)
+
+
+def test_rejects_one_dimensional_input():
+    with pytest.raises(ValueError):
+        compute_indicators(np.array(random_walk(30, seed=6)))
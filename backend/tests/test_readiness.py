@@ -0,0 +1,72 @@
+"""
+Tests that /api/ready reports ready only once OpenBB has actually loaded.
+"""
+
+import sys
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app as app_module
+from services.openbb_client import OpenBBClient
+
+
+@pytest.fixture
+def client():
+    return TestClient(app_module.app)
+
+
+@pytest.fixture
+def openbb(monkeypatch):
+    """A fresh OpenBB client whose import is replaced per test."""
+    openbb = OpenBBClient()
+    monkeypatch.setattr(app_module, 'openbb_client', openbb)
+    return openbb
+
+
+def test_not_ready_before_loading_starts(client, openbb):
+    response = client.get("/api/ready")
+    assert response.status_code == 503
+    assert response.json()['openbb']['error'] == "OpenBB loading has not started"
+
+
+def test_not_ready_when_openbb_is_not_installed(client, openbb):
+    openbb.available = False
+    openbb.start_loading()
+    response = client.get("/api/ready")
+    assert response.status_code == 503
+    assert response.json()['openbb']['error'] == "OpenBB is not installed"
+
+
+def test_not_ready_when_import_fails(client, openbb, monkeypatch):
+    # A None entry makes `import openbb` raise ImportError
+    monkeypatch.setitem(sys.modules, 'openbb', None)
+    openbb.available = True
+    openbb.start_loading().result(timeout=5)
+
+    response = client.get("/api/ready")
+    assert response.status_code == 503
+    assert response.json()['openbb']['error'].startswith("Error importing OpenBB:")
+
+
+def test_ready_only_after_import_finishes(client, openbb, monkeypatch):
+    release = threading.Event()
+
+    def slow_import():
+        release.wait(5)
+        openbb._load_future.set_result(True)
+
+    monkeypatch.setattr(openbb, '_load_analytics', slow_import)
+    openbb.available = True
+    openbb.start_loading()
+
+    response = client.get("/api/ready")
+    assert response.status_code == 503
+    assert response.json()['openbb']['error'] == "OpenBB is still loading"
+
+    release.set()
+    openbb.start_loading().result(timeout=5)
+    response = client.get("/api/ready")
+    assert response.status_code == 200
+    assert response.json()['openbb']['error'] is None
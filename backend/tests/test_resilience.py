@@ -0,0 +1,105 @@
+"""
+Tests for UpstreamGuard failure classification.
+"""
+
+import threading
+import time
+
+import pytest
+import requests
+
+from services.resilience import CircuitOpenError, UpstreamGuard, is_upstream_failure
+
+
+def http_error(status_code: int) -> requests.HTTPError:
+    response = requests.Response()
+    response.status_code = status_code
+    return requests.HTTPError(response=response)
+
+
+def test_classifies_transport_errors_timeouts_and_5xx_as_failures():
+    assert is_upstream_failure(requests.ConnectionError())
+    assert is_upstream_failure(requests.ReadTimeout())
+    assert is_upstream_failure(TimeoutError())
+    assert is_upstream_failure(http_error(503))
+
+    assert not is_upstream_failure(http_error(404))
+    assert not is_upstream_failure(ValueError("No results found for XXXX"))
+
+
+def test_classifies_wrapped_errors_by_cause():
+    try:
+        try:
+            raise requests.ConnectionError("connection reset")
+        except requests.ConnectionError as e:
+            raise RuntimeError("provider error") from e
+    except RuntimeError as e:
+        assert is_upstream_failure(e)
+
+
+def test_not_found_errors_do_not_trip_the_breaker_or_retry():
+    guard = UpstreamGuard('test', timeout_seconds=5)
+    calls = []
+
+    def unknown_symbol():
+        calls.append(1)
+        raise ValueError("No results found for XXXX")
+
+    for _ in range(guard.breaker.failure_threshold * 2):
+        try:
+            guard.call(unknown_symbol)
+        except ValueError:
+            pass
+
+    assert len(calls) == guard.breaker.failure_threshold * 2
+    assert guard.breaker.state == 'closed'
+    assert guard.retry_budget.get_stats()['retries'] == 0
+
+
+def test_transport_errors_open_the_breaker():
+    guard = UpstreamGuard('test', timeout_seconds=5, max_retries=0)
+
+    def unreachable():
+        raise requests.ConnectionError("connection refused")
+
+    for _ in range(guard.breaker.failure_threshold):
+        try:
+            guard.call(unreachable)
+        except requests.ConnectionError:
+            pass
+
+    assert guard.breaker.state == 'open'
+
+
+def test_blocking_calls_are_cut_off_at_the_timeout():
+    guard = UpstreamGuard('test', timeout_seconds=0.1, max_retries=0)
+    release = threading.Event()
+
+    def stalled():
+        release.wait(5)
+        return 'late'
+
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        guard.call(stalled)
+    elapsed = time.monotonic() - started
+    release.set()
+
+    assert elapsed < 1
+    assert guard.breaker.get_stats()['consecutive_failures'] == 1
+
+
+def test_timeouts_open_the_breaker_without_waiting_for_the_calls():
+    guard = UpstreamGuard('test', timeout_seconds=0.05, max_retries=0)
+    release = threading.Event()
+
+    started = time.monotonic()
+    for _ in range(guard.breaker.failure_threshold):
+        with pytest.raises(TimeoutError):
+            guard.call(release.wait, 5)
+    release.set()
+
+    assert time.monotonic() - started < 2
+    assert guard.breaker.state == 'open'
+    with pytest.raises(CircuitOpenError):
+        guard.call(lambda: 'ok')
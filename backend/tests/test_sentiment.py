@@ -0,0 +1,109 @@
+"""
+Correctness tests for the headline sentiment scorer, against the substring
+scorer it replaced.
+"""
+
+import pytest
+
+from services.sentiment import SentimentScorer, sentiment_scorer
+
+
+def substring_sentiment(text: str) -> str:
+    """The original scorer: counts lexicon words appearing anywhere in the text."""
+    text_lower = text.lower()
+    positive_words = ['gain', 'up', 'surge', 'rally', 'buy', 'bullish', 'growth', 'profit', 'beat', 'success']
+    negative_words = ['loss', 'down', 'fall', 'drop', 'sell', 'bearish', 'decline', 'miss', 'fail', 'cut']
+    positive_count = sum(1 for word in positive_words if word in text_lower)
+    negative_count = sum(1 for word in negative_words if word in text_lower)
+    if positive_count > negative_count:
+        return 'positive'
+    elif negative_count > positive_count:
+        return 'negative'
+    return 'neutral'
+
+
+# Headlines on which substring and whole-word matching must agree
+HEADLINES = [
+    "Apple shares surge after earnings beat expectations",
+    "Tesla stock falls as deliveries miss estimates",
+    "Nvidia stock rally reaches record high on AI demand",
+    "Bitcoin drops below $60,000 amid bearish sentiment",
+    "Amazon reports strong revenue growth in cloud unit",
+    "Meta cuts 10,000 jobs in second round of layoffs",
+    "Microsoft posts quarterly profit gain",
+    "Analysts say buy the dip in semiconductor stocks",
+    "Oil prices decline for third straight session",
+    "Netflix subscriber growth beats forecasts",
+    "Ford recalls vehicles, shares slip",
+    "Fed holds rates steady, markets await guidance",
+    "Retail sales decline while bullish traders buy",
+    "Startup fails to secure funding as losses mount",
+    "Gold rally continues as dollar drops",
+    "Analyst downgrade sends shares lower",
+    "Broker upgrade lifts chipmaker",
+    "Top gainers in pre-market trading",
+    "Airline turns profitable for the first time since 2019",
+    "Tech selloff deepens on rate fears",
+    "Stocks move up after jobs report",
+    "Shares head down on weak guidance",
+    "Company reports successful product launch",
+    "Biotech trial failure hits shares",
+    "Chipmaker warns of downturn in PC demand",
+]
+
+
+@pytest.mark.parametrize("headline", HEADLINES)
+def test_matches_substring_scorer(headline):
+    assert sentiment_scorer.score(headline) == substring_sentiment(headline)
+
+
+@pytest.mark.parametrize("headline, expected", [
+    # Lexicon words embedded in unrelated words no longer count
+    ("Company issues software update", 'neutral'),       # "up"
+    ("CEO to execute new strategy", 'neutral'),           # "cut"
+    ("Cupertino campus expansion announced", 'neutral'),  # "up"
+    ("Downtown office vacancy report released", 'neutral'),  # "down"
+    ("Dropbox announces new product", 'neutral'),         # "drop"
+])
+def test_ignores_lexicon_words_inside_other_words(headline, expected):
+    assert sentiment_scorer.score(headline) == expected
+    assert substring_sentiment(headline) != expected
+
+
+@pytest.mark.parametrize("headline, expected", [
+    # Inflections the substring scorer missed
+    ("Nvidia rallies to record high", 'positive'),
+    ("Gold rallied as dollar weakened", 'positive'),
+])
+def test_matches_inflections(headline, expected):
+    assert sentiment_scorer.score(headline) == expected
+    assert substring_sentiment(headline) != expected
+
+
+def test_counts_each_lexicon_word_once():
+    # "gain" and "gains" are one positive word; "loss" and "decline" are two negative ones
+    assert sentiment_scorer.score("Gain after gains, but loss and decline loom") == 'negative'
+
+
+def test_batch_matches_single_scores():
+    headlines = HEADLINES + HEADLINES[:5] + ["", None]
+    assert sentiment_scorer.score_batch(headlines) == [sentiment_scorer.score(h) for h in headlines]
+
+
+def test_scores_are_memoized():
+    scorer = SentimentScorer()
+    scorer.score("Apple shares surge")
+    scorer.score("Apple shares surge")
+    stats = scorer.get_stats()
+    assert stats['cache_hits'] == 1
+    assert stats['cache_misses'] == 1
+
+
+@pytest.mark.parametrize("headline, ascii_headline", [
+    # Non-ASCII text is split by the regex instead of the ASCII byte table
+    ("Café chain shares surge—analysts cheer", "Cafe chain shares surge-analysts cheer"),
+    ("Zürich bank profit falls, losses mount", "Zurich bank profit falls, losses mount"),
+    ("Société Générale «downgrade» hits stock", "Societe Generale <downgrade> hits stock"),
+])
+def test_non_ascii_headlines_split_like_ascii(headline, ascii_headline):
+    assert sentiment_scorer.score(headline) == sentiment_scorer.score(ascii_headline)
@@ -0,0 +1,155 @@
+"""
+Tests for single-flight loading in CacheManager.get_or_compute(_async).
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from services.cache_manager import CacheManager
+
+
+CALLERS = 100
+
+
+class CountingLoader:
+    """Loader that counts upstream calls and takes a while to answer."""
+
+    def __init__(self, value, delay: float = 0.2):
+        self.value = value
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return self.value
+
+    async def load_async(self):
+        with self._lock:
+            self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.value
+
+
+def test_concurrent_sync_misses_make_one_upstream_call():
+    cache = CacheManager()
+    loader = CountingLoader({'price': 1.0})
+    barrier = threading.Barrier(CALLERS)
+
+    def request(_):
+        barrier.wait()
+        return cache.get_or_compute("indicators_AAPL", loader)
+
+    with ThreadPoolExecutor(CALLERS) as executor:
+        results = list(executor.map(request, range(CALLERS)))
+
+    assert loader.calls == 1
+    assert results == [{'price': 1.0}] * CALLERS
+
+
+def test_concurrent_async_misses_make_one_upstream_call():
+    cache = CacheManager()
+    loader = CountingLoader(['AAPL', 'TSLA'])
+
+    async def scenario():
+        return await asyncio.gather(
+            *(cache.get_or_compute_async("stocktwits_trending", loader.load_async) for _ in range(CALLERS))
+        )
+
+    results = asyncio.run(scenario())
+
+    assert loader.calls == 1
+    assert results == [['AAPL', 'TSLA']] * CALLERS
+
+
+def test_sync_and_async_callers_share_one_load():
+    cache = CacheManager()
+    loader = CountingLoader(42)
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(CALLERS // 2) as executor:
+            sync_results = [
+                loop.run_in_executor(executor, cache.get_or_compute, "quote_AAPL", loader)
+                for _ in range(CALLERS // 2)
+            ]
+            async_results = [cache.get_or_compute_async("quote_AAPL", loader.load_async) for _ in range(CALLERS // 2)]
+            return await asyncio.gather(*sync_results, *async_results)
+
+    results = asyncio.run(scenario())
+
+    assert loader.calls == 1
+    assert results == [42] * CALLERS
+
+
+def test_failed_load_is_not_cached_and_waiters_see_the_error():
+    cache = CacheManager()
+    calls = []
+
+    def failing_loader():
+        calls.append(1)
+        time.sleep(0.1)
+        raise RuntimeError("upstream down")
+
+    def request(_):
+        try:
+            return cache.get_or_compute("news_AAPL", failing_loader)
+        except RuntimeError as e:
+            return str(e)
+
+    with ThreadPoolExecutor(10) as executor:
+        results = list(executor.map(request, range(10)))
+
+    assert len(calls) == 1
+    assert results == ["upstream down"] * 10
+    assert cache.get("news_AAPL") is None
+
+
+def test_cancelled_waiter_does_not_abort_the_shared_load():
+    cache = CacheManager()
+    loader = CountingLoader('value', delay=0.1)
+
+    async def scenario():
+        first = asyncio.ensure_future(cache.get_or_compute_async("key", loader.load_async))
+        await asyncio.sleep(0.02)
+        first.cancel()
+        return await cache.get_or_compute_async("key", loader.load_async)
+
+    assert asyncio.run(scenario()) == 'value'
+    assert loader.calls == 1
+
+
+def test_overlapping_batches_load_each_key_once():
+    cache = CacheManager()
+    loaded = []
+    lock = threading.Lock()
+
+    def batch_loader(keys):
+        with lock:
+            loaded.extend(keys)
+        time.sleep(0.2)
+        return {key: key.upper() for key in keys if key != 'missing'}
+
+    batches = [['a', 'b', 'c'], ['b', 'c', 'd'], ['c', 'd', 'missing']] * 10
+    barrier = threading.Barrier(len(batches) + 1)
+
+    def batch_request(keys):
+        barrier.wait()
+        return cache.get_or_compute_many(keys, batch_loader)
+
+    def single_request(_):
+        barrier.wait()
+        return cache.get_or_compute('a', lambda: batch_loader(['a'])['a'])
+
+    with ThreadPoolExecutor(len(batches) + 1) as executor:
+        single = executor.submit(single_request, None)
+        results = list(executor.map(batch_request, batches))
+
+    assert sorted(loaded) == ['a', 'b', 'c', 'd', 'missing']
+    assert single.result() == 'A'
+    assert results[0] == {'a': 'A', 'b': 'B', 'c': 'C'}
+    assert results[2] == {'c': 'C', 'd': 'D', 'missing': None}
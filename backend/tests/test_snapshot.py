@@ -0,0 +1,113 @@
+"""
+Tests that snapshot versions and SSE deltas follow market data, not load timestamps.
+"""
+
+import asyncio
+import itertools
+
+import pytest
+
+from services.broadcaster import _delta_payload
+from services.cache_manager import cache
+from services.market_snapshot import MarketSnapshotManager
+from services.openbb_client import openbb_client
+from services.stocktwits_client import stocktwits_client
+
+
+TRENDING = [
+    {
+        'symbol': symbol, 'title': symbol, 'watchlist_count': 1000, 'price': 100.0,
+        'percent_change': 1.5, 'volume': '1.2M', 'market_cap': '10B', 'direction': 'up'
+    }
+    for symbol in ('AAPL', 'TSLA')
+]
+
+
+@pytest.fixture
+def upstreams(monkeypatch):
+    """Stubbed upstreams that stamp a new last_updated on every indicator load."""
+    stamps = itertools.count()
+    rsi = {'AAPL': 55.0, 'TSLA': 45.0}
+
+    async def trending(force_refresh=False):
+        return [dict(ticker) for ticker in TRENDING]
+
+    async def indicators(symbols, force_refresh=False):
+        stamp = f"2025-01-20T12:00:{next(stamps):02d}"
+        return {
+            symbol: {
+                'symbol': symbol, 'rsi': rsi[symbol], 'macd': 0.5, 'macd_signal': 0.4, 'macd_histogram': 0.1,
+                'sma_20': 10.0, 'sma_50': 9.5, 'price': 100.0, 'volume': 1000, 'last_updated': stamp
+            }
+            for symbol in symbols
+        }
+
+    monkeypatch.setattr(stocktwits_client, 'get_trending_tickers_async', trending)
+    monkeypatch.setattr(openbb_client, 'get_technical_indicators_batch_async', indicators)
+    return rsi
+
+
+def test_reloads_with_only_new_timestamps_keep_the_version(upstreams):
+    manager = MarketSnapshotManager()
+
+    async def scenario():
+        first = await manager.refresh()
+        second = await manager.refresh()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert second is first
+    assert second.version == 1
+
+
+def test_changed_values_publish_a_new_version(upstreams):
+    manager = MarketSnapshotManager()
+
+    async def scenario():
+        first = await manager.refresh()
+        upstreams['AAPL'] = 72.0
+        return first, await manager.refresh()
+
+    first, second = asyncio.run(scenario())
+    assert second.version == first.version + 1
+
+    delta = _delta_payload(first, second)
+    # Only the symbol whose values changed is sent, with its new timestamp
+    assert set(delta['indicators']['changed']) == {'AAPL'}
+    assert delta['indicators']['changed']['AAPL'].keys() == {'rsi', 'last_updated'}
+    assert delta['trending']['changed'] == {}
+
+
+def test_forced_refresh_checks_the_throttle_once(upstreams, monkeypatch):
+    manager = MarketSnapshotManager()
+    checks = []
+    refresh_allowed = cache.refresh_allowed
+
+    def counting_refresh_allowed(key):
+        allowed = refresh_allowed(key)
+        checks.append(allowed)
+        return allowed
+
+    monkeypatch.setattr(cache, 'refresh_allowed', counting_refresh_allowed)
+
+    async def scenario():
+        built = await manager.refresh()
+        # Trending entry just fetched: throttled
+        cache.set(stocktwits_client.cache_key, TRENDING)
+        throttled = cache.get_stats()['refreshes_throttled']
+        reused = await manager.get(force_refresh=True)
+        throttled = cache.get_stats()['refreshes_throttled'] - throttled
+        # Nothing cached: allowed
+        cache.clear()
+        refreshed = await manager.get(force_refresh=True)
+        return built, reused, refreshed, throttled
+
+    try:
+        built, reused, refreshed, throttled = asyncio.run(scenario())
+    finally:
+        cache.clear()
+
+    assert reused is built
+    assert throttled == 1
+    assert refreshed is built  # refetched, but the data is unchanged
+    assert checks == [False, True]